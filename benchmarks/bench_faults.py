@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2024 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+"""
+Fault benchmark
+
+Measures how `AsyncClient` throughput and tail latency degrade when the
+simulated devices misbehave, one fault mode of the test server
+(`tests.server.Faults`) at a time, against a healthy baseline.
+
+    python benchmarks/bench_faults.py --devices 100 --requests 2000 --retries 2
+"""
+
+import argparse
+import asyncio
+import itertools
+import os
+import statistics
+import sys
+import time
+
+from typing import List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.simulator import Profile, Simulator
+from eapix.client import AsyncClient
+from eapix.exceptions import EapiError
+from eapix.resilience import RetryPolicy
+
+AUTH = ("admin", "admin")
+COMMANDS = ["show hostname", "show version"]
+
+MODES = [
+    ("healthy", ""),
+    ("slow headers", "slow_headers=0.05"),
+    ("slow body", "slow_body=0.02,chunks=4"),
+    ("mid-body resets 5%", "reset=0.05"),
+    ("5xx bursts 10%", "burst=5,burst_every=50"),
+    ("session expiry", "session_ttl=0.5"),
+    ("partial errors 10%", "partial_error=0.1"),
+]
+
+
+async def _load(targets: List[str], args) -> Tuple[List[float], int, float]:
+    """latencies, failures and seconds of `requests` calls"""
+
+    jobs = itertools.islice(itertools.cycle(targets), args.requests)
+    latencies: List[float] = []
+    failures = 0
+
+    async with AsyncClient(auth=AUTH, timeout=args.timeout,
+                           retry=RetryPolicy(retries=args.retries,
+                                             backoff=0.01)) as client:
+        # sessions are needed for the expiry mode
+        await asyncio.gather(*[client.login(target, AUTH)
+                               for target in targets])
+
+        async def worker():
+            nonlocal failures
+            for target in jobs:
+                start = time.perf_counter()
+                try:
+                    response = await client.call(target, COMMANDS)
+                    ok = response.code == 0
+                except EapiError:
+                    ok = False
+                latencies.append(time.perf_counter() - start)
+                failures += not ok
+
+        start = time.perf_counter()
+        await asyncio.gather(*[worker() for _ in range(args.concurrency)])
+        seconds = time.perf_counter() - start
+
+    return latencies, failures, seconds
+
+
+async def main(args):
+    print(f"{args.devices} devices, {args.requests} requests, concurrency "
+          f"{args.concurrency}, retries {args.retries}, "
+          f"latency {args.latency}")
+    print(f"{'mode':<22} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} "
+          f"{'failed':>7} {'vs healthy':>11}")
+
+    baseline = None
+    for name, faults in MODES:
+        profile = Profile(latency=args.latency, faults=faults)
+        with Simulator(args.devices, profile) as targets:
+            latencies, failures, seconds = await _load(targets, args)
+
+        throughput = len(latencies) / seconds
+        centiles = statistics.quantiles(latencies, n=100)
+        baseline = baseline or throughput
+
+        print(f"{name:<22} {throughput:>8.0f} {centiles[49] * 1e3:>8.1f} "
+              f"{centiles[98] * 1e3:>8.1f} {failures:>7} "
+              f"{throughput / baseline:>10.0%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--devices", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--latency", default="fixed:0.005",
+                        help="device latency, see simulator.py")
+    parser.add_argument("--retries", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=2.0)
+    asyncio.run(main(parser.parse_args()))
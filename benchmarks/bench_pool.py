@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2024 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+"""
+Connection pool benchmark
+
+Polls many simulated targets (see `simulator.py`) for several cycles with
+different pool settings and reports the time per cycle and the connections
+opened.
+
+    python benchmarks/bench_pool.py --targets 200 --cycles 5 --tls
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.simulator import Simulator
+from eapix.client import AsyncClient
+from eapix.fleet import Fleet
+
+
+async def _run(name: str, targets: List[str], args, **options):
+    connections = 0
+
+    async def trace(event: str, info: dict):
+        nonlocal connections
+        if event == "connection.connect_tcp.complete":
+            connections += 1
+
+    cycles = []
+    async with AsyncClient(auth=("admin", "admin"), verify=False,
+                           **options) as client:
+        fleet = Fleet(client=client, concurrency=args.concurrency)
+
+        for _ in range(args.cycles):
+            start = time.perf_counter()
+            count = 0
+            async for _ in fleet.execute(targets * args.per_target,
+                                         ["show version"],
+                                         return_exceptions=True,
+                                         extensions={"trace": trace}):
+                count += 1
+            cycles.append(time.perf_counter() - start)
+
+    print(f"{name:<36} {statistics.mean(cycles):>8.3f} "
+          f"{min(cycles):>8.3f} {connections:>12}")
+
+
+async def main(args):
+    with Simulator(args.targets, tls=args.tls) as targets:
+        scheme = "https" if args.tls else "http"
+
+        print(f"{len(targets)} targets x {args.per_target}, "
+              f"{args.cycles} cycles, concurrency {args.concurrency}, {scheme}")
+        print(f"{'config':<36} {'mean (s)':>8} {'best (s)':>8} "
+              f"{'connections':>12}")
+
+        await _run("no keepalive", targets, args,
+                   max_keepalive_connections=0)
+        await _run("keepalive pool < targets", targets, args,
+                   max_connections=args.concurrency,
+                   max_keepalive_connections=max(1, args.targets // 4))
+        await _run("keepalive pool >= targets", targets, args,
+                   max_connections=args.concurrency,
+                   max_keepalive_connections=args.targets * args.per_target,
+                   keepalive_expiry=60.0)
+        # a pool per target
+        await _run("per-target pools, 1 connection", targets, args,
+                   keepalive_expiry=60.0, max_connections_per_target=1)
+        await _run("per-target pools, 2 connections", targets, args,
+                   keepalive_expiry=60.0, max_connections_per_target=2)
+
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            print("http2: skipped, the 'h2' package is not installed")
+        else:
+            # uvicorn only speaks HTTP/1.1, this shows the fallback cost
+            await _run("http2 (negotiated, falls back)", targets, args,
+                       keepalive_expiry=60.0, max_connections_per_target=1,
+                       http2=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--targets", type=int, default=100)
+    parser.add_argument("--per-target", type=int, default=2,
+                        help="requests per target in each cycle")
+    parser.add_argument("--cycles", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--tls", action="store_true")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2024 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+"""
+eAPI device simulator
+
+Serves the test eAPI app (`tests/server.py`) as N virtual devices, one
+listening port each, with configurable latency, response size, error rates
+and the test server's fault modes. Run on its own it prints the device URLs
+as a JSON line and serves until interrupted:
+
+    python benchmarks/simulator.py --devices 500 --latency lognormal:0.01,0.5
+
+Latency specs: 'fixed:S', 'uniform:LOW,HIGH', 'exp:MEAN' and
+'lognormal:MEDIAN,SIGMA', in seconds.
+"""
+
+import argparse
+import asyncio
+import dataclasses
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from uvicorn.config import Config
+from uvicorn.main import Server
+
+from tests.server import Faults, eapi_response
+from tests.server import app as eapi_app
+
+
+def parse_latency(spec: str) -> Callable[[], float]:
+    """a function returning a latency in seconds, see the module docstring"""
+
+    kind, _, values = spec.partition(":")
+    args = [float(v) for v in values.split(",")] if values else []
+
+    if kind == "fixed":
+        return lambda: args[0]
+    if kind == "uniform":
+        return lambda: random.uniform(args[0], args[1])
+    if kind == "exp":
+        return lambda: random.expovariate(1.0 / args[0])
+    if kind == "lognormal":
+        return lambda: random.lognormvariate(math.log(args[0]), args[1])
+
+    raise ValueError(f"invalid latency '{spec}'")
+
+
+@dataclass
+class Profile:
+    """How the simulated devices behave
+
+    :param latency: latency spec of each eAPI request
+    :param size: bytes of padding added to each result
+    :param error_rate: share of eAPI requests answered '503 Service
+        Unavailable'
+    :param cli_error_rate: share of eAPI requests failing with a command
+        error (1002)
+    :param faults: fault modes of the test server, 'name=value,...' see
+        `tests.server.Faults`
+    """
+
+    latency: str = "fixed:0"
+    size: int = 0
+    error_rate: float = 0.0
+    cli_error_rate: float = 0.0
+    faults: str = ""
+
+
+async def _reply(send, status: int, body: bytes,
+                 content_type: bytes = b"application/json") -> None:
+    await send({"type": "http.response.start", "status": status,
+                "headers": [[b"content-type", content_type]]})
+    await send({"type": "http.response.body", "body": body})
+
+
+def simulator(profile: Profile):
+    """an ASGI app serving eAPI like the test server, shaped by `profile`"""
+
+    latency = parse_latency(profile.latency)
+    padding = "x" * profile.size
+    faults = Faults.parse(profile.faults)
+    if profile.cli_error_rate:
+        faults = dataclasses.replace(faults,
+                                     partial_error=profile.cli_error_rate)
+
+    async def app(scope, receive, send):
+        if scope["type"] != "http" or \
+                not scope["path"].startswith("/command-api"):
+            return await eapi_app(scope, receive, send)
+
+        delay = latency()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        if random.random() < profile.error_rate:
+            return await _reply(send, 503, b"Service Unavailable",
+                                b"text/plain")
+
+        await eapi_response(scope, receive, send, faults, padding)
+
+    return app
+
+
+def bind(devices: int, host: str = "127.0.0.1") -> List[socket.socket]:
+    """a listening socket per device"""
+
+    socks = []
+    for _ in range(devices):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        # inherited by accepted connections, otherwise Nagle delays the
+        # responses on reused connections by ~40ms
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.bind((host, 0))
+        # accept connections as soon as the URLs are out
+        sock.listen(4096)
+        socks.append(sock)
+    return socks
+
+
+def _self_signed(directory: str) -> Tuple[str, str]:
+    key = os.path.join(directory, "key.pem")
+    cert = os.path.join(directory, "cert.pem")
+    subprocess.run(["openssl", "req", "-x509", "-newkey", "rsa:2048",
+                    "-nodes", "-days", "1", "-subj", "/CN=localhost",
+                    "-keyout", key, "-out", cert],
+                   check=True, capture_output=True)
+    return key, cert
+
+
+def server(profile: Profile, tls: bool = False) -> Server:
+    kwargs = {}
+    if tls:
+        kwargs["ssl_keyfile"], kwargs["ssl_certfile"] = \
+            _self_signed(tempfile.mkdtemp())
+
+    config = Config(app=simulator(profile), lifespan="off", loop="asyncio",
+                    # reset faults raise in the app, do not log each one
+                    log_level="critical", backlog=4096, access_log=False,
+                    **kwargs)
+    return Server(config=config)
+
+
+class Simulator:
+    """Runs the simulator in a child process
+
+    >>> with Simulator(devices=100, profile=Profile(latency="fixed:0.01")) \\
+    ...         as targets:
+    ...     ...
+    """
+
+    def __init__(self, devices: int, profile: Optional[Profile] = None,
+                 tls: bool = False):
+        self.devices = devices
+        self.profile = profile or Profile()
+        self.tls = tls
+        self._process: Optional[subprocess.Popen] = None
+
+    def __enter__(self) -> List[str]:
+        cmd = [sys.executable, os.path.abspath(__file__),
+               "--devices", str(self.devices),
+               "--latency", self.profile.latency,
+               "--size", str(self.profile.size),
+               "--error-rate", str(self.profile.error_rate),
+               "--cli-error-rate", str(self.profile.cli_error_rate),
+               "--faults", self.profile.faults]
+        if self.tls:
+            cmd.append("--tls")
+
+        self._process = subprocess.Popen(cmd, stdout=subprocess.PIPE,
+                                         text=True)
+        assert self._process.stdout is not None
+        line = self._process.stdout.readline()
+        if not line:
+            raise RuntimeError("simulator did not start")
+        return json.loads(line)["targets"]
+
+    def __exit__(self, *args) -> None:
+        if self._process is not None:
+            self._process.terminate()
+            self._process.wait()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--devices", type=int, default=100)
+    parser.add_argument("--latency", default="fixed:0")
+    parser.add_argument("--size", type=int, default=0,
+                        help="bytes of padding in each result")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--cli-error-rate", type=float, default=0.0)
+    parser.add_argument("--faults", default="",
+                        help="test server faults, e.g. 'reset=0.1'")
+    parser.add_argument("--tls", action="store_true")
+    args = parser.parse_args(argv)
+
+    profile = Profile(latency=args.latency, size=args.size,
+                      error_rate=args.error_rate,
+                      cli_error_rate=args.cli_error_rate,
+                      faults=args.faults)
+    parse_latency(profile.latency)
+
+    socks = bind(args.devices)
+    scheme = "https" if args.tls else "http"
+    srv = server(profile, tls=args.tls)
+
+    print(json.dumps({"targets": [
+        f"{scheme}://127.0.0.1:{s.getsockname()[1]}" for s in socks]}),
+        flush=True)
+    srv.run(sockets=socks)
+
+
+if __name__ == "__main__":
+    main()
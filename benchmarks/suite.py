@@ -0,0 +1,333 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2024 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+"""
+Benchmark suite
+
+Measures throughput, p50/p99 latency and peak RSS of `Client`,
+`AsyncClient`, `execute`, `aexecute` and `awatch` against simulated
+devices (see `simulator.py`), at several concurrency levels. Each run is a
+fresh process so peak RSS is its own.
+
+    python benchmarks/suite.py --devices 200 --concurrency 1,16,128 \\
+        --latency lognormal:0.005,0.5 --json results.json
+
+Save a run with `--json` and pass it as `--compare` on a later run to flag
+regressions, the exit status is 1 if any. Latencies are of the requests
+that succeeded. A run with failed requests is flagged, and fails the suite
+unless errors were asked for (`--error-rate`, `--faults`).
+"""
+
+import argparse
+import asyncio
+import concurrent.futures
+import itertools
+import json
+import math
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from typing import Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.simulator import Profile, Simulator
+from eapix import api
+from eapix.client import AsyncClient, Client
+from eapix.exceptions import EapiError
+
+AUTH = ("admin", "admin")
+COMMANDS = ["show version"]
+
+# Sample = (seconds, succeeded)
+Sample = Tuple[float, bool]
+
+
+def _timed(func: Callable[[], object]) -> Sample:
+    start = time.perf_counter()
+    try:
+        func()
+    except EapiError:
+        return time.perf_counter() - start, False
+    return time.perf_counter() - start, True
+
+
+async def _atimed(func: Callable) -> Sample:
+    start = time.perf_counter()
+    try:
+        await func()
+    except EapiError:
+        return time.perf_counter() - start, False
+    return time.perf_counter() - start, True
+
+
+def _threads(targets: List[str], args, send: Callable[[str], object]
+             ) -> List[Sample]:
+    jobs = itertools.islice(itertools.cycle(targets), args.requests)
+    lock = threading.Lock()
+
+    def worker() -> List[Sample]:
+        samples = []
+        while True:
+            with lock:
+                target = next(jobs, None)
+            if target is None:
+                return samples
+            samples.append(_timed(lambda: send(target)))
+
+    with concurrent.futures.ThreadPoolExecutor(args.concurrency) as pool:
+        futures = [pool.submit(worker) for _ in range(args.concurrency)]
+        return [s for future in futures for s in future.result()]
+
+
+async def _tasks(targets: List[str], args, send: Callable) -> List[Sample]:
+    jobs = itertools.islice(itertools.cycle(targets), args.requests)
+
+    async def worker() -> List[Sample]:
+        return [await _atimed(lambda: send(target)) for target in jobs]
+
+    results = await asyncio.gather(
+        *[worker() for _ in range(args.concurrency)])
+    return [s for samples in results for s in samples]
+
+
+def bench_client(targets: List[str], args) -> List[Sample]:
+    with Client(auth=AUTH, verify=not args.tls) as client:
+        return _threads(targets, args,
+                        lambda target: client.call(target, COMMANDS))
+
+
+def bench_execute(targets: List[str], args) -> List[Sample]:
+    return _threads(targets, args,
+                    lambda target: api.execute(target, COMMANDS, auth=AUTH,
+                                               verify=not args.tls))
+
+
+def bench_async_client(targets: List[str], args) -> List[Sample]:
+    async def run():
+        async with AsyncClient(auth=AUTH, verify=not args.tls) as client:
+            return await _tasks(targets, args,
+                                lambda target: client.call(target, COMMANDS))
+    return asyncio.run(run())
+
+
+def bench_aexecute(targets: List[str], args) -> List[Sample]:
+    async def run():
+        return await _tasks(
+            targets, args,
+            lambda target: api.aexecute(target, COMMANDS, auth=AUTH,
+                                        verify=not args.tls))
+    return asyncio.run(run())
+
+
+def bench_awatch(targets: List[str], args) -> List[Sample]:
+    """`concurrency` targets watched at once, each for `requests` polls in
+    total, latency is measured per poll"""
+
+    async def run():
+        samples: List[Sample] = []
+
+        async def on_request(request):
+            request.extensions["bench_started"] = time.perf_counter()
+
+        async def on_response(response):
+            started = response.request.extensions["bench_started"]
+            samples.append((time.perf_counter() - started,
+                            response.is_success))
+
+        watched = list(itertools.islice(itertools.cycle(targets),
+                                        args.concurrency))
+        polls = max(1, args.requests // len(watched))
+        interval = 0.01
+
+        async with AsyncClient(auth=AUTH, verify=not args.tls, event_hooks={
+                "request": [on_request], "response": [on_response]}) \
+                as client:
+            channel: asyncio.Queue = asyncio.Queue()
+
+            async def drain():
+                done = 0
+                while done < len(watched):
+                    if await channel.get() is None:
+                        done += 1
+
+            await asyncio.gather(
+                drain(),
+                *[api.awatch(channel, target, COMMANDS[0], interval=interval,
+                             deadline=polls * interval, client=client)
+                  for target in watched])
+
+        return samples
+
+    return asyncio.run(run())
+
+
+SCENARIOS: Dict[str, Callable[[List[str], argparse.Namespace],
+                              List[Sample]]] = {
+    "client": bench_client,
+    "execute": bench_execute,
+    "async_client": bench_async_client,
+    "aexecute": bench_aexecute,
+    "awatch": bench_awatch,
+}
+
+
+def _measure(args) -> dict:
+    """runs one scenario in this process, returns its result"""
+
+    with open(args.targets_file) as fh:
+        targets = json.load(fh)
+
+    start = time.perf_counter()
+    samples = SCENARIOS[args.scenario](targets, args)
+    seconds = time.perf_counter() - start
+
+    # failures are not timed as results
+    latencies = sorted(latency for latency, ok in samples if ok)
+    centiles = statistics.quantiles(latencies, n=100) \
+        if len(latencies) > 1 else (latencies or [math.nan]) * 99
+
+    return {
+        "scenario": args.scenario,
+        "concurrency": args.concurrency,
+        "requests": len(samples),
+        "errors": sum(1 for _, ok in samples if not ok),
+        "seconds": seconds,
+        "throughput": len(samples) / seconds,
+        "p50": centiles[49],
+        "p99": centiles[98],
+        # kilobytes on Linux
+        "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def _error_rate(result: dict) -> float:
+    return result["errors"] / result["requests"] if result["requests"] \
+        else 0.0
+
+
+def _compare(results: List[dict], baseline: List[dict],
+             tolerance: float) -> List[str]:
+    """the regressions of `results` against `baseline`"""
+
+    previous = {(r["scenario"], r["concurrency"]): r for r in baseline}
+    regressions = []
+    for result in results:
+        base = previous.get((result["scenario"], result["concurrency"]))
+        if base is None:
+            continue
+
+        name = f"{result['scenario']} x{result['concurrency']}"
+        if _error_rate(result) > _error_rate(base) * (1 + tolerance):
+            regressions.append(
+                f"{name}: {result['errors']} of {result['requests']} "
+                f"requests failed, was {base['errors']}")
+        if result["throughput"] < base["throughput"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: throughput {result['throughput']:.0f}/s, "
+                f"was {base['throughput']:.0f}/s")
+        for key in ("p99", "rss_mb"):
+            if result[key] > base[key] * (1 + tolerance):
+                regressions.append(f"{name}: {key} {result[key]:.3f}, "
+                                   f"was {base[key]:.3f}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--devices", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=2000,
+                        help="requests in each run")
+    parser.add_argument("--concurrency", default="1,16,128",
+                        help="comma separated levels")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--latency", default="fixed:0.005",
+                        help="device latency, see simulator.py")
+    parser.add_argument("--size", type=int, default=0,
+                        help="bytes of padding in each result")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--cli-error-rate", type=float, default=0.0)
+    parser.add_argument("--faults", default="",
+                        help="test server faults, see bench_faults.py")
+    parser.add_argument("--tls", action="store_true")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--compare", help="results of an earlier run")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed change before flagging a regression")
+    # a single run, in a child process
+    parser.add_argument("--scenario", help=argparse.SUPPRESS)
+    parser.add_argument("--targets-file", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.scenario:
+        args.concurrency = int(args.concurrency)
+        print(json.dumps(_measure(args)))
+        return 0
+
+    profile = Profile(latency=args.latency, size=args.size,
+                      error_rate=args.error_rate,
+                      cli_error_rate=args.cli_error_rate,
+                      faults=args.faults)
+
+    results = []
+    failed: List[str] = []
+    with Simulator(args.devices, profile, tls=args.tls) as targets, \
+            tempfile.NamedTemporaryFile("w", suffix=".json") as fh:
+        json.dump(targets, fh)
+        fh.flush()
+
+        print(f"{len(targets)} devices, {args.requests} requests per run, "
+              f"latency {args.latency}")
+        print(f"{'scenario':<14} {'conc':>5} {'req/s':>9} {'p50 ms':>8} "
+              f"{'p99 ms':>8} {'errors':>7} {'rss MB':>7}")
+
+        for scenario in args.scenarios.split(","):
+            for concurrency in args.concurrency.split(","):
+                child = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__),
+                     "--scenario", scenario, "--concurrency", concurrency,
+                     "--requests", str(args.requests),
+                     "--targets-file", fh.name]
+                    + (["--tls"] if args.tls else []),
+                    check=True, capture_output=True, text=True)
+                result = json.loads(child.stdout.splitlines()[-1])
+                results.append(result)
+                print(f"{scenario:<14} {concurrency:>5} "
+                      f"{result['throughput']:>9.0f} "
+                      f"{result['p50'] * 1e3:>8.1f} "
+                      f"{result['p99'] * 1e3:>8.1f} "
+                      f"{result['errors']:>7} {result['rss_mb']:>7.1f}")
+                if result["errors"]:
+                    failed.append(f"{scenario} x{concurrency}: "
+                                  f"{result['errors']} of "
+                                  f"{result['requests']} requests failed")
+
+    if args.json:
+        with open(args.json, "w") as out:
+            json.dump(results, out, indent=2)
+
+    # errors that were not injected are the suite's, not the devices'
+    expected = args.error_rate > 0 or bool(args.faults)
+    for failure in failed:
+        print(f"{'ERRORS' if expected else 'FAILED'} {failure}")
+    status = 1 if failed and not expected else 0
+
+    if args.compare:
+        with open(args.compare) as fh_:
+            regressions = _compare(results, json.load(fh_), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            status = 1
+
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
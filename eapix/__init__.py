@@ -11,6 +11,7 @@ __version__ = "0.9.0"
 
 from eapix.api import (
     aexecute,
+    aexecute_many,
     awatch,
     configure,
     execute,
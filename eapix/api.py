@@ -3,17 +3,24 @@
 # Arista Networks, Inc. Confidential and Proprietary.
 
 import asyncio
+import contextlib
 import math
-import re
 import time
 
-from typing import Callable, Iterator, List, Optional, Union
+from typing import (
+    AsyncIterator, Callable, Iterable, Iterator, Optional, Union)
 
 from eapix.version import __version__
-from eapix.types import Auth, Certificate, Command, CommandList, EapiOptions
-from eapix.response import Response
-from eapix.client import Client, AsyncClient
-from eapix.environment import EAPI_DEFAULT_FORMAT
+from eapix.types import (
+    Auth, Certificate, Command, CommandList, EapiOptions, Target)
+from eapix.exceptions import EapiError
+from eapix.response import Response, StreamResponse
+from eapix.client import AsyncClient
+from eapix.fleet import Fleet
+from eapix.registry import ClientRegistry, default_registry
+from eapix.scheduler import ticker
+from eapix.conditions import ConditionLike, compile_condition
+from eapix.environment import EAPI_DEFAULT_FORMAT, EAPI_FLEET_CONCURRENCY
 
 NEVER_RE: str = r'(?!x)x'
 EAPI_WATCH_INTERVAL: int = 2
@@ -37,8 +44,9 @@ def execute(target: str,
             expand_aliases: bool = False,
             include_error_detail: bool = False,
             timestamps: bool = False,
-            streaming: bool = False
-        ) -> Response:
+            streaming: bool = False,
+            registry: Optional[ClientRegistry] = None
+            ) -> Union[Response, StreamResponse]:
     """Send an eAPI request
 
     :param target: eAPI target
@@ -63,18 +71,29 @@ def execute(target: str,
     :param type: bool
     :param timestamps:
     :param type: bool
-    :param streaming:
+    :param streaming: decode results as the device sends them
     :param type: bool
+    :param registry: keeps clients open between calls (default: process-wide
+        registry)
+    :param type: ClientRegistry
 
-    :return: :class:`Response <Response>` object
+    :return: :class:`Response <Response>` object, or an iterable
+        :class:`StreamResponse <StreamResponse>` when streaming
     :rtype: eapi.messages.Response
     """
 
     if enable:
         commands.insert(0, Command(cmd="enable", input=secret))
 
-    with Client(auth=auth, cert=cert, verify=verify) as sess:
-        return sess.call(target, commands, EapiOptions(
+    if registry is None:
+        registry = default_registry
+
+    borrowed = contextlib.ExitStack()
+    sess = borrowed.enter_context(
+        registry.client(target, auth=auth, cert=cert, verify=verify))
+
+    try:
+        response = sess.call(target, commands, EapiOptions(
             encoding=encoding,
             timestamps=timestamps,
             auto_complete=auto_complete,
@@ -82,8 +101,20 @@ def execute(target: str,
             include_error_detail=include_error_detail,
             streaming=streaming
         ))
+    except BaseException:
+        borrowed.close()
+        raise
+
+    if isinstance(response, StreamResponse):
+        # keep the client borrowed (not evicted) until the body is released
+        response.on_close(borrowed.close)
+    else:
+        borrowed.close()
+
+    return response
 
-def configure(target: str, commands: CommandList, *args, **kwargs) -> Response:
+def configure(target: str, commands: CommandList, *args,
+              **kwargs) -> Union[Response, StreamResponse]:
     """Wrap commands in a 'configure'/'end' block
 
     :return: :class:`Response <Response>` object
@@ -101,7 +132,7 @@ def watch(target: str,
           interval: Optional[int] = EAPI_WATCH_INTERVAL,
           deadline: Optional[float] = EAPI_WATCH_DEADLINE,
           exclude: bool = False,
-          condition: Optional[str] = NEVER_RE,
+          condition: ConditionLike = NEVER_RE,
           *args, **kwargs) -> Optional[Iterator[Response]]:
     """Watch a command until deadline or condition matches
 
@@ -119,7 +150,11 @@ def watch(target: str,
     :param type: float
     :param exclude: return if condition patter is NOT matched
     :param type: bool
-    :param condition: search for pattern in output, return if matched
+    :param condition: search for pattern in output, return if matched. May
+        also be a compiled pattern or a callable taking the response, see
+        ``eapix.conditions``. For JSON results use a
+        ``eapix.conditions.Match``, a pattern is searched in each result
+        rendered as text
     :param type: str
 
     :param **kwargs: Optional arguments that ``execute`` takes.
@@ -131,13 +166,16 @@ def watch(target: str,
     matched: bool = False
 
     exclude = bool(exclude)
+    condition = compile_condition(condition)
 
     start = time.time()
     check = start
 
     while (check - deadline) < start:
         response = execute(target, [command], *args, **kwargs)
-        match = re.search(condition, str(response))
+        if isinstance(response, StreamResponse):
+            response = response.read()
+        match = condition(response)
 
         if exclude and not match:
             matched = True
@@ -165,7 +203,9 @@ async def aexecute(target: str,
                    expand_aliases: bool = False,
                    include_error_detail: bool = False,
                    timestamps: bool = False,
-                   streaming: bool = False) -> None:
+                   streaming: bool = False,
+                   client: Optional[AsyncClient] = None
+                   ) -> Union[Response, StreamResponse]:
     """Send command(s) to an eAPI target (async version)
 
     :param channel: results channel
@@ -192,27 +232,104 @@ async def aexecute(target: str,
     :param type: bool
     :param timestamps:
     :param type: bool
-    :param streaming:
+    :param streaming: decode results as the device sends them
     :param type: bool
+    :param client: send with an existing client instead of a new one. `auth`,
+        `cert` and `verify` are ignored when set
+    :param type: AsyncClient
 
-    :return: :class:`Response <Response>` object
+    :return: :class:`Response <Response>` object, or an async iterable
+        :class:`StreamResponse <StreamResponse>` when streaming
     :rtype: eapi.messages.Response
     """
 
     if enable:
         commands.insert(0, Command(cmd="enable", input=secret))
 
-    async with AsyncClient(auth=auth, cert=cert, verify=verify) as sess:
-        response = await sess.call(target, commands, EapiOptions(
-            encoding=encoding,
-            timestamps=timestamps,
-            auto_complete=auto_complete,
-            expand_aliases=expand_aliases,
-            include_error_detail=include_error_detail,
-            streaming=streaming
-        ))
+    options = EapiOptions(
+        encoding=encoding,
+        timestamps=timestamps,
+        auto_complete=auto_complete,
+        expand_aliases=expand_aliases,
+        include_error_detail=include_error_detail,
+        streaming=streaming
+    )
+
+    if client is not None:
+        return await client.call(target, commands, options)
+
+    sess = AsyncClient(auth=auth, cert=cert, verify=verify)
+
+    try:
+        response = await sess.call(target, commands, options)
+    except BaseException:
+        await sess.close()
+        raise
+
+    if isinstance(response, StreamResponse):
+        # the client must outlive the stream
+        response.on_close(sess.close)
+    else:
+        await sess.close()
+
+    return response
+
+
+async def aexecute_many(targets: Iterable[Union[str, Target]],
+                        commands: CommandList,
+                        auth: Optional[Auth] = None,
+                        encoding: str = EAPI_DEFAULT_FORMAT,
+                        enable: bool = False,
+                        secret: str = "",
+                        cert: Optional[Certificate] = None,
+                        verify: bool = False,
+                        auto_complete: bool = False,
+                        expand_aliases: bool = False,
+                        include_error_detail: bool = False,
+                        timestamps: bool = False,
+                        streaming: bool = False,
+                        concurrency: int = EAPI_FLEET_CONCURRENCY,
+                        return_exceptions: bool = False
+                        ) -> AsyncIterator[Union[Response, EapiError]]:
+    """Send command(s) to many eAPI targets, yielding responses as they
+    complete
+
+    All targets share one connection pool and at most `concurrency` requests
+    are in flight at once.
+
+    :param targets: eAPI targets
+    :param type: Iterable
+    :param commmands: List of commands to send to each target
+    :param type: list
+    :param concurrency: maximum number of in-flight requests
+    :param type: int
+    :param return_exceptions: yield failures instead of raising them
+    :param type: bool
+
+    See ``aexecute`` for the remaining parameters.
+
+    :return: iterator of :class:`Response <Response>` objects
+    :rtype: AsyncIterator
+    """
 
-        return response
+    if enable:
+        commands = [Command(cmd="enable", input=secret)] + list(commands)
+
+    options = EapiOptions(
+        encoding=encoding,
+        timestamps=timestamps,
+        auto_complete=auto_complete,
+        expand_aliases=expand_aliases,
+        include_error_detail=include_error_detail,
+        streaming=streaming
+    )
+
+    async with Fleet(concurrency=concurrency, auth=auth, cert=cert,
+                     verify=verify) as fleet:
+        async for response in fleet.execute(
+                targets, commands, options,
+                return_exceptions=return_exceptions):
+            yield response
 
 async def aconfigure(channel: asyncio.Queue, target: str, commands: CommandList,
                      *args, **kwargs):
@@ -240,8 +357,9 @@ async def awatch(channel: asyncio.Queue,
                  interval: Optional[int] = EAPI_WATCH_INTERVAL,
                  deadline: Optional[float] = EAPI_WATCH_DEADLINE,
                  exclude: bool = False,
-                 condition: Optional[str] = NEVER_RE,
-                 *args, **kwargs):
+                 condition: ConditionLike = NEVER_RE,
+                 jitter: float = 0.0,
+                 **kwargs):
 
     """Watch a command until deadline or condition matches (async version)
 
@@ -259,39 +377,60 @@ async def awatch(channel: asyncio.Queue,
     :param type: float
     :param exclude: return if condition patter is NOT matched
     :param type: bool
-    :param condition: search for pattern in output, return if matched
+    :param condition: search for pattern in output, return if matched. May
+        also be a compiled pattern or a callable taking the response, see
+        ``eapix.conditions``. For JSON results use a
+        ``eapix.conditions.Match``, a pattern is searched in each result
+        rendered as text
     :param type: str
-    :param **kwargs: optional arguments that ``execute`` takes.
+    :param jitter: delay each poll by a random 0 to `jitter` seconds
+    :param type: float
+    :param **kwargs: optional arguments that ``aexecute`` takes.
     """
 
-    # rsp_chan = asyncio.Queue()
-    response: Response
+    response: Union[Response, StreamResponse]
 
     matched: bool = False
 
     exclude = bool(exclude)
+    condition = compile_condition(condition)
+
+    # polls are sent at a fixed rate over one client, so a slow response does
+    # not delay the following polls and connections are reused
+    client = kwargs.pop("client", None)
+    owns_client = client is None
+
+    if owns_client:
+        client = AsyncClient(auth=kwargs.get("auth"),
+                             cert=kwargs.get("cert"),
+                             verify=kwargs.get("verify", False))
+
+    if interval is None:
+        interval = EAPI_WATCH_INTERVAL
+    if deadline is None:
+        # watch until the condition matches
+        deadline = math.inf
+
+    try:
+        async for _ in ticker(interval, deadline, jitter):
+            response = await aexecute(target, [command], client=client,
+                                      **kwargs)
+            if isinstance(response, StreamResponse):
+                response = await response.aread()
+
+            match = condition(response)
+
+            if exclude and not match:
+                matched = True
+            elif match:
+                matched = True
+
+            await channel.put((response, matched))
+
+            if matched:
+                break
+    finally:
+        if owns_client:
+            await client.close()
 
-    start = time.time()
-    check = start
-
-    while (check - deadline) < start:
-        response = await aexecute(target, [command], *args, **kwargs)
-
-        match = re.search(condition, str(response))
-
-        if exclude and not match:
-            matched = True
-        elif match:
-            matched = True
-
-        # await callback(response, matched)
-        await channel.put((response, matched))
-
-        if matched:  
-            break
-
-        time.sleep(interval)
-        check = time.time()
-    
-    # await rsp_chan.put(None)
     await channel.put(None)
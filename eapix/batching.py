@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2024 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+"""
+Micro-batching of `show` requests
+
+`runCmds` takes any number of commands, so independent `show` requests to
+the same target that arrive within a few milliseconds of each other can be
+sent as one request. The combined `result` is split back into one JSON-RPC
+response per caller.
+
+eAPI stops at the first failing command. The request that contained it gets
+the error (with the results of its commands up to the failure), requests
+before it get their results, and requests after it are sent again on their
+own.
+"""
+
+import asyncio
+import re
+import uuid
+
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+import eapix.codec
+import eapix.environment
+
+Send = Callable[[dict], Awaitable[dict]]
+
+_SHOW_RE = re.compile(r"^\s*show\b", re.IGNORECASE)
+_FAILED_RE = re.compile(r"^CLI command \d+ of \d+")
+
+
+def batchable(request: dict) -> bool:
+    """all commands are `show` commands, without input"""
+    return all(_SHOW_RE.match(cmd["cmd"]) and not cmd.get("input")
+               for cmd in request["params"]["cmds"])
+
+
+class _Batch:
+    __slots__ = ("send", "entries", "size", "timer")
+
+    def __init__(self, send: Send):
+        self.send = send
+        self.entries: List[Tuple[dict, asyncio.Future]] = []
+        # commands in the batch
+        self.size = 0
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+
+def _split(requests: List[dict], body: dict) -> List[Optional[dict]]:
+    """one response body per request, None for those that did not run"""
+
+    error: dict = body.get("error") or {}
+    if error and "data" not in error:
+        # the batch itself was rejected
+        return [body for _ in requests]
+
+    results = error["data"] if error else body["result"]
+    # index of the failed command
+    failed = len(results) - 1 if error else len(results)
+
+    bodies: List[Optional[dict]] = []
+    offset = 0
+    for request in requests:
+        count = len(request["params"]["cmds"])
+        end = offset + count
+
+        if end <= failed:
+            bodies.append({"jsonrpc": "2.0", "id": request["id"],
+                           "result": results[offset:end]})
+        elif offset <= failed:
+            # renumber 'CLI command 5 of 7 ...' for this request
+            message = _FAILED_RE.sub(
+                f"CLI command {failed - offset + 1} of {count}",
+                error["message"])
+            bodies.append({"jsonrpc": "2.0", "id": request["id"],
+                           "error": dict(error, message=message,
+                                         data=results[offset:failed + 1])})
+        else:
+            bodies.append(None)
+
+        offset = end
+
+    return bodies
+
+
+class Batcher:
+    """Combines `show` requests to the same target into one `runCmds`
+
+    :param window: seconds to wait for more requests after the first
+    :param type: float
+    :param size: maximum commands in one batch
+    :param type: int
+    """
+
+    def __init__(self,
+                 window: float = eapix.environment.EAPI_BATCH_WINDOW,
+                 size: int = eapix.environment.EAPI_BATCH_SIZE):
+
+        self.window = window
+        self.size = size
+        self._batches: Dict[tuple, _Batch] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+    def key(self, target: str, request: dict) -> tuple:
+        """requests are only batched with ones that share all other params"""
+        params = {k: v for k, v in request["params"].items() if k != "cmds"}
+        return (target, eapix.codec.dumps(params))
+
+    async def submit(self, key: tuple, request: dict, send: Send) -> dict:
+        """add `request` to the open batch for `key`, returns its response
+
+        :param send: sends a request, returns the decoded response
+        """
+
+        count = len(request["params"]["cmds"])
+
+        batch = self._batches.get(key)
+        if batch is not None and batch.size + count > self.size:
+            self._flush(key)
+            batch = None
+
+        if batch is None:
+            batch = self._batches[key] = _Batch(send)
+            batch.timer = asyncio.get_running_loop().call_later(
+                self.window, self._flush, key)
+
+        future = asyncio.get_running_loop().create_future()
+        batch.entries.append((request, future))
+        batch.size += count
+
+        if batch.size >= self.size:
+            self._flush(key)
+
+        return await future
+
+    def _flush(self, key: tuple) -> None:
+        batch = self._batches.pop(key, None)
+        if batch is None:
+            return
+
+        if batch.timer is not None:
+            batch.timer.cancel()
+
+        task = asyncio.ensure_future(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: _Batch) -> None:
+        requests = [request for request, _ in batch.entries]
+        futures = [future for _, future in batch.entries]
+
+        if len(requests) == 1:
+            combined = requests[0]
+        else:
+            combined = dict(requests[0], id=str(uuid.uuid4()))
+            combined["params"] = dict(
+                requests[0]["params"],
+                cmds=[cmd for request in requests
+                      for cmd in request["params"]["cmds"]])
+
+        try:
+            bodies = _split(requests, await batch.send(combined))
+        except asyncio.CancelledError:
+            for future in futures:
+                future.cancel()
+            raise
+        except Exception as exc:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        # requests after a failed command did not run, send them alone
+        async def resend(request: dict, future: asyncio.Future) -> None:
+            try:
+                body = await batch.send(request)
+            except Exception as exc:
+                if not future.done():
+                    future.set_exception(exc)
+            else:
+                if not future.done():
+                    future.set_result(body)
+
+        pending = []
+        for request, future, body in zip(requests, futures, bodies):
+            if body is None:
+                pending.append(resend(request, future))
+            elif not future.done():
+                future.set_result(body)
+
+        await asyncio.gather(*pending)
+
+    async def close(self) -> None:
+        """send the open batches and wait for them"""
+        for key in list(self._batches):
+            self._flush(key)
+        await asyncio.gather(*self._tasks, return_exceptions=True)
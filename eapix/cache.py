@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2024 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+"""
+Short lived response cache
+
+`ResponseCache` keeps recent successful responses to `show` commands for a
+few seconds so repeated calls for slowly changing data (`show version`,
+`show inventory`) do not reach the switch. Requests containing anything
+other than `show` commands (or `enable` without input) are never cached.
+
+>>> cache = ResponseCache(ttl=5.0, ttls={"show version": 300.0})
+>>> client = Client(auth=("admin", ""), cache=cache)
+"""
+
+import collections
+import copy
+import re
+import threading
+import time
+
+from typing import (Any, Callable, Dict, Hashable, Mapping, Optional,
+                    OrderedDict, Tuple)
+
+import eapix.codec
+import eapix.environment
+import eapix.schemas
+from eapix.response import Response
+from eapix.schemas import normalize
+from eapix.types import Target
+
+CacheKey = Tuple[str, bytes, Hashable]
+
+_SHOW_RE = re.compile(r"^\s*show\b", re.IGNORECASE)
+_ENABLE_RE = re.compile(r"^\s*enable\s*$", re.IGNORECASE)
+_CONFIGURE_RE = re.compile(r"\bconfigure\b", re.IGNORECASE)
+
+
+def cacheable(cmd: dict) -> bool:
+    """the prepared command only reads state"""
+
+    if _CONFIGURE_RE.search(cmd["cmd"]):
+        return False
+
+    if _ENABLE_RE.match(cmd["cmd"]):
+        return not cmd.get("input")
+
+    return bool(_SHOW_RE.match(cmd["cmd"]))
+
+
+class ResponseCache:
+    """An LRU cache of responses with per-command TTLs
+
+    A request is kept for the shortest TTL of its commands. Each caller gets
+    its own copy of a cached response.
+
+    :param maxsize: responses kept, the least recently used are evicted
+    :param type: int
+    :param ttl: seconds a response is kept, 0 disables caching
+    :param type: float
+    :param ttls: seconds by command, overrides `ttl`
+    :param type: dict
+    """
+
+    def __init__(self,
+                 maxsize: int = eapix.environment.EAPI_CACHE_SIZE,
+                 ttl: float = eapix.environment.EAPI_CACHE_TTL,
+                 ttls: Optional[Mapping[str, float]] = None,
+                 clock: Callable[[], float] = time.monotonic):
+
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.ttls: Dict[str, float] = {
+            normalize(cmd): ttl_ for cmd, ttl_ in (ttls or {}).items()}
+        self._clock = clock
+        self._entries: OrderedDict[CacheKey, Tuple[float, Response]] = \
+            collections.OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def ttl_for(self, request: dict) -> float:
+        """seconds to keep the response to `request`, 0 if not cacheable"""
+
+        ttl = None
+        for cmd in request["params"]["cmds"]:
+            if not cacheable(cmd):
+                return 0.0
+
+            cmd_ttl = self.ttls.get(normalize(cmd["cmd"]), self.ttl)
+            ttl = cmd_ttl if ttl is None else min(ttl, cmd_ttl)
+
+        return ttl or 0.0
+
+    def _key(self, target: Target, request: dict, schemas) -> CacheKey:
+        # the request id differs on every call, the params do not
+        return (target.to_url(), eapix.codec.dumps(request["params"]),
+                eapix.schemas.key(schemas))
+
+    @staticmethod
+    def _copy(response: Response) -> Response:
+        # the target is immutable and shared
+        memo: Dict[int, Any] = {id(response.target): response.target}
+        return copy.deepcopy(response, memo)
+
+    def get(self, target: Target, request: dict,
+            schemas=None) -> Optional[Response]:
+        """the cached response to `request`, if still fresh"""
+
+        if self.ttl_for(request) <= 0:
+            return None
+
+        key = self._key(target, request, schemas)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= self._clock():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            response = entry[1]
+
+        return self._copy(response)
+
+    def put(self, target: Target, request: dict, response: Response,
+            schemas=None) -> None:
+        """keep a successful `response` to `request`"""
+
+        ttl = self.ttl_for(request)
+        if ttl <= 0 or self.maxsize < 1 or response.code != 0:
+            return
+
+        key = self._key(target, request, schemas)
+        response = self._copy(response)
+
+        with self._lock:
+            self._entries[key] = (self._clock() + ttl, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, target: Optional[Target] = None) -> None:
+        """drop the responses of `target`, or all of them"""
+
+        with self._lock:
+            if target is None:
+                self._entries.clear()
+                return
+
+            url = target.to_url()
+            for key in [key for key in self._entries if key[0] == url]:
+                del self._entries[key]
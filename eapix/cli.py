@@ -3,6 +3,7 @@
 # Arista Networks, Inc. Confidential and Proprietary.
 
 import asyncio
+import json
 import sys
 
 import click
@@ -13,6 +14,7 @@ import eapix.environment
 import eapix.types
 
 from eapix import util
+from eapix.response import StreamResponse
 
 @click.group()
 @click.option("--targets", "-t", multiple=True, help="specifies targets")
@@ -65,45 +67,36 @@ def main(ctx,
 
 @main.command()
 @click.argument("commands", nargs=-1, required=True)
+@click.option("--concurrency", "-n", type=int,
+              default=eapix.environment.EAPI_FLEET_CONCURRENCY,
+              help="Maximum number of targets to query at once")
 @click.pass_context
-def execute(ctx, commands):
+def execute(ctx, commands, concurrency):
     targets = ctx.obj["targets"]
-    
-    loop = asyncio.get_event_loop()
 
-    async def _consumer(channel):
-        while True:
-            rsp = await channel.get()
-
-            if rsp is None:
-                break
-
-            if ctx.obj["args"]["encoding"] == "json":
+    async def _run():
+        async for rsp in eapix.aexecute_many(targets,
+                                             list(commands),
+                                             concurrency=concurrency,
+                                             return_exceptions=True,
+                                             **ctx.obj["args"]):
+            if isinstance(rsp, Exception):
+                print(f"{rsp.target}: {rsp!r}")
+            elif isinstance(rsp, StreamResponse):
+                # print each result as soon as the device sends it
+                async for elem in rsp:
+                    if ctx.obj["args"]["encoding"] == "json":
+                        print(json.dumps(elem.to_dict()))
+                    else:
+                        print(f"{rsp.target}: {elem.command['cmd']}")
+                        print(elem.result.pretty)
+            elif ctx.obj["args"]["encoding"] == "json":
                 print(rsp.json)
             else:
                 print(rsp.pretty)
-  
-    async def _run(channel):
-        tasks = []
-
-        asyncio.create_task(_consumer(channel))
-
-        for target in targets:
-            tasks.append(eapix.aexecute(
-                    channel,
-                    target,
-                    commands,
-                    **ctx.obj["args"]
-                ))
-
-        await asyncio.gather(*tasks)
-        #await util.gather_with_exceptions(*tasks)
-        await channel.put(None)
-
-    channel = asyncio.Queue()
 
     try:
-        loop.run_until_complete(_run(channel))
+        asyncio.run(_run())
     except Exception as exc:
         print(repr(exc))
 
@@ -2,22 +2,47 @@
 # Copyright (c) 2024 Arista Networks, Inc.  All rights reserved.
 # Arista Networks, Inc. Confidential and Proprietary.
 
-import json
+import asyncio
+import contextlib
+import logging
+import math
+import time
 import warnings
+import weakref
 
-from typing import Dict, Optional, Union, Type
+from typing import (
+    Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, Iterator, Mapping,
+    Optional, Set, Tuple, TypeVar, Union, Type)
 
 import httpx
 
+import eapix.codec
 import eapix.environment
+import eapix.schemas
+import eapix.tracing
 from eapix.types import EapiOptions
 
 from eapix.util import prepare_request
 
 from eapix.exceptions import (
     EapiAuthenticationFailure,
+    EapiConnectionError,
     EapiError,
-    EapiPathNotFoundError)
+    EapiHttpError,
+    EapiPathNotFoundError,
+    EapiTimeoutError)
+from eapix.batching import Batcher, batchable
+from eapix.cache import ResponseCache
+from eapix.limits import Limiter
+from eapix.metrics import Measurement, Metrics
+from eapix.tracing import Export, phase, traced
+from eapix.resilience import (
+    CircuitBreaker,
+    RetryPolicy,
+    acall_with_retry,
+    call_with_retry,
+    is_failure,
+    is_idempotent)
 
 from eapix.types import (
     Auth,
@@ -26,32 +51,262 @@ from eapix.types import (
     Target
 )
 
-from eapix.response import Response
+from eapix.response import Response, StreamResponse
+from eapix.schemas import Schema
+from eapix.resolver import DnsCache, use_dns_cache
+from eapix.sessions import SessionStore
+from eapix.transport import AsyncTargetPoolTransport, TargetPoolTransport
+
+log = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+# httpx options that do not apply to a unix socket client
+_TRANSPORT_OPTIONS = ("transport", "mounts", "limits", "proxy", "base_url",
+                      "verify", "cert", "http2", "cookies")
+
+# unix sockets are posted to as 'localhost', their cookies are set for it
+_SOCKET_HOST = "localhost"
+_SOCKET_DOMAIN = "localhost.local"
+
+
+def _cookie_domain(target: Target) -> str:
+    """the domain session cookies of `target` are kept under"""
+    return _SOCKET_DOMAIN if target.transport == "unix" else target.fqdn
+
+
+def _session_key(target: Target) -> str:
+    """the key of `target`'s sessions in a `SessionStore`"""
+    return f"{target.fqdn}:{target.port}" if target.port else target.fqdn
+
+
+def _eapi_error(exc: httpx.HTTPError) -> EapiError:
+    """classify a `httpx` error"""
+
+    if isinstance(exc, httpx.TimeoutException):
+        return EapiTimeoutError(str(exc))
+
+    if isinstance(exc, (httpx.NetworkError, httpx.RemoteProtocolError)):
+        return EapiConnectionError(str(exc))
+
+    return EapiError(str(exc))
+
+
+def _iter_bytes(response: httpx.Response,
+                measurement: Optional[Measurement] = None) -> Iterator[bytes]:
+    try:
+        yield from response.iter_bytes()
+    except httpx.HTTPError as exc:
+        error = _eapi_error(exc)
+        if measurement is not None:
+            measurement.failed(error, response)
+        raise error from exc
+
+
+async def _aiter_bytes(response: httpx.Response,
+                       measurement: Optional[Measurement] = None
+                       ) -> AsyncIterator[bytes]:
+    try:
+        async for chunk in response.aiter_bytes():
+            yield chunk
+    except httpx.HTTPError as exc:
+        error = _eapi_error(exc)
+        if measurement is not None:
+            measurement.failed(error, response)
+        raise error from exc
+
 
 class BaseClient:
+    """Shared setup of `Client` and `AsyncClient`
+
+    Connection pool options, defaults come from `eapix.environment`:
+
+    :param max_connections: connections open at once, to all targets
+    :param type: int
+    :param max_keepalive_connections: idle connections kept for reuse. Keep
+        this near the number of targets polled so each poll cycle reuses
+        warm (TLS) connections
+    :param type: int
+    :param keepalive_expiry: seconds an idle connection is kept. Keep this
+        above the poll interval
+    :param type: float
+    :param max_connections_per_target: connections to a single target. When
+        set, each target gets its own pool of this size (see
+        `eapix.transport`) and `max_connections` and
+        `max_keepalive_connections` do not apply. Use this when keeping
+        connections to many targets alive. An `AsyncClient` also caps the
+        requests in flight to each target at this, a fixed cap that does
+        not adapt (pass a `limiter` for that)
+    :param type: int
+    :param dns_cache: resolves the targets' host names, a `DnsCache` with
+        `EAPI_DNS_TTL` by default
+    :param type: DnsCache
+    :param http2: negotiate HTTP/2 with targets that support it, requires
+        the 'h2' package. All requests to a target then share one connection
+    :param type: bool
+    :param metrics: records latency, bytes, retries and errors of the
+        requests, see `eapix.metrics`. Nothing is recorded without one
+    :param type: Metrics
+    :param tracer: called with the spans of each call's phases, see
+        `eapix.tracing`. Calls are not traced without one
+    :param type: callable
+    """
 
     def __init__(self,
                  klass: Type[Union[httpx.Client, httpx.AsyncClient]],
                  auth: Optional[Auth] = None,
                  cert: Optional[Certificate] = None,
                  verify: Optional[bool] = None,
+                 retry: Optional[RetryPolicy] = None,
+                 breaker: Optional[CircuitBreaker] = None,
+                 cache: Optional[ResponseCache] = None,
+                 max_connections: Optional[int] = None,
+                 max_keepalive_connections: Optional[int] = None,
+                 keepalive_expiry: Optional[float] = None,
+                 max_connections_per_target: Optional[int] = None,
+                 http2: Optional[bool] = None,
+                 session_store: Optional[SessionStore] = None,
+                 dns_cache: Optional[DnsCache] = None,
+                 metrics: Optional[Metrics] = None,
+                 tracer: Optional[Export] = None,
                  **kwargs):
 
         if verify is None:
             verify = eapix.environment.SSL_VERIFY
 
+        if http2 is None:
+            http2 = eapix.environment.EAPI_HTTP2
+
+        if keepalive_expiry is None:
+            keepalive_expiry = eapix.environment.EAPI_KEEPALIVE_EXPIRY
+
+        if dns_cache is None and eapix.environment.EAPI_DNS_TTL > 0:
+            dns_cache = DnsCache()
+        self.dns_cache = dns_cache
+
+        # a transport passed in is used as is
+        own_transport = "transport" not in kwargs
+
+        if max_connections_per_target is not None and own_transport:
+            # a pool per target, each capped at `max_connections_per_target`
+            transport = TargetPoolTransport if klass is httpx.Client \
+                else AsyncTargetPoolTransport
+            kwargs["transport"] = transport(
+                httpx.Limits(max_connections=max_connections_per_target,
+                             max_keepalive_connections=(
+                                 max_connections_per_target),
+                             keepalive_expiry=keepalive_expiry),
+                dns_cache=dns_cache, verify=verify, cert=cert, http2=http2)
+            own_transport = False
+        elif "limits" not in kwargs:
+            # an explicit `httpx.Limits` wins
+            kwargs["limits"] = httpx.Limits(
+                max_connections=max_connections
+                if max_connections is not None
+                else eapix.environment.EAPI_MAX_CONNECTIONS,
+                max_keepalive_connections=max_keepalive_connections
+                if max_keepalive_connections is not None
+                else eapix.environment.EAPI_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=keepalive_expiry)
+
         # use a httpx client to manage state
         self._client = klass(
             auth=auth,
             cert=cert,
             headers={"Content-Type": "application/json"},
             verify=verify,
+            http2=http2,
             **kwargs
         )
 
+        if own_transport and dns_cache is not None:
+            use_dns_cache(self._client._transport, dns_cache)
+
+        # a client per unix socket ('unix://' targets), sharing the cookies
+        # and the other options of `_client`. No TLS, no TCP
+        self._klass = klass
+        self._socket_options = {
+            k: v for k, v in kwargs.items() if k not in _TRANSPORT_OPTIONS}
+        self._socket_options.update(
+            auth=auth, headers={"Content-Type": "application/json"})
+        self._socket_limits = httpx.Limits(
+            max_connections=max_connections_per_target
+            or eapix.environment.EAPI_MAX_CONNECTIONS_PER_HOST,
+            max_keepalive_connections=max_connections_per_target
+            or eapix.environment.EAPI_MAX_CONNECTIONS_PER_HOST,
+            keepalive_expiry=keepalive_expiry)
+        # of the same kind as `_client`
+        self._socket_clients: Dict[str, Any] = {}
+
+        self.max_connections_per_target = max_connections_per_target
+
+        # idle connections are closed after this many seconds
+        self.keepalive_expiry = kwargs["limits"].keepalive_expiry \
+            if "limits" in kwargs else keepalive_expiry
+        self._auth = auth
+
         # store parameters for future requests
         self._eapi_sessions: Dict[str, dict] = {}
 
+        self.retry = retry or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+
+        # recent `show` responses, see `eapix.cache`
+        self.cache = cache
+
+        self.metrics = metrics
+        self._on_retry = metrics.retried if metrics is not None else None
+
+        self.tracer = tracer
+
+        # session cookies kept across processes, see `eapix.sessions`
+        self.session_store = session_store
+        # credentials of the sessions saved to or restored from the store
+        self._session_auth: Dict[str, Auth] = {}
+        self._restored: Set[str] = set()
+
+    def _client_for(self, url: str) -> Tuple[Any, str]:
+        """the httpx client (of the same kind as `_client`) and URL to post
+        `url` with
+
+        'unix:///var/run/command-api.sock/command-api' is posted to
+        'http://localhost/command-api' over the socket.
+        """
+
+        if not url.startswith("unix://"):
+            return self._client, url
+
+        path, _, endpoint = url[len("unix://"):].rpartition("/")
+
+        client = self._socket_clients.get(path)
+        if client is None:
+            if self._klass is httpx.Client:
+                client = httpx.Client(
+                    transport=httpx.HTTPTransport(
+                        uds=path, limits=self._socket_limits),
+                    cookies=self._client.cookies.jar,
+                    **self._socket_options)
+            else:
+                client = httpx.AsyncClient(
+                    transport=httpx.AsyncHTTPTransport(
+                        uds=path, limits=self._socket_limits),
+                    cookies=self._client.cookies.jar,
+                    **self._socket_options)
+            self._socket_clients[path] = client
+
+        return client, f"http://{_SOCKET_HOST}/{endpoint}"
+
+    def _decode(self, target: Target, response: httpx.Response) -> dict:
+        if self.metrics is None and self.tracer is None:
+            return eapix.codec.loads(response.content)
+
+        started = time.monotonic()
+        with phase("eapi.decode"):
+            body = eapix.codec.loads(response.content)
+        if self.metrics is not None:
+            self.metrics.decoded(target.to_url(), time.monotonic() - started)
+        return body
+
     def _handle_call_response(self, response):
 
         if response.status_code == 401:
@@ -60,7 +315,78 @@ class BaseClient:
         if response.status_code == 404:
             raise EapiPathNotFoundError(response.reason_phrase)
 
-        response.raise_for_status()
+        if not response.is_success:
+            raise EapiHttpError(
+                f"{response.status_code} {response.reason_phrase}",
+                response.status_code, response)
+
+    # the session store is only read and written through these, an
+    # `AsyncClient` runs them in a thread
+
+    def _load_session(self, target: Target, username: str) -> Optional[str]:
+        if self.session_store is None:
+            return None
+        return self.session_store.get(_session_key(target), username)
+
+    def _store_session(self, target: Target, username: str,
+                       session: Tuple[str, Optional[float]]) -> None:
+        if self.session_store is not None:
+            self.session_store.put(_session_key(target), username, *session)
+
+    def _delete_session(self, target: Target, username: str) -> None:
+        if self.session_store is not None:
+            self.session_store.delete(_session_key(target), username)
+
+    def _restore_session(self, target: Target, auth: Auth,
+                         cookie: Optional[str]) -> bool:
+        """reuse a stored session cookie for `target`, skipping `/login`"""
+
+        if cookie is None:
+            return False
+
+        self._client.cookies.set("Session", cookie,
+                                 domain=_cookie_domain(target))
+        self._eapi_sessions[target.fqdn] = {}
+        self._session_auth[target.fqdn] = auth
+        self._restored.add(target.fqdn)
+        return True
+
+    def _new_session(self, target: Target,
+                     auth: Auth) -> Optional[Tuple[str, Optional[float]]]:
+        """the session cookie `/login` set for `target` and its expiry, if
+        it is to be stored"""
+
+        if self.session_store is None:
+            return None
+
+        for cookie in self._client.cookies.jar:
+            if cookie.name == "Session" \
+                    and cookie.domain == _cookie_domain(target) \
+                    and cookie.value not in (None, "None"):
+                self._session_auth[target.fqdn] = auth
+                return cookie.value, cookie.expires
+
+        return None
+
+    def _forget_session(self, target: Target,
+                        restored: bool = False) -> Optional[Auth]:
+        """drop the session of `target`, returns its credentials if it is
+        to be deleted from the store
+
+        With `restored`, only a session that came from the store is dropped.
+        """
+
+        if restored and target.fqdn not in self._restored:
+            return None
+
+        self._restored.discard(target.fqdn)
+        auth = self._session_auth.pop(target.fqdn, None)
+        if auth is None or self.session_store is None:
+            return None
+
+        self._client.cookies.delete("Session", domain=_cookie_domain(target))
+        self._eapi_sessions.pop(target.fqdn, None)
+        return auth
 
     def _handle_login_response(self, target, auth, resp):
         if resp.status_code == 404:
@@ -85,11 +411,12 @@ class BaseClient:
 
         self._eapi_sessions[target.fqdn] = options
 
-    def logged_in(self, target: str) -> bool:
+    def logged_in(self, target: Union[str, Target]) -> bool:
         """determines if session cookie is set"""
         target_ = Target.from_url(target)
 
-        cookie = self._client.cookies.get("Session", domain=target_.fqdn)
+        cookie = self._client.cookies.get("Session",
+                                          domain=_cookie_domain(target_))
 
         return True if cookie else False
 
@@ -99,6 +426,9 @@ class Client(BaseClient):
                  auth: Optional[Auth] = None,
                  cert: Optional[Certificate] = None,
                  verify: Optional[bool] = None,
+                 retry: Optional[RetryPolicy] = None,
+                 breaker: Optional[CircuitBreaker] = None,
+                 cache: Optional[ResponseCache] = None,
                  **kwargs):
 
         super().__init__(
@@ -106,6 +436,9 @@ class Client(BaseClient):
             auth=auth,
             cert=cert,
             verify=verify,
+            retry=retry,
+            breaker=breaker,
+            cache=cache,
             **kwargs
         )
 
@@ -123,17 +456,83 @@ class Client(BaseClient):
         if "timeout" not in options:
             options["timeout"] = eapix.environment.EAPI_DEFAULT_TIMEOUT
 
+        content = eapix.codec.dumps(data)
+        measurement = None
+        if self.metrics is not None:
+            measurement = self.metrics.start(
+                url.rpartition("/")[0], data, options, len(content))
+
+        trace = eapix.tracing.current()
+        attempt = trace.attempt(options) if trace is not None else None
+
+        client, url = self._client_for(url)
+
+        try:
+            try:
+                response = client.post(url, content=content, **options)
+            except httpx.HTTPError as exc:
+                raise _eapi_error(exc) from exc
+
+            self._handle_call_response(response)
+        except BaseException as exc:
+            if measurement is not None and isinstance(exc, EapiError):
+                measurement.failed(exc, response)
+            if attempt is not None:
+                attempt.end(exc, response)
+            raise
+
+        if measurement is not None:
+            measurement.done(response)
+        if attempt is not None:
+            attempt.end(response=response)
+
+        return response
+
+    def _stream(self, url, data: dict,
+                **options) -> Tuple[httpx.Response, Optional[Measurement]]:
+        """calls the request to EAPI, leaving the body to be streamed
+
+        The measurement, if any, is left for the caller to finish once the
+        body has been read.
+        """
+
+        if "timeout" not in options:
+            options["timeout"] = eapix.environment.EAPI_DEFAULT_TIMEOUT
+
+        auth = options.pop("auth", httpx.USE_CLIENT_DEFAULT)
+
+        content = eapix.codec.dumps(data)
+        measurement = None
+        if self.metrics is not None:
+            measurement = self.metrics.start(
+                url.rpartition("/")[0], data, options, len(content))
+
+        client, url = self._client_for(url)
+
         try:
-            response = self._client.post(url, content=json.dumps(data), **options)
+            request = client.build_request("POST", url, content=content,
+                                           **options)
+            response = client.send(request, auth=auth, stream=True)
         except httpx.HTTPError as exc:
-            raise EapiError(str(exc))
+            error = _eapi_error(exc)
+            if measurement is not None:
+                measurement.failed(error)
+            raise error from exc
 
-        self._handle_call_response(response)
+        try:
+            self._handle_call_response(response)
+        except BaseException as exc:
+            response.close()
+            if measurement is not None and isinstance(exc, EapiError):
+                measurement.failed(exc, response)
+            raise
 
-        return response
+        return response, measurement
 
     def close(self):
         """shutdown the underlying httpx session"""
+        for client in self._socket_clients.values():
+            client.close()
         self._client.close()
 
     def logout(self, target: Union[str, Target]) -> None:
@@ -152,7 +551,12 @@ class Client(BaseClient):
         if self.logged_in(str(_target)):
             self._call(f"{_target}/logout", data={})
 
-    def login(self, target: str, auth: Optional[Auth] = None) -> None:
+        auth = self._forget_session(_target)
+        if auth is not None:
+            self._delete_session(_target, auth[0])
+
+    def login(self, target: Union[str, Target],
+              auth: Optional[Auth] = None) -> None:
         """Login to an eAPI session
 
         :param target: eAPI target (host, port)
@@ -166,14 +570,24 @@ class Client(BaseClient):
             return
 
         username, password = auth or self._client.auth
+
+        cookie = self._load_session(_target, username)
+        if self._restore_session(_target, (username, password), cookie):
+            return
+
         payload = {"username": username, "password": password}
 
         resp = self._call(f"{_target}/login", data=payload)
 
         self._handle_login_response(_target, auth, resp)
-
-    def call(self, target: str, commands: CommandList,
-             options: EapiOptions = EapiOptions(), **kwargs):
+        session = self._new_session(_target, (username, password))
+        if session is not None:
+            self._store_session(_target, username, session)
+
+    def call(self, target: Union[str, Target], commands: CommandList,
+             options: EapiOptions = EapiOptions(),
+             schemas: Optional[Mapping[str, Type[Schema]]] = None,
+             **kwargs) -> Union[Response, StreamResponse]:
         """call commands to an eAPI target
 
         :param target: eAPI target (host, port)
@@ -182,23 +596,123 @@ class Client(BaseClient):
         :param type: list
         :param options: eapi options
         :param type: EapiOptions
+        :param schemas: typed schemas for JSON results, by command. see
+            ``eapix.schemas``
+        :param type: dict
+        :param **kwargs: other pass through `httpx` options
+        :param type: dict
+
+        :return: :class:`Response <Response>`, or a
+            :class:`StreamResponse <StreamResponse>` if `options.streaming`
+            is set
+        """
+
+        if options.streaming:
+            return self.stream(target, commands, options, schemas,
+                               **kwargs)
+
+        if self.tracer is not None and eapix.tracing.current() is None:
+            with traced(self.tracer, "eapi.call",
+                        **{"server.address": target,
+                           "eapi.commands": len(commands)}):
+                return self.call(target, commands, options, schemas,
+                                 **kwargs)
+
+        with phase("eapi.resolve"):
+            _target: Target = Target.from_url(target)
+
+        # get session defaults (set at login)
+        httpx_args = dict(self._eapi_sessions.get(_target.fqdn) or {})
+        httpx_args.update(kwargs)
+
+        request = prepare_request(commands, options)
+
+        cache = self.cache if not kwargs else None
+        if cache is not None:
+            cached = cache.get(_target, request, schemas)
+            if cached is not None:
+                return cached
+
+        def send(httpx_args: dict) -> httpx.Response:
+            return call_with_retry(
+                _target.to_url(),
+                lambda: self._call(f"{_target}/command-api",
+                                   data=request, **httpx_args),
+                self.retry, self.breaker, is_idempotent(request),
+                self._on_retry)
+
+        try:
+            response = send(httpx_args)
+        except EapiAuthenticationFailure:
+            # a stored session the target no longer accepts, log in again
+            auth = self._forget_session(_target, restored=True)
+            if auth is None:
+                raise
+            self._delete_session(_target, auth[0])
+            self.login(target, auth)
+            response = send(
+                dict(httpx_args, **self._eapi_sessions.get(_target.fqdn, {})))
+
+        body = self._decode(_target, response)
+        with phase("eapi.response"):
+            result = Response.from_rpc_response(_target, request, body,
+                                                schemas)
+
+        if cache is not None:
+            cache.put(_target, request, result, schemas)
+
+        return result
+
+    def stream(self, target: Union[str, Target], commands: CommandList,
+               options: EapiOptions = EapiOptions(),
+               schemas: Optional[Mapping[str, Type[Schema]]] = None,
+               **kwargs) -> StreamResponse:
+        """call commands to an eAPI target, decoding results as they arrive
+
+        Peak memory is bounded by the largest single command result rather
+        than the whole response body.
+
+        :param target: eAPI target (host, port)
+        :param type: str
+        :param commands: List of `Command` objects
+        :param type: list
+        :param options: eapi options
+        :param type: EapiOptions
+        :param schemas: typed schemas for JSON results, by command. see
+            ``eapix.schemas``
+        :param type: dict
         :param **kwargs: other pass through `httpx` options
         :param type: dict
 
+        :return: :class:`StreamResponse <StreamResponse>`, iterate it for
+            `ResponseElem`s
         """
 
         _target: Target = Target.from_url(target)
 
         # get session defaults (set at login)
-        httpx_args = self._eapi_sessions.get(_target.fqdn) or {}
+        httpx_args = dict(self._eapi_sessions.get(_target.fqdn) or {})
         httpx_args.update(kwargs)
 
         request = prepare_request(commands, options)
 
-        response = self._call(f"{_target}/command-api",
-                              data=request, **httpx_args)
+        started = time.monotonic()
+        response, measurement = call_with_retry(
+            _target.to_url(),
+            lambda: self._stream(f"{_target}/command-api",
+                                 data=request, **httpx_args),
+            self.retry, self.breaker, is_idempotent(request),
+            self._on_retry)
 
-        return Response.from_rpc_response(_target, request, response.json())
+        rsp = StreamResponse(_target, request,
+                             _iter_bytes(response, measurement),
+                             close=response.close, started=started,
+                             schemas=schemas)
+        if measurement is not None:
+            # to the end of the body, or as far as it was read
+            rsp.on_close(lambda: measurement.done(response))
+
+        return rsp
 
 
 class AsyncClient(BaseClient):
@@ -206,6 +720,12 @@ class AsyncClient(BaseClient):
                  auth: Optional[Auth] = None,
                  cert: Optional[Certificate] = None,
                  verify: Optional[bool] = None,
+                 retry: Optional[RetryPolicy] = None,
+                 breaker: Optional[CircuitBreaker] = None,
+                 cache: Optional[ResponseCache] = None,
+                 limiter: Optional[Limiter] = None,
+                 coalesce: bool = False,
+                 batcher: Optional[Batcher] = None,
                  **kwargs):
 
         super().__init__(
@@ -213,9 +733,33 @@ class AsyncClient(BaseClient):
             auth=auth,
             cert=cert,
             verify=verify,
+            retry=retry,
+            breaker=breaker,
+            cache=cache,
             **kwargs
         )
 
+        # per-target in-flight and rate limits, see `eapix.limits`. None
+        # unless asked for, `max_connections_per_target` alone is a fixed cap
+        if limiter is None and self.max_connections_per_target is not None:
+            limiter = Limiter(concurrency=self.max_connections_per_target,
+                              rate=0, adaptive=False)
+        self.limiter = limiter
+
+        # share identical `show` calls that are already in flight
+        self.coalesce = coalesce
+        self._flights: Dict[tuple, asyncio.Task] = {}
+
+        # combine `show` calls to a target into one request, see
+        # `eapix.batching`
+        self.batcher = batcher
+
+        # last successful exchange by target, see `warm`
+        self._last_seen: Dict[str, float] = {}
+        self._keepalive_targets: Set[str] = set()
+        self._keepalive_interval: Optional[float] = None
+        self._keepalive_task: Optional[asyncio.Task] = None
+
     async def __aenter__(self) -> "AsyncClient":
         return self
 
@@ -230,20 +774,229 @@ class AsyncClient(BaseClient):
         if "timeout" not in options:
             options["timeout"] = eapix.environment.EAPI_DEFAULT_TIMEOUT
 
+        origin = url.rpartition("/")[0]
+        content = eapix.codec.dumps(data)
+        measurement = None
+        if self.metrics is not None:
+            measurement = self.metrics.start(origin, data, options,
+                                             len(content), asynchronous=True)
+
+        trace = eapix.tracing.current()
+        attempt = trace.attempt(options, asynchronous=True) \
+            if trace is not None else None
+
+        client, url = self._client_for(url)
+
         try:
-            response = await self._client.post(url, content=json.dumps(data),
-                                                **options)
+            try:
+                response = await client.post(url, content=content, **options)
+            except httpx.HTTPError as exc:
+                raise _eapi_error(exc) from exc
+
+            self._handle_call_response(response)
+        except BaseException as exc:
+            if measurement is not None and isinstance(exc, EapiError):
+                measurement.failed(exc, response)
+            if attempt is not None:
+                attempt.end(exc, response)
+            raise
+
+        if measurement is not None:
+            measurement.done(response)
+        if attempt is not None:
+            attempt.end(response=response)
+        self._last_seen[origin] = time.monotonic()
+
+        return response
+
+    async def _stream(self, url, data: dict, **options
+                      ) -> Tuple[httpx.Response, Optional[Measurement]]:
+        """Post to eAPI endpoint, leaving the body to be streamed
+
+        The measurement, if any, is left for the caller to finish once the
+        body has been read.
+        """
+
+        if "timeout" not in options:
+            options["timeout"] = eapix.environment.EAPI_DEFAULT_TIMEOUT
+
+        auth = options.pop("auth", httpx.USE_CLIENT_DEFAULT)
+
+        origin = url.rpartition("/")[0]
+        content = eapix.codec.dumps(data)
+        measurement = None
+        if self.metrics is not None:
+            measurement = self.metrics.start(origin, data, options,
+                                             len(content), asynchronous=True)
+
+        client, url = self._client_for(url)
+
+        try:
+            request = client.build_request("POST", url, content=content,
+                                           **options)
+            response = await client.send(request, auth=auth, stream=True)
         except httpx.HTTPError as exc:
-            raise EapiError(str(exc))
+            error = _eapi_error(exc)
+            if measurement is not None:
+                measurement.failed(error)
+            raise error from exc
+
+        try:
+            self._handle_call_response(response)
+        except BaseException as exc:
+            await response.aclose()
+            if measurement is not None and isinstance(exc, EapiError):
+                measurement.failed(exc, response)
+            raise
+
+        self._last_seen[origin] = time.monotonic()
+
+        return response, measurement
 
-        self._handle_call_response(response)
+    async def _limited(self, key: str, send: Callable[[], Awaitable[_T]],
+                       hold: bool = False) -> _T:
+        """send once a slot for `key` is free, adapting the limit
+
+        With `hold` the slot is kept on success and must be released by the
+        caller once the body has been read.
+        """
+
+        limiter = self.limiter
+        if limiter is None:
+            return await send()
+
+        await limiter.acquire(key)
+        started = time.monotonic()
+
+        try:
+            response = await send()
+        except EapiError as exc:
+            limiter.observe(key, time.monotonic() - started,
+                            overloaded=is_failure(exc))
+            limiter.release(key)
+            raise
+        except BaseException:
+            limiter.release(key)
+            raise
+
+        limiter.observe(key, time.monotonic() - started)
+        if not hold:
+            limiter.release(key)
 
         return response
 
-    async def close(self) -> None:
-        await self._client.aclose()
+    async def _ping(self, target: Target) -> None:
+        """a cheap request that keeps the connection and session in use"""
+        request = prepare_request(
+            [eapix.environment.EAPI_KEEPALIVE_COMMAND],
+            EapiOptions(encoding="text"))
+        await self._post(target, request,
+                         dict(self._eapi_sessions.get(target.fqdn) or {}))
+
+    async def warm(self, targets: Iterable[Union[str, Target]],
+                   login: bool = True,
+                   keepalive: bool = False,
+                   interval: Optional[float] = None
+                   ) -> Dict[str, Optional[EapiError]]:
+        """connect (and log in) to `targets` ahead of the first poll cycle
+
+        :param targets: eAPI targets
+        :param type: list
+        :param login: open `/login` sessions (with the client's `auth`)
+        :param type: bool
+        :param keepalive: keep the targets warm afterwards, see `keepalive`
+        :param type: bool
+        :param interval: seconds between keepalive requests
+        :param type: float
+
+        :return: the error of each target that could not be warmed, or None
+        """
+
+        targets_ = [Target.from_url(target) for target in targets]
+
+        async def warm_one(target: Target) -> Optional[EapiError]:
+            try:
+                if login and self._auth is not None:
+                    await self.login(str(target), self._auth)
+                await self._ping(target)
+            except EapiError as exc:
+                return exc
+            return None
 
-    async def login(self, target: str, auth: Optional[Auth] = None) -> None:
+        errors = await asyncio.gather(*[warm_one(t) for t in targets_])
+
+        if keepalive:
+            self.keepalive(targets_, interval)
+
+        return {target.to_url(): error
+                for target, error in zip(targets_, errors)}
+
+    def keepalive(self, targets: Iterable[Union[str, Target]],
+                  interval: Optional[float] = None) -> None:
+        """keep connections to `targets` open until the client is closed
+
+        A cheap request (`EAPI_KEEPALIVE_COMMAND`) is sent to each target that
+        has been idle for `interval` seconds, half the keepalive expiry by
+        default. Connections that never expire need an explicit `interval`.
+        """
+
+        if not interval:
+            if self.keepalive_expiry is None:
+                raise ValueError("connections do not expire, keepalive "
+                                 "needs an interval")
+            interval = self.keepalive_expiry / 2
+
+        self._keepalive_targets.update(
+            Target.from_url(target).to_url() for target in targets)
+        self._keepalive_interval = interval
+
+        if self._keepalive_task is None:
+            self._keepalive_task = asyncio.ensure_future(self._keep_warm())
+
+    async def _keep_warm(self) -> None:
+        while True:
+            interval = self._keepalive_interval or 1.0
+            await asyncio.sleep(interval)
+
+            now = time.monotonic()
+            idle = [url for url in self._keepalive_targets
+                    if now - self._last_seen.get(url, -math.inf) >= interval]
+
+            results = await asyncio.gather(
+                *[self._ping(Target.from_url(url)) for url in idle],
+                return_exceptions=True)
+
+            # an unreachable target is tried again, anything else is a bug
+            for url, result in zip(idle, results):
+                if isinstance(result, EapiError):
+                    log.debug("keepalive to %s failed: %s", url, result)
+                elif isinstance(result, BaseException):
+                    raise result
+
+    def is_warm(self, target: Union[str, Target]) -> bool:
+        """a connection to `target` was used within the keepalive expiry"""
+        seen = self._last_seen.get(Target.from_url(target).to_url())
+        return seen is not None and (
+            self.keepalive_expiry is None
+            or time.monotonic() - seen < self.keepalive_expiry)
+
+    async def close(self) -> None:
+        task, self._keepalive_task = self._keepalive_task, None
+        try:
+            # raises what stopped the keepalive, once the client is closed
+            if task is not None:
+                task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await task
+        finally:
+            if self.batcher is not None:
+                await self.batcher.close()
+            for client in self._socket_clients.values():
+                await client.aclose()
+            await self._client.aclose()
+
+    async def login(self, target: Union[str, Target],
+                    auth: Optional[Auth] = None) -> None:
         """Login to an eAPI session
 
         :param target: eAPI target (host, port)
@@ -257,11 +1010,23 @@ class AsyncClient(BaseClient):
             return
 
         username, password = auth or self._client.auth
+
+        # the store is read and written off the event loop
+        if self.session_store is not None:
+            cookie = await asyncio.to_thread(self._load_session, target_,
+                                             username)
+            if self._restore_session(target_, (username, password), cookie):
+                return
+
         payload = {"username": username, "password": password}
 
         resp = await self._call(target_.to_url() + "/login", data=payload)
 
         self._handle_login_response(target_, auth, resp)
+        session = self._new_session(target_, (username, password))
+        if session is not None:
+            await asyncio.to_thread(self._store_session, target_, username,
+                                    session)
 
     async def logout(self, target: str) -> None:
         """Log out of an eAPI session
@@ -279,30 +1044,198 @@ class AsyncClient(BaseClient):
         if self.logged_in(target):
             await self._call(target_.to_url()+ "/logout", data={})
 
-    async def call(self, target: str, commands: CommandList,
-                   options: EapiOptions = EapiOptions(), **kwargs):
+        auth = self._forget_session(target_)
+        if auth is not None:
+            await asyncio.to_thread(self._delete_session, target_, auth[0])
+
+    async def call(self, target: Union[str, Target], commands: CommandList,
+                   options: EapiOptions = EapiOptions(),
+                   schemas: Optional[Mapping[str, Type[Schema]]] = None,
+                   **kwargs) -> Union[Response, StreamResponse]:
         """call commands to an eAPI target
 
+        If the client was created with `coalesce`, a call of only `show`
+        commands that is identical to one already in flight waits for that
+        one instead, and both get the same `Response`.
+
         :param target: eAPI target (host, port)
         :param type: Target
         :param commands: List of `Command` objects
         :param type: list
         :param options: eapi options
         :param type: EapiOptions
+        :param schemas: typed schemas for JSON results, by command. see
+            ``eapix.schemas``
+        :param type: dict
         :param **kwargs: other pass through `httpx` options
         :param type: dict
 
+        :return: :class:`Response <Response>`, or a
+            :class:`StreamResponse <StreamResponse>` if `options.streaming`
+            is set
         """
 
-        _target: Target = Target.from_url(target)
-        
+        if options.streaming:
+            return await self.stream(target, commands, options, schemas,
+                                     **kwargs)
+
+        if self.tracer is not None and eapix.tracing.current() is None:
+            with traced(self.tracer, "eapi.call",
+                        **{"server.address": target,
+                           "eapi.commands": len(commands)}):
+                return await self.call(target, commands, options, schemas,
+                                       **kwargs)
+
+        with phase("eapi.resolve"):
+            _target: Target = Target.from_url(target)
+
         # get session defaults (set at login)
-        httpx_args = self._eapi_sessions.get(_target.fqdn) or {}
+        httpx_args = dict(self._eapi_sessions.get(_target.fqdn) or {})
         httpx_args.update(kwargs)
 
         request = prepare_request(commands, options)
 
-        response = await self._call(f"{_target}/command-api",
-                                    data=request, **httpx_args)
+        cache = self.cache if not kwargs else None
+        if cache is not None:
+            cached = cache.get(_target, request, schemas)
+            if cached is not None:
+                return cached
+
+        batch = self.batcher is not None and not kwargs and batchable(request)
+
+        if not self.coalesce or kwargs or not is_idempotent(request):
+            result = await self._send(_target, request, httpx_args, schemas,
+                                      batch)
+        else:
+            result = await self._coalesced(_target, request, httpx_args,
+                                           schemas, batch)
+
+        if cache is not None:
+            cache.put(_target, request, result, schemas)
+
+        return result
+
+    async def _coalesced(self, target: Target, request: dict,
+                         httpx_args: dict,
+                         schemas: Optional[Mapping[str, Type[Schema]]],
+                         batch: bool = False) -> Response:
+        """wait for an identical call already in flight, or make it"""
+
+        # the request id differs on every call, the params do not
+        flight = (target.to_url(), eapix.codec.dumps(request["params"]),
+                  eapix.schemas.key(schemas))
+
+        task = self._flights.get(flight)
+        if task is None:
+            task = asyncio.ensure_future(
+                self._send(target, request, httpx_args, schemas, batch))
+            self._flights[flight] = task
+            task.add_done_callback(
+                lambda task: self._landed(flight, task))
+
+        # a cancelled caller must not cancel the call for the others
+        return await asyncio.shield(task)
+
+    def _landed(self, flight: tuple, task: asyncio.Task) -> None:
+        self._flights.pop(flight, None)
+        if not task.cancelled():
+            # retrieved, in case every caller was cancelled
+            task.exception()
+
+    async def _post(self, target: Target, request: dict,
+                    httpx_args: dict) -> dict:
+        """send a request, returns the decoded JSON-RPC response"""
+
+        key = target.to_url()
+
+        async def send(httpx_args: dict) -> httpx.Response:
+            return await acall_with_retry(
+                key,
+                lambda: self._limited(key, lambda: self._call(
+                    f"{target}/command-api", data=request, **httpx_args)),
+                self.retry, self.breaker, is_idempotent(request),
+                self._on_retry)
+
+        try:
+            response = await send(httpx_args)
+        except EapiAuthenticationFailure:
+            # a stored session the target no longer accepts, log in again
+            auth = self._forget_session(target, restored=True)
+            if auth is None:
+                raise
+            await asyncio.to_thread(self._delete_session, target, auth[0])
+            await self.login(str(target), auth)
+            response = await send(
+                dict(httpx_args, **self._eapi_sessions.get(target.fqdn, {})))
+
+        return self._decode(target, response)
+
+    async def _send(self, target: Target, request: dict, httpx_args: dict,
+                    schemas: Optional[Mapping[str, Type[Schema]]],
+                    batch: bool = False) -> Response:
+
+        if batch and self.batcher is not None:
+            body = await self.batcher.submit(
+                self.batcher.key(target.to_url(), request), request,
+                lambda request: self._post(target, request, httpx_args))
+        else:
+            body = await self._post(target, request, httpx_args)
+
+        with phase("eapi.response"):
+            return Response.from_rpc_response(target, request, body, schemas)
+
+    async def stream(self, target: Union[str, Target], commands: CommandList,
+                     options: EapiOptions = EapiOptions(),
+                     schemas: Optional[Mapping[str, Type[Schema]]] = None,
+                     **kwargs) -> StreamResponse:
+        """call commands to an eAPI target, decoding results as they arrive
+
+        :param target: eAPI target (host, port)
+        :param type: Target
+        :param commands: List of `Command` objects
+        :param type: list
+        :param options: eapi options
+        :param type: EapiOptions
+        :param schemas: typed schemas for JSON results, by command. see
+            ``eapix.schemas``
+        :param type: dict
+        :param **kwargs: other pass through `httpx` options
+        :param type: dict
+
+        :return: :class:`StreamResponse <StreamResponse>`, iterate it with
+            `async for` for `ResponseElem`s
+        """
+
+        _target: Target = Target.from_url(target)
+
+        # get session defaults (set at login)
+        httpx_args = dict(self._eapi_sessions.get(_target.fqdn) or {})
+        httpx_args.update(kwargs)
+
+        request = prepare_request(commands, options)
 
-        return Response.from_rpc_response(_target, request, response.json())
+        key = _target.to_url()
+        started = time.monotonic()
+        response, measurement = await acall_with_retry(
+            key,
+            lambda: self._limited(key, lambda: self._stream(
+                f"{_target}/command-api", data=request, **httpx_args),
+                hold=True),
+            self.retry, self.breaker, is_idempotent(request),
+            self._on_retry)
+
+        rsp = StreamResponse(_target, request,
+                             _aiter_bytes(response, measurement),
+                             close=response.aclose, started=started,
+                             schemas=schemas)
+        if measurement is not None:
+            # to the end of the body, or as far as it was read
+            rsp.on_close(lambda: measurement.done(response))
+        if self.limiter is not None:
+            # the slot is held until the body has been read, or the stream is
+            # dropped unread
+            release = weakref.finalize(rsp, self.limiter.release, key)
+            release.atexit = False
+            rsp.on_close(release)
+
+        return rsp
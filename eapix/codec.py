@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2024 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+"""
+JSON encoding and decoding
+
+Uses `orjson` or `msgspec` when installed and falls back to the stdlib `json`
+module. Set `EAPI_JSON_CODEC` to pick one explicitly.
+
+The codecs encode compactly. `dumps(obj, spaced=True)` gives the output of
+`json.dumps(obj)` byte for byte (", " and ": " separators, non-ASCII
+escaped), for output that must not change with the codec.
+"""
+
+import json
+
+from dataclasses import dataclass
+from typing import Any, Callable, Union
+
+import eapix.environment
+
+
+@dataclass(frozen=True)
+class Codec:
+    name: str
+    dumps: Callable[..., bytes]
+    loads: Callable[[Union[bytes, str]], Any]
+
+
+def _stdlib_dumps(obj: Any, spaced: bool = False) -> bytes:
+    if spaced:
+        return json.dumps(obj).encode("utf-8")
+    return json.dumps(obj, separators=(",", ":"),
+                      ensure_ascii=False).encode("utf-8")
+
+
+STDLIB = Codec("json", _stdlib_dumps, json.loads)
+
+
+def _orjson() -> Codec:
+    import orjson
+
+    def dumps(obj, spaced=False):
+        if spaced:
+            return _stdlib_dumps(obj, spaced)
+        try:
+            return orjson.dumps(obj)
+        except TypeError:
+            # orjson rejects integers wider than 64 bits, json does not
+            return _stdlib_dumps(obj)
+
+    def loads(data):
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            return json.loads(data)
+
+    return Codec("orjson", dumps, loads)
+
+
+def _msgspec() -> Codec:
+    import msgspec  # type: ignore
+
+    encoder = msgspec.json.Encoder()
+    decoder = msgspec.json.Decoder()
+
+    def dumps(obj, spaced=False):
+        if spaced:
+            return _stdlib_dumps(obj, spaced)
+        try:
+            return encoder.encode(obj)
+        except (TypeError, OverflowError):
+            # as orjson, integers wider than 64 bits
+            return _stdlib_dumps(obj)
+
+    def loads(data):
+        try:
+            return decoder.decode(data)
+        except msgspec.DecodeError:
+            return json.loads(data)
+
+    return Codec("msgspec", dumps, loads)
+
+
+_CODECS = {
+    "orjson": _orjson,
+    "msgspec": _msgspec,
+    "json": lambda: STDLIB,
+}
+
+
+def get_codec(name: str = "auto") -> Codec:
+    """returns the named codec, or the fastest one installed for 'auto'
+
+    :raises ValueError: for an unknown name
+    :raises ImportError: if the named codec is not installed
+    """
+
+    if name == "auto":
+        for candidate in ("orjson", "msgspec"):
+            try:
+                return _CODECS[candidate]()
+            except ImportError:
+                continue
+        return STDLIB
+
+    if name not in _CODECS:
+        raise ValueError(f"invalid codec '{name}'. "
+                         f"must be one of auto, {', '.join(_CODECS)}")
+
+    return _CODECS[name]()
+
+
+codec: Codec = get_codec(eapix.environment.EAPI_JSON_CODEC)
+
+
+def dumps(obj: Any, spaced: bool = False) -> bytes:
+    """encode `obj` as JSON bytes, as `json.dumps` does with `spaced`"""
+    return codec.dumps(obj, spaced)
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """decode JSON bytes or text"""
+    return codec.loads(data)
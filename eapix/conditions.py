@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2024 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+
+import abc
+import json
+import operator
+import re
+
+from typing import (Any, Callable, Dict, Iterable, Iterator, Optional,
+                    Pattern, Tuple, Union)
+
+from eapix.response import JsonResult, Response, ResponseElem, TextResult
+from eapix.schemas import Schema
+
+_OPERATORS = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "=~": lambda value, pattern: bool(pattern.search(str(value))),
+}
+
+_EXPR_RE = re.compile(r"^\s*(?P<path>[^\s=!<>]+)\s*"
+                      r"(?P<op>==|!=|<=|>=|<|>|=~)\s*(?P<value>.+?)\s*$")
+
+_MISSING = object()
+
+
+class Condition(abc.ABC):
+    """Tests a response, used by ``watch`` to decide when to stop"""
+
+    @abc.abstractmethod
+    def __call__(self, response: Response) -> bool:
+        ...
+
+
+class Never(Condition):
+    """Never matches"""
+
+    def __call__(self, response: Response) -> bool:
+        return False
+
+
+def _elements(response: Response,
+              index: Optional[int]) -> Iterator[ResponseElem]:
+    if index is None:
+        return iter(response.elements)
+
+    try:
+        return iter((response.elements[index],))
+    except IndexError:
+        return iter(())
+
+
+class Search(Condition):
+    """Searches for a regex in the output of each command
+
+    The pattern is compiled once and searched against each command's own
+    result, rendered as in ``str(response)``, so the response is never
+    rendered as a whole. The target, status and command lines of
+    ``str(response)`` are not searched.
+
+    Rendering a JSON result is the costly part, the last rendering of each
+    command's result is kept and reused while the result is unchanged from
+    one poll to the next. `Match` tests JSON results without rendering them.
+
+    :param pattern: regex to search for
+    :param type: str
+    :param index: only search the result of this command
+    :param type: int
+    """
+
+    def __init__(self, pattern: Union[str, Pattern],
+                 index: Optional[int] = None):
+        self._pattern = re.compile(pattern)
+        self._index = index
+        # by command position, the last result and its rendering
+        self._rendered: Dict[int, Tuple[Any, str]] = {}
+
+    def _text(self, position: int, result: Any) -> str:
+        if isinstance(result, TextResult):
+            return result.pretty
+
+        rendered = self._rendered.get(position)
+        if rendered is not None and rendered[0] == result:
+            return rendered[1]
+
+        text = result.pretty
+        self._rendered[position] = (result, text)
+        return text
+
+    def __call__(self, response: Response) -> bool:
+        search = self._pattern.search
+        for position, elem in enumerate(_elements(response, self._index)):
+            if self._index is not None:
+                position = self._index
+            if search(self._text(position, elem.result)):
+                return True
+        return False
+
+
+class Match(Condition):
+    """Compares the value at a dotted path in a JSON result
+
+    `*` matches any key (or list item) at its level. The condition matches if
+    any value found at the path compares true. Text results never match.
+
+    >>> Match("interfaces.Ethernet1.lineProtocolStatus", "up")
+    >>> Match("interfaces.*.inputErrors", 0, op=">")
+    >>> Match.parse('interfaces.Ethernet1.lineProtocolStatus == "up"')
+
+    :param path: dotted path into the result
+    :param type: str
+    :param value: value to compare against
+    :param op: one of ==, !=, <, <=, >, >=, =~ (regex search)
+    :param type: str
+    :param index: only test the result of this command
+    :param type: int
+    """
+
+    def __init__(self, path: str, value: Any, op: str = "==",
+                 index: Optional[int] = None):
+
+        if op not in _OPERATORS:
+            raise ValueError(f"invalid operator '{op}'. "
+                             f"must be one of {', '.join(_OPERATORS)}")
+
+        self._path: Tuple[str, ...] = tuple(path.split("."))
+        self._op: Callable[[Any, Any], bool] = _OPERATORS[op]
+        self._value = re.compile(value) if op == "=~" else value
+        self._index = index
+
+    @classmethod
+    def parse(cls, expr: str, index: Optional[int] = None) -> "Match":
+        """build from an expression like `path == "value"`
+
+        The right hand side is parsed as JSON, unquoted text is used as is
+        """
+
+        match = _EXPR_RE.match(expr)
+        if not match:
+            raise ValueError(f"invalid expression: {expr}")
+
+        value: Any = match.group("value")
+        try:
+            value = json.loads(value)
+        except ValueError:
+            pass
+
+        return cls(match.group("path"), value, match.group("op"), index)
+
+    def _lookup(self, data: Any, depth: int) -> Iterator[Any]:
+        if depth == len(self._path):
+            yield data
+            return
+
+        key = self._path[depth]
+        children: Iterable[Any]
+
+        if isinstance(data, (dict, JsonResult)):
+            if key == "*":
+                children = iter(data.values())
+            else:
+                child = data.get(key, _MISSING)
+                children = iter(()) if child is _MISSING else iter((child,))
+        elif isinstance(data, Schema):
+            if key == "*":
+                slots: Tuple[str, ...] = data.__slots__
+                children = (getattr(data, name) for name in slots)
+            else:
+                child = getattr(data, key, _MISSING)
+                children = iter(()) if child is _MISSING else iter((child,))
+        elif isinstance(data, list):
+            if key == "*":
+                children = iter(data)
+            elif key.lstrip("-").isdigit() and \
+                    -len(data) <= int(key) < len(data):
+                children = iter((data[int(key)],))
+            else:
+                children = iter(())
+        else:
+            return
+
+        for child in children:
+            yield from self._lookup(child, depth + 1)
+
+    def __call__(self, response: Response) -> bool:
+        for elem in _elements(response, self._index):
+            if isinstance(elem.result, TextResult):
+                continue
+
+            for value in self._lookup(elem.result, 0):
+                try:
+                    if self._op(value, self._value):
+                        return True
+                except TypeError:
+                    # eg. comparing None < 1
+                    continue
+        return False
+
+
+ConditionLike = Union[None, str, Pattern, Callable[[Response], bool]]
+
+
+def compile_condition(condition: ConditionLike) -> Callable[[Response], bool]:
+    """turns a ``watch`` condition into a callable, once
+
+    strings and compiled patterns become a `Search`, callables (including
+    `Condition`s) are used as is and `None` never matches.
+    """
+
+    if condition is None:
+        return Never()
+
+    if isinstance(condition, (str, re.Pattern)):
+        return Search(condition)
+
+    if callable(condition):
+        return condition
+
+    raise ValueError(f"invalid condition: {condition!r}")
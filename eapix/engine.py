@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2024 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+
+import asyncio
+import collections
+import math
+import random
+import time
+
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Callable, Deque, Optional, Set, Tuple, Union
+
+import eapix.environment
+from eapix.api import EAPI_WATCH_INTERVAL, NEVER_RE
+from eapix.client import AsyncClient
+from eapix.conditions import ConditionLike, compile_condition
+from eapix.exceptions import EapiError
+from eapix.response import Response, StreamResponse
+from eapix.scheduler import Scheduler, next_tick
+from eapix.types import Auth, Certificate, Command, EapiOptions, Target
+
+Event = Tuple[Union[Response, EapiError], bool]
+
+
+@dataclass(eq=False)
+class Subscription:
+    target: Union[str, Target]
+    command: Union[str, Command]
+    interval: float = EAPI_WATCH_INTERVAL
+    condition: Callable[[Response], bool] = field(
+        default_factory=lambda: compile_condition(None))
+    exclude: bool = False
+    deadline: float = math.inf
+    options: EapiOptions = field(default_factory=EapiOptions)
+
+    # schedule state, managed by the engine
+    start: float = field(default=0.0, repr=False)
+    active: bool = field(default=True, repr=False)
+    busy: bool = field(default=False, repr=False)
+    final: bool = field(default=False, repr=False)
+
+
+class WatchEngine:
+    """Polls many (target, command) subscriptions from a single scheduler
+
+    All subscriptions share one `AsyncClient` and one heap of due times.
+    Only polls that are actually in flight hold a task, and at most
+    `concurrency` of them run at once. A poll that is still running when
+    its next tick comes due skips that tick.
+
+    Like ``watch``, a subscription ends when its deadline passes or its
+    condition matches. Iteration ends when no subscriptions are left.
+
+    >>> async with WatchEngine(auth=("admin", "")) as engine:
+    ...     for target in targets:
+    ...         engine.subscribe(target, "show interfaces counters", 10)
+    ...     async for response, matched in engine:
+    ...         print(response.target, matched)
+    """
+
+    def __init__(self,
+                 client: Optional[AsyncClient] = None,
+                 concurrency: int = eapix.environment.EAPI_FLEET_CONCURRENCY,
+                 jitter: float = 0.0,
+                 return_exceptions: bool = False,
+                 auth: Optional[Auth] = None,
+                 cert: Optional[Certificate] = None,
+                 verify: Optional[bool] = None,
+                 **kwargs):
+
+        if concurrency < 1:
+            raise ValueError(f"invalid concurrency '{concurrency}'. "
+                             "must be >= 1")
+
+        self._concurrency = concurrency
+        self._jitter = jitter
+        self._return_exceptions = return_exceptions
+
+        self._owns_client = client is None
+        if client is None:
+            client = AsyncClient(auth=auth, cert=cert, verify=verify, **kwargs)
+        self._client = client
+
+        self._scheduler: Scheduler[Subscription] = Scheduler()
+        self._subscriptions: Set[Subscription] = set()
+
+    async def __aenter__(self) -> "WatchEngine":
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.close()
+
+    def __aiter__(self) -> AsyncIterator[Event]:
+        return self.events()
+
+    def __len__(self) -> int:
+        return len(self._subscriptions)
+
+    async def close(self) -> None:
+        """close the client, unless it was passed in by the caller"""
+        if self._owns_client:
+            await self._client.close()
+
+    def subscribe(self,
+                  target: Union[str, Target],
+                  command: Union[str, Command],
+                  interval: float = EAPI_WATCH_INTERVAL,
+                  condition: ConditionLike = NEVER_RE,
+                  exclude: bool = False,
+                  deadline: float = math.inf,
+                  options: EapiOptions = EapiOptions()) -> Subscription:
+        """Add a command to poll on a target
+
+        :param target: eAPI target
+        :param type: Target
+        :param command: A single command to send
+        :param type: str
+        :param interval: time between polls
+        :param type: float
+        :param condition: search for pattern in output, end if matched. May
+            also be a compiled pattern or a callable, see ``eapix.conditions``
+        :param type: str
+        :param exclude: end if condition pattern is NOT matched
+        :param type: bool
+        :param deadline: end after specified time
+        :param type: float
+        :param options: eapi options
+        :param type: EapiOptions
+
+        :return: the subscription, can be passed to ``unsubscribe``
+        """
+
+        sub = Subscription(target, command, interval,
+                           compile_condition(condition), exclude, deadline,
+                           options)
+
+        sub.start = time.monotonic()
+        if self._jitter > 0:
+            sub.start += random.uniform(0, self._jitter)
+
+        self._subscriptions.add(sub)
+        self._scheduler.push(sub.start, sub)
+
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        """Stop polling a subscription"""
+        # stale heap entries are dropped when they come due
+        sub.active = False
+        self._subscriptions.discard(sub)
+
+    def _matched(self, sub: Subscription, response: Response) -> bool:
+        match = sub.condition(response)
+        return not match if sub.exclude else bool(match)
+
+    async def _poll(self, sub: Subscription, results: asyncio.Queue) -> None:
+        result: Union[Response, StreamResponse, Exception]
+        try:
+            result = await self._client.call(sub.target, [sub.command],
+                                             sub.options)
+            if isinstance(result, StreamResponse):
+                result = await result.aread()
+        except EapiError as exc:
+            exc.target = sub.target
+            result = exc
+        except Exception as exc:
+            # not a failure of the target (an invalid target, a bug), raised
+            # by `events`
+            result = exc
+
+        # every poll reports back, or the subscription would stay busy
+        await results.put((sub, result))
+
+    async def events(self) -> AsyncIterator[Event]:
+        """yield `(response, matched)` as polls complete
+
+        With `return_exceptions` failed polls are yielded as
+        `(EapiError, False)` instead of raised.
+        """
+
+        ready: Deque[Subscription] = collections.deque()
+        in_flight: Set[asyncio.Task] = set()
+        results: asyncio.Queue = asyncio.Queue()
+        # polls whose result has not been consumed yet
+        outstanding = 0
+
+        try:
+            while self._subscriptions or outstanding:
+                now = time.monotonic()
+
+                for sub in self._scheduler.pop_due(now):
+                    if not sub.active:
+                        continue
+
+                    # fixed rate, the next tick does not wait for the response
+                    tick = next_tick(sub.start, sub.interval, now)
+                    if tick < sub.start + sub.deadline:
+                        self._scheduler.push(tick, sub)
+                    else:
+                        sub.final = True
+
+                    if not sub.busy:
+                        sub.busy = True
+                        ready.append(sub)
+
+                while ready and outstanding < self._concurrency:
+                    sub = ready.popleft()
+                    if not sub.active:
+                        continue
+                    task = asyncio.create_task(self._poll(sub, results))
+                    in_flight.add(task)
+                    task.add_done_callback(in_flight.discard)
+                    outstanding += 1
+
+                timeout = None
+                next_due = self._scheduler.next_due()
+                if next_due is not None and not ready:
+                    timeout = max(0.0, next_due - time.monotonic())
+
+                try:
+                    sub, result = await asyncio.wait_for(results.get(),
+                                                         timeout)
+                except asyncio.TimeoutError:
+                    continue
+
+                outstanding -= 1
+                sub.busy = False
+
+                if not isinstance(result, (Response, EapiError)):
+                    raise result
+
+                if not sub.active:
+                    # unsubscribed while in flight
+                    continue
+
+                if isinstance(result, EapiError):
+                    if sub.final:
+                        self.unsubscribe(sub)
+                    if not self._return_exceptions:
+                        raise result
+                    yield result, False
+                    continue
+
+                matched = self._matched(sub, result)
+                if matched or sub.final:
+                    self.unsubscribe(sub)
+
+                yield result, matched
+        finally:
+            for task in list(in_flight):
+                task.cancel()
+            await asyncio.gather(*in_flight, return_exceptions=True)
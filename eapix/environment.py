@@ -17,5 +17,79 @@ EAPI_DEFAULT_TIMEOUT = int(os.environ.get("EAPI_DEFAULT_TIMEOUT", 30.0))
 # By default eapi uses HTTP.  HTTPS ('https') is also supported
 EAPI_DEFAULT_TRANSPORT = os.environ.get("EAPI_DEFAULT_TRANSPORT", "http")
 
+# Parsed targets kept by URL
+EAPI_TARGET_CACHE_SIZE = int(os.environ.get("EAPI_TARGET_CACHE_SIZE", 8192))
+
+# Seconds a resolved host name is kept, 0 to resolve on every connection
+EAPI_DNS_TTL = float(os.environ.get("EAPI_DNS_TTL", 60.0))
+
+# eAPI socket on the switch ('protocol unix-socket'), used by 'unix://'
+EAPI_UNIX_SOCKET = os.environ.get("EAPI_UNIX_SOCKET",
+                                  "/var/run/command-api.sock")
+
 # Set this to false to allow untrusted HTTPS/SSL
 SSL_VERIFY = bool(os.environ.get("SSL_VERIFY", True))
+
+# Maximum number of in-flight requests when fanning out to many targets
+EAPI_FLEET_CONCURRENCY = int(os.environ.get("EAPI_FLEET_CONCURRENCY", 100))
+
+# Seconds an unused client (and its connections) is kept open for reuse
+EAPI_CLIENT_IDLE_TIMEOUT = float(
+    os.environ.get("EAPI_CLIENT_IDLE_TIMEOUT", 120.0))
+
+# Maximum number of connections opened to a single target
+EAPI_MAX_CONNECTIONS_PER_HOST = int(
+    os.environ.get("EAPI_MAX_CONNECTIONS_PER_HOST", 4))
+
+# Connection pool of a client: connections open at once (to all targets),
+# idle connections kept for reuse and seconds an idle connection is kept
+EAPI_MAX_CONNECTIONS = int(os.environ.get("EAPI_MAX_CONNECTIONS", 100))
+EAPI_MAX_KEEPALIVE_CONNECTIONS = int(
+    os.environ.get("EAPI_MAX_KEEPALIVE_CONNECTIONS", 20))
+EAPI_KEEPALIVE_EXPIRY = float(os.environ.get("EAPI_KEEPALIVE_EXPIRY", 5.0))
+
+# Cheap command sent to keep connections and sessions warm
+EAPI_KEEPALIVE_COMMAND = os.environ.get("EAPI_KEEPALIVE_COMMAND", "show clock")
+
+# Negotiate HTTP/2 with targets that support it (needs the 'h2' package)
+EAPI_HTTP2 = os.environ.get("EAPI_HTTP2", "").lower() in ("1", "true", "yes")
+
+# Session cookies kept across processes (see eapix.sessions): database file
+# and seconds a session is kept when the cookie has no expiry
+EAPI_SESSION_STORE = os.environ.get("EAPI_SESSION_STORE",
+                                    "~/.cache/eapix/sessions.db")
+EAPI_SESSION_TTL = float(os.environ.get("EAPI_SESSION_TTL", 3600.0))
+
+# JSON codec: 'auto' (orjson, then msgspec, then json), 'orjson', 'msgspec'
+# or 'json'
+EAPI_JSON_CODEC = os.environ.get("EAPI_JSON_CODEC", "auto")
+
+# Times a failed `show` call is retried (connection errors, timeouts and
+# 502/503/504), and the base and maximum backoff between tries in seconds
+EAPI_RETRIES = int(os.environ.get("EAPI_RETRIES", 0))
+EAPI_RETRY_BACKOFF = float(os.environ.get("EAPI_RETRY_BACKOFF", 0.5))
+EAPI_RETRY_MAX_BACKOFF = float(os.environ.get("EAPI_RETRY_MAX_BACKOFF", 10.0))
+
+# Consecutive failures after which calls to a target fail fast, 0 (the
+# default) disables, and seconds before a single trial call is let through
+# again
+EAPI_BREAKER_THRESHOLD = int(os.environ.get("EAPI_BREAKER_THRESHOLD", 0))
+EAPI_BREAKER_RESET = float(os.environ.get("EAPI_BREAKER_RESET", 30.0))
+
+# Defaults of a `Limiter`, which an AsyncClient only has when one is passed:
+# maximum requests in flight to a single target, 0 disables.
+# The limit adapts down when requests take longer than EAPI_TARGET_LATENCY
+# seconds, and requests per second are capped at EAPI_TARGET_RATE (0 disables)
+EAPI_TARGET_CONCURRENCY = int(os.environ.get("EAPI_TARGET_CONCURRENCY", 4))
+EAPI_TARGET_LATENCY = float(os.environ.get("EAPI_TARGET_LATENCY", 5.0))
+EAPI_TARGET_RATE = float(os.environ.get("EAPI_TARGET_RATE", 0.0))
+
+# Seconds a cached `show` response is kept and the number of responses kept,
+# when a client is given a `ResponseCache`
+EAPI_CACHE_TTL = float(os.environ.get("EAPI_CACHE_TTL", 5.0))
+EAPI_CACHE_SIZE = int(os.environ.get("EAPI_CACHE_SIZE", 1024))
+
+# Seconds a `Batcher` waits for more `show` calls to the same target before
+# sending them as one request, and the maximum commands in that request
+EAPI_BATCH_WINDOW = float(os.environ.get("EAPI_BATCH_WINDOW", 0.005))
+EAPI_BATCH_SIZE = int(os.environ.get("EAPI_BATCH_SIZE", 50))
@@ -2,10 +2,19 @@
 # Copyright (c) 2024 Arista Networks, Inc.  All rights reserved.
 # Arista Networks, Inc. Confidential and Proprietary.
 
+from typing import TYPE_CHECKING, Optional, Union
+
+import httpx
+
+if TYPE_CHECKING:
+    from eapix.types import Target
+
 
 class EapiError(Exception):
     """General eAPI failure"""
-    pass
+
+    # the target that failed, set when calling many targets at once
+    target: Optional[Union[str, "Target"]] = None
 
 
 class EapiTimeoutError(EapiError):
@@ -13,8 +22,30 @@ class EapiTimeoutError(EapiError):
     pass
 
 
-class EapiHttpError(EapiError):
-    """Raised when HTTP code is not 2xx"""
+class EapiConnectionError(EapiError):
+    """Raised when the target can not be reached or drops the connection"""
+    pass
+
+
+class EapiHttpError(EapiError, httpx.HTTPStatusError):
+    """Raised when HTTP code is not 2xx
+
+    Also an `httpx.HTTPStatusError`, as raised by `raise_for_status`
+    """
+
+    def __init__(self, message: str, status_code: Optional[int] = None,
+                 response: Optional[httpx.Response] = None):
+        httpx.HTTPError.__init__(self, message)
+        if response is not None:
+            self.request = response.request
+            if status_code is None:
+                status_code = response.status_code
+        self.response = response  # type: ignore
+        self.status_code = status_code
+
+
+class EapiCircuitOpenError(EapiError):
+    """Raised without calling a target that has been failing"""
     pass
 
 
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2024 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+
+import asyncio
+
+from typing import AsyncIterator, Iterable, Optional, Union
+
+import eapix.environment
+from eapix.client import AsyncClient
+from eapix.exceptions import EapiError
+from eapix.response import Response
+from eapix.types import Auth, Certificate, CommandList, EapiOptions, Target
+
+# marks a worker as finished on the results queue
+_DONE = object()
+
+
+class _Raised:
+    """an exception that is not an `EapiError`, re-raised by the consumer"""
+
+    __slots__ = ("exc",)
+
+    def __init__(self, exc: Exception):
+        self.exc = exc
+
+
+class Fleet:
+    """Send the same commands to many targets over one shared `AsyncClient`
+
+    At most `concurrency` requests are in flight at any time and the
+    underlying connection pool lives as long as the `Fleet`, so repeated
+    polling cycles reuse warm connections.
+
+    >>> async with Fleet(auth=("admin", ""), concurrency=200) as fleet:
+    ...     async for response in fleet.execute(targets, ["show version"]):
+    ...         print(response.target)
+    """
+
+    def __init__(self,
+                 client: Optional[AsyncClient] = None,
+                 concurrency: int = eapix.environment.EAPI_FLEET_CONCURRENCY,
+                 auth: Optional[Auth] = None,
+                 cert: Optional[Certificate] = None,
+                 verify: Optional[bool] = None,
+                 **kwargs):
+
+        if concurrency < 1:
+            raise ValueError(f"invalid concurrency '{concurrency}'. "
+                             "must be >= 1")
+
+        self._concurrency = concurrency
+        self._owns_client = client is None
+
+        if client is None:
+            # never open more sockets than there are workers to use them
+            kwargs.setdefault("max_connections", concurrency)
+            kwargs.setdefault("max_keepalive_connections", concurrency)
+            client = AsyncClient(auth=auth, cert=cert, verify=verify, **kwargs)
+
+        self._client = client
+
+    async def __aenter__(self) -> "Fleet":
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.close()
+
+    @property
+    def client(self) -> AsyncClient:
+        return self._client
+
+    async def close(self) -> None:
+        """close the client, unless it was passed in by the caller"""
+        if self._owns_client:
+            await self._client.close()
+
+    async def execute(self,
+                      targets: Iterable[Union[str, Target]],
+                      commands: CommandList,
+                      options: EapiOptions = EapiOptions(),
+                      return_exceptions: bool = False,
+                      **kwargs) -> AsyncIterator[Union[Response, EapiError]]:
+        """call commands on every target, yielding responses as they complete
+
+        :param targets: eAPI targets
+        :param type: Iterable
+        :param commands: List of commands to send to each target
+        :param type: list
+        :param options: eapi options
+        :param type: EapiOptions
+        :param return_exceptions: yield `EapiError`s instead of raising them.
+            The failed target is stored in the error's `target` attribute
+        :param type: bool
+        :param **kwargs: other pass through `httpx` options
+        :param type: dict
+        """
+
+        pending = iter(targets)
+        # bounded, so a slow consumer pauses the workers
+        results: asyncio.Queue = asyncio.Queue(maxsize=self._concurrency)
+
+        async def _worker():
+            try:
+                for target in pending:
+                    try:
+                        result = await self._client.call(target, commands,
+                                                         options, **kwargs)
+                    except EapiError as exc:
+                        exc.target = target
+                        result = exc
+                    await results.put(result)
+            except Exception as exc:
+                # not a failure of the target (an invalid target, a bug),
+                # stops the whole run
+                await results.put(_Raised(exc))
+            finally:
+                # every worker reports back, unless cancelled
+                task = asyncio.current_task()
+                if task is None or not task.cancelling():
+                    await results.put(_DONE)
+
+        workers = [asyncio.create_task(_worker())
+                   for _ in range(self._concurrency)]
+
+        try:
+            running = len(workers)
+            while running:
+                result = await results.get()
+
+                if result is _DONE:
+                    running -= 1
+                    continue
+
+                if isinstance(result, _Raised):
+                    raise result.exc
+
+                if isinstance(result, EapiError) and not return_exceptions:
+                    raise result
+
+                yield result
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2024 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+"""
+Per-target concurrency and rate limits
+
+eAPI only serves a few requests at a time well and small platforms slow down
+badly when pushed harder. `Limiter` caps the requests in flight to each
+target and, optionally, the rate they are sent at. Targets are only tracked
+while they are busy or throttled.
+
+The in-flight cap adapts to each target (AIMD): it grows by about one for
+every `limit` requests that complete within `latency` seconds and halves
+(at most once per round trip) when a request is slower, times out or the
+target reports it is overloaded.
+"""
+
+import asyncio
+import collections
+import math
+import time
+
+from typing import Callable, Deque, Dict, Optional
+
+import eapix.environment
+
+
+class TokenBucket:
+    """Lets `rate` requests through per second, with bursts of `burst`
+
+    :param rate: requests per second
+    :param type: float
+    :param burst: requests that may be sent at once (default: `rate`, min 1)
+    :param type: float
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+
+        if rate <= 0:
+            raise ValueError(f"invalid rate '{rate}'. must be > 0")
+
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self._clock = clock
+        self._tokens = self.burst
+        self._updated = clock()
+
+    def reserve(self) -> float:
+        """take a token, returns seconds to wait before using it
+
+        Tokens are reserved in order, so waiters are served first come first
+        served.
+        """
+
+        now = self._clock()
+        self._tokens = min(self.burst,
+                           self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+        self._tokens -= 1
+        return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def full(self) -> bool:
+        """a burst could be sent now"""
+        elapsed = self._clock() - self._updated
+        return self._tokens + elapsed * self.rate >= self.burst
+
+    async def acquire(self) -> None:
+        """wait for a token"""
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class _TargetLimit:
+    __slots__ = ("limit", "in_flight", "waiters", "bucket", "decreased")
+
+    def __init__(self, limit: float, bucket: Optional[TokenBucket]):
+        self.limit = limit
+        self.in_flight = 0
+        self.waiters: Deque[asyncio.Future] = collections.deque()
+        self.bucket = bucket
+        self.decreased = -math.inf
+
+
+class Limiter:
+    """Limits requests in flight to, and the request rate of, each target
+
+    >>> client = AsyncClient(limiter=Limiter(concurrency=2, rate=5.0))
+
+    :param concurrency: maximum requests in flight per target, 0 for no limit
+    :param type: int
+    :param rate: maximum requests per second per target, 0 for no limit
+    :param type: float
+    :param burst: requests per target that may be sent at once
+    :param type: float
+    :param adaptive: adapt the in-flight limit to the target's latency
+    :param type: bool
+    :param latency: seconds a request may take before the target is
+        considered overloaded
+    :param type: float
+    :param decrease: the limit is multiplied by this when overloaded
+    :param type: float
+    """
+
+    def __init__(self,
+                 concurrency: int = eapix.environment.EAPI_TARGET_CONCURRENCY,
+                 rate: float = eapix.environment.EAPI_TARGET_RATE,
+                 burst: Optional[float] = None,
+                 adaptive: bool = True,
+                 latency: float = eapix.environment.EAPI_TARGET_LATENCY,
+                 decrease: float = 0.5,
+                 clock: Callable[[], float] = time.monotonic):
+
+        if not 0 < decrease < 1:
+            raise ValueError(f"invalid decrease '{decrease}'. "
+                             "must be > 0 and < 1")
+
+        self.concurrency = concurrency
+        self.rate = rate
+        self.burst = burst
+        self.adaptive = adaptive and concurrency > 0
+        self.latency = latency
+        self.decrease = decrease
+        self._clock = clock
+        self._targets: Dict[str, _TargetLimit] = {}
+
+    @property
+    def _max_limit(self) -> float:
+        return self.concurrency if self.concurrency > 0 else math.inf
+
+    def _get(self, key: str) -> _TargetLimit:
+        state = self._targets.get(key)
+        if state is None:
+            bucket = None
+            if self.rate > 0:
+                bucket = TokenBucket(self.rate, self.burst, self._clock)
+            state = self._targets[key] = _TargetLimit(self._max_limit, bucket)
+        return state
+
+    def _prune(self, key: str, state: _TargetLimit) -> None:
+        # forget targets that are idle and no longer throttled, a new state
+        # is the same
+        if state.in_flight or state.waiters or \
+                state.limit < self._max_limit:
+            return
+        if state.bucket is not None and not state.bucket.full():
+            return
+        del self._targets[key]
+
+    def limit(self, key: str) -> float:
+        """the current in-flight limit for `key`"""
+        state = self._targets.get(key)
+        return state.limit if state is not None else self._max_limit
+
+    def in_flight(self, key: str) -> int:
+        """requests to `key` holding a slot"""
+        state = self._targets.get(key)
+        return state.in_flight if state is not None else 0
+
+    def _available(self, state: _TargetLimit) -> bool:
+        return state.in_flight + 1 <= max(1.0, state.limit)
+
+    def _wake(self, state: _TargetLimit) -> None:
+        # hand free slots to waiters in order
+        while state.waiters and self._available(state):
+            waiter = state.waiters.popleft()
+            if not waiter.done():
+                state.in_flight += 1
+                waiter.set_result(None)
+
+    async def acquire(self, key: str) -> None:
+        """wait for a slot, and a token if rate limited"""
+
+        state = self._get(key)
+
+        if self._available(state) and not state.waiters:
+            state.in_flight += 1
+        else:
+            waiter = asyncio.get_running_loop().create_future()
+            state.waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    # a slot was handed over before the cancellation
+                    self.release(key)
+                raise
+
+        if state.bucket is not None:
+            try:
+                await state.bucket.acquire()
+            except asyncio.CancelledError:
+                self.release(key)
+                raise
+
+    def release(self, key: str) -> None:
+        """give a slot back"""
+        state = self._get(key)
+        state.in_flight -= 1
+        self._wake(state)
+        self._prune(key, state)
+
+    def observe(self, key: str, latency: float,
+                overloaded: bool = False) -> None:
+        """adapt the limit of `key` to a completed request
+
+        :param latency: seconds the request took
+        :param overloaded: the request timed out or was refused
+        """
+
+        if not self.adaptive:
+            return
+
+        state = self._get(key)
+        now = self._clock()
+
+        if overloaded or latency > self.latency:
+            # once per round trip, requests already in flight saw the same
+            if now - state.decreased >= latency:
+                state.limit = max(1.0, state.limit * self.decrease)
+                state.decreased = now
+        else:
+            state.limit = min(float(self.concurrency),
+                              state.limit + 1 / state.limit)
+            self._wake(state)
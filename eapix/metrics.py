@@ -0,0 +1,332 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2024 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+"""
+Client metrics
+
+Pass a `Metrics` to a client to record, per target, how long requests take
+and where the time goes: waiting for a pooled connection, connecting, the
+target answering and decoding the JSON. Also the bytes sent and received,
+retries and errors by class. Clients without one record nothing.
+
+Read the metrics with `snapshot()`, or in the Prometheus text format with
+`prometheus()` or from the endpoint of `start_http_server`.
+
+Request latency by command is only recorded with a `command_label`, which
+names the series of each command, or None to skip it. Every name is a new
+series, keep them few:
+
+    Metrics(command_label=lambda command: " ".join(command.split()[:2]))
+"""
+
+import bisect
+import http.server
+import threading
+import time
+
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import httpx
+
+from eapix.exceptions import EapiError
+from eapix.tracing import add_trace
+
+Labels = Tuple[Tuple[str, str], ...]
+
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25,
+           0.5, 1.0, 2.5, 5.0, 10.0)
+
+HISTOGRAMS = {
+    "eapi_request_seconds": "eAPI request latency, to the whole body",
+    "eapi_command_seconds": "latency of the requests including a command",
+    "eapi_pool_wait_seconds": "time before a request was sent, less "
+                              "connecting",
+    "eapi_connect_seconds": "time connecting, with the TLS handshake",
+    "eapi_decode_seconds": "time decoding JSON-RPC responses",
+}
+
+COUNTERS = {
+    "eapi_sent_bytes_total": "request bytes sent",
+    "eapi_received_bytes_total": "response bytes received",
+    "eapi_retries_total": "retried requests",
+    "eapi_errors_total": "failed requests, by error class",
+}
+
+
+class Histogram:
+    """Counts of observations at or below each of `buckets`
+
+    :param buckets: upper bounds, ascending
+    :param type: tuple
+    """
+
+    __slots__ = ("buckets", "counts", "count", "sum")
+
+    def __init__(self, buckets: Sequence[float] = BUCKETS):
+        self.buckets = tuple(buckets)
+        # the last one is +Inf
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> List[Tuple[float, int]]:
+        """(upper bound, observations at or below it)"""
+
+        total = 0
+        pairs = []
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            pairs.append((bound, total))
+        return pairs
+
+
+class Measurement:
+    """One request, from `Metrics.start` to `done` or `failed`"""
+
+    __slots__ = ("_metrics", "_target", "_commands", "_started",
+                 "_connecting", "_connected", "_sending", "_sent",
+                 "_finished")
+
+    def __init__(self, metrics: "Metrics", target: str, request: dict,
+                 sent: int):
+        self._metrics = metrics
+        self._target = target
+        self._commands: List[str] = []
+        if metrics.command_label is not None:
+            labels = (metrics.command_label(
+                cmd["cmd"] if isinstance(cmd, dict) else cmd)
+                for cmd in request["params"]["cmds"])
+            # once per request
+            self._commands = list(dict.fromkeys(
+                label for label in labels if label is not None))
+        self._sent = sent
+        self._connecting: Optional[float] = None
+        self._connected = 0.0
+        self._sending: Optional[float] = None
+        self._started = time.monotonic()
+        self._finished = False
+
+    def trace(self, event: str, info: dict) -> None:
+        """httpcore trace extension, times the pool wait and connecting"""
+
+        if event.startswith("connection.") and event.endswith(".started"):
+            self._connecting = time.monotonic()
+        elif event.startswith("connection.") and \
+                self._connecting is not None and \
+                event.endswith((".complete", ".failed")):
+            self._connected += time.monotonic() - self._connecting
+            self._connecting = None
+        elif event.endswith("send_request_headers.started") and \
+                self._sending is None:
+            self._sending = time.monotonic()
+
+    async def atrace(self, event: str, info: dict) -> None:
+        self.trace(event, info)
+
+    def done(self, response: Optional[httpx.Response] = None) -> None:
+        """record the request, only the first `done` or `failed` counts"""
+        if not self._finished:
+            self._finished = True
+            self._metrics._finish(self, response, None)
+
+    def failed(self, error: EapiError,
+               response: Optional[httpx.Response] = None) -> None:
+        if not self._finished:
+            self._finished = True
+            self._metrics._finish(self, response, error)
+
+
+class Metrics:
+    """Histograms and counters of a client's requests
+
+    :param buckets: upper bounds of the histograms, in seconds
+    :param type: tuple
+    :param command_label: names the `eapi_command_seconds` series of a
+        command, None skips it. No latency by command without one
+    :param type: callable
+    """
+
+    def __init__(self, buckets: Sequence[float] = BUCKETS,
+                 command_label: Optional[
+                     Callable[[str], Optional[str]]] = None):
+        self.buckets = tuple(buckets)
+        self.command_label = command_label
+        self._histograms: Dict[str, Dict[Labels, Histogram]] = {
+            name: {} for name in HISTOGRAMS}
+        self._counters: Dict[str, Dict[Labels, float]] = {
+            name: {} for name in COUNTERS}
+        self._lock = threading.Lock()
+
+    def _observe(self, name: str, labels: Labels, value: float) -> None:
+        series = self._histograms[name]
+        histogram = series.get(labels)
+        if histogram is None:
+            histogram = series[labels] = Histogram(self.buckets)
+        histogram.observe(value)
+
+    def _add(self, name: str, labels: Labels, value: float = 1) -> None:
+        series = self._counters[name]
+        series[labels] = series.get(labels, 0) + value
+
+    def start(self, target: str, request: dict, options: dict,
+              sent: int = 0, asynchronous: bool = False) -> Measurement:
+        """measure a request to `target`, tracing it through `options`
+
+        :param target: URL of the target
+        :param type: str
+        :param request: the JSON-RPC request
+        :param type: dict
+        :param options: httpx options of the request, the trace extension is
+            added
+        :param type: dict
+        :param sent: bytes of the request body
+        :param type: int
+        """
+
+        measurement = Measurement(self, target, request, sent)
+        add_trace(options, measurement.trace, measurement.atrace,
+                  asynchronous)
+        return measurement
+
+    def _finish(self, measurement: Measurement,
+                response: Optional[httpx.Response],
+                error: Optional[EapiError]) -> None:
+        elapsed = time.monotonic() - measurement._started
+        target = (("target", measurement._target),)
+
+        with self._lock:
+            self._observe("eapi_request_seconds", target, elapsed)
+            for command in measurement._commands:
+                self._observe("eapi_command_seconds",
+                              (("command", command),), elapsed)
+
+            if measurement._sending is not None:
+                self._observe("eapi_pool_wait_seconds", target,
+                              measurement._sending - measurement._started
+                              - measurement._connected)
+            if measurement._connected:
+                self._observe("eapi_connect_seconds", target,
+                              measurement._connected)
+
+            self._add("eapi_sent_bytes_total", target, measurement._sent)
+            if response is not None:
+                self._add("eapi_received_bytes_total", target,
+                          response.num_bytes_downloaded)
+            if error is not None:
+                self._add("eapi_errors_total",
+                          target + (("error", type(error).__name__),))
+
+    def decoded(self, target: str, seconds: float) -> None:
+        """a response of `target` took `seconds` to decode"""
+
+        with self._lock:
+            self._observe("eapi_decode_seconds", (("target", target),),
+                          seconds)
+
+    def retried(self, target: str, error: EapiError) -> None:
+        """a request to `target` is retried after `error`"""
+
+        with self._lock:
+            self._add("eapi_retries_total", (("target", target),))
+
+    def snapshot(self) -> Dict[str, List[Dict[str, Any]]]:
+        """the metrics, by name, as lists of series
+
+        Histograms are {'labels', 'count', 'sum', 'buckets'}, buckets being
+        cumulative counts by upper bound, counters {'labels', 'value'}.
+        """
+
+        with self._lock:
+            metrics: Dict[str, List[Dict[str, Any]]] = {}
+            for name, series in self._histograms.items():
+                metrics[name] = [
+                    {"labels": dict(labels), "count": h.count, "sum": h.sum,
+                     "buckets": dict(h.cumulative())}
+                    for labels, h in series.items()]
+            for name, values in self._counters.items():
+                metrics[name] = [{"labels": dict(labels), "value": value}
+                                 for labels, value in values.items()]
+        return metrics
+
+    def prometheus(self) -> str:
+        """the metrics in the Prometheus text exposition format"""
+
+        lines = []
+        for name, series in self.snapshot().items():
+            kind = "histogram" if name in HISTOGRAMS else "counter"
+            lines.append(f"# HELP {name} "
+                         f"{HISTOGRAMS.get(name) or COUNTERS[name]}")
+            lines.append(f"# TYPE {name} {kind}")
+
+            for sample in series:
+                labels = sample["labels"]
+                if kind == "counter":
+                    lines.append(f"{name}{_labels(labels)} "
+                                 f"{_number(sample['value'])}")
+                    continue
+
+                for bound, count in sample["buckets"].items():
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f"{name}_bucket"
+                                 f"{_labels(dict(labels, le=le))} {count}")
+                lines.append(f"{name}_sum{_labels(labels)} "
+                             f"{_number(sample['sum'])}")
+                lines.append(f"{name}_count{_labels(labels)} "
+                             f"{sample['count']}")
+
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        """forget everything recorded"""
+
+        with self._lock:
+            for series in self._histograms.values():
+                series.clear()
+            for values in self._counters.values():
+                values.clear()
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"") \
+        .replace("\n", "\\n")
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(str(v))}"'
+                          for k, v in labels.items()) + "}"
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def start_http_server(metrics: Metrics, port: int,
+                      host: str = "") -> http.server.ThreadingHTTPServer:
+    """serve `metrics` to Prometheus on `port`, from a daemon thread
+
+    Call `shutdown()` on the returned server to stop it.
+    """
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = metrics.prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type",
+                             "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
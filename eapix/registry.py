@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2024 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+
+import atexit
+import threading
+import time
+
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Iterator, Optional, Tuple, Union
+
+import httpx
+
+import eapix.environment
+from eapix.client import Client
+from eapix.types import Auth, Certificate, Target
+
+RegistryKey = Tuple[str, Optional[Auth], Optional[Certificate], Optional[bool]]
+
+
+@dataclass
+class _Entry:
+    client: Client
+    last_used: float
+    users: int = 0
+
+
+class ClientRegistry:
+    """Keeps `Client`s open between calls, keyed by target and credentials
+
+    Reusing a client keeps its connections (and any `Session` cookie from
+    `/login`) alive across calls. Clients that have not been used for
+    `idle_timeout` seconds are closed the next time the registry is used.
+
+    >>> with ClientRegistry() as registry:
+    ...     for _ in range(10):
+    ...         execute("veos", ["show clock"], registry=registry)
+    """
+
+    def __init__(
+            self,
+            idle_timeout: float = eapix.environment.EAPI_CLIENT_IDLE_TIMEOUT,
+            max_connections: int = (
+                eapix.environment.EAPI_MAX_CONNECTIONS_PER_HOST)):
+
+        self._idle_timeout = idle_timeout
+        self._max_connections = max_connections
+        self._entries: Dict[RegistryKey, _Entry] = {}
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "ClientRegistry":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _new_client(self, auth, cert, verify) -> Client:
+        limits = httpx.Limits(max_connections=self._max_connections,
+                              max_keepalive_connections=self._max_connections,
+                              keepalive_expiry=self._idle_timeout)
+
+        return Client(auth=auth, cert=cert, verify=verify, limits=limits)
+
+    @contextmanager
+    def client(self,
+               target: Union[str, Target],
+               auth: Optional[Auth] = None,
+               cert: Optional[Certificate] = None,
+               verify: Optional[bool] = None) -> Iterator[Client]:
+        """borrow the client for a target, creating it if needed
+
+        :param target: eAPI target (host, port)
+        :param type: str
+        :param auth: username, password tuple
+        :param type: Auth
+        :param cert: client certificate
+        :param verify: verify SSL cert
+        """
+
+        key: RegistryKey = (Target.from_url(target).to_url(), auth, cert,
+                            verify)
+
+        with self._lock:
+            self._evict(time.monotonic())
+
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = _Entry(self._new_client(auth, cert, verify),
+                               time.monotonic())
+                self._entries[key] = entry
+
+            entry.users += 1
+
+        try:
+            yield entry.client
+        finally:
+            with self._lock:
+                entry.users -= 1
+                entry.last_used = time.monotonic()
+
+    def _evict(self, now: float) -> None:
+        # caller must hold the lock
+        for key, entry in list(self._entries.items()):
+            if entry.users == 0 and now - entry.last_used > self._idle_timeout:
+                del self._entries[key]
+                entry.client.close()
+
+    def evict_idle(self) -> None:
+        """close clients that have been idle longer than `idle_timeout`"""
+        with self._lock:
+            self._evict(time.monotonic())
+
+    def close(self) -> None:
+        """close all clients"""
+        with self._lock:
+            entries = list(self._entries.values())
+            self._entries.clear()
+
+        for entry in entries:
+            entry.client.close()
+
+
+# process-wide registry used by `eapix.execute` and friends
+default_registry = ClientRegistry()
+
+atexit.register(default_registry.close)
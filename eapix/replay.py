@@ -0,0 +1,305 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2024 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+"""
+Record and replay
+
+`RecordingTransport` passes requests on to a real transport and appends
+each request/response pair to a file, one JSON object per line with the
+response body compressed. `ReplayTransport` answers from that file, at
+wire speed or with the recorded timing, so parsing and whatever consumes
+the responses can be profiled with real payloads and no switch.
+
+With the recorded timing each reply takes its recorded response time, and
+is not sent before it was in the recording, counting from the first
+request: a client that sends faster than the recorded one is held to the
+recorded pace, a slower one sees the recorded response times. Both are
+scaled by `speed`.
+
+Requests are matched on method, URL and body, less the JSON-RPC ids, and
+the recorded ids are swapped for the new ones. Requests recorded more than
+once are answered in the recorded order, over and over. Only a digest of
+each request body is kept, and logins are matched on their URL alone, so
+no password (nor a digest of one) is kept. The session cookies in the
+responses are kept as they are, the file is created readable by its owner
+only.
+
+    with Client(transport=RecordingTransport("show.ndjson",
+                                             verify=False)) as sess:
+        sess.call("https://veos", ["show version"])
+
+    with Client(transport=ReplayTransport("show.ndjson")) as sess:
+        sess.call("https://veos", ["show version"])
+"""
+
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+import zlib
+
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+Record = Dict[str, Any]
+
+
+def _ids(body: Any) -> List[str]:
+    messages = body if isinstance(body, list) else [body]
+    return [str(m["id"]) for m in messages
+            if isinstance(m, dict) and "id" in m]
+
+
+def _without_ids(body: Any) -> Any:
+    if isinstance(body, list):
+        return [_without_ids(message) for message in body]
+    if isinstance(body, dict):
+        return {k: v for k, v in body.items() if k != "id"}
+    return body
+
+
+def _key(request: httpx.Request) -> Tuple[str, List[str]]:
+    """digest of `request` and its JSON-RPC ids"""
+
+    content = request.content
+    ids: List[str] = []
+    if request.url.path == "/login":
+        # the credentials are not digested
+        content = b""
+    try:
+        body = json.loads(content)
+    except ValueError:
+        pass
+    else:
+        ids = _ids(body)
+        content = json.dumps(_without_ids(body), sort_keys=True).encode()
+
+    digest = hashlib.sha256(f"{request.method} {request.url}\n".encode())
+    digest.update(content)
+    return digest.hexdigest(), ids
+
+
+def _decoded(response: httpx.Response) -> httpx.Response:
+    """`response`, read, with the body decoded"""
+
+    # the body is kept decoded
+    headers = [(k, v) for k, v in response.headers.multi_items()
+               if k not in ("content-encoding", "content-length")]
+    return httpx.Response(response.status_code, headers=headers,
+                          content=response.content,
+                          extensions=response.extensions)
+
+
+class _Writer:
+    """appends records to `path`"""
+
+    def __init__(self, path: str):
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o600)
+        self._file = os.fdopen(fd, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+        self._start = time.monotonic()
+
+    def write(self, request: httpx.Request, response: httpx.Response,
+              elapsed: float) -> None:
+        key, ids = _key(request)
+        record = {
+            "at": round(time.monotonic() - self._start - elapsed, 6),
+            "elapsed": round(elapsed, 6),
+            "method": request.method,
+            "url": str(request.url),
+            "key": key,
+            "ids": ids,
+            "status": response.status_code,
+            "headers": response.headers.multi_items(),
+            "body": base64.b64encode(
+                zlib.compress(response.content)).decode("ascii"),
+        }
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+class RecordingTransport(httpx.BaseTransport):
+    """Records the requests sent through `transport` to `path`
+
+    :param path: file the records are appended to
+    :param type: str
+    :param transport: sends the requests, a `httpx.HTTPTransport` built from
+        `kwargs` by default (verify, cert, http2)
+    :param type: httpx.BaseTransport
+    """
+
+    def __init__(self, path: str,
+                 transport: Optional[httpx.BaseTransport] = None,
+                 **kwargs: Any):
+        self._transport = transport or httpx.HTTPTransport(**kwargs)
+        self._writer = _Writer(path)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        start = time.monotonic()
+        response = self._transport.handle_request(request)
+        try:
+            response.read()
+        finally:
+            response.close()
+
+        response = _decoded(response)
+        self._writer.write(request, response, time.monotonic() - start)
+        return response
+
+    def close(self) -> None:
+        self._transport.close()
+        self._writer.close()
+
+
+class AsyncRecordingTransport(httpx.AsyncBaseTransport):
+    """Records the requests sent through `transport` to `path`
+
+    :param path: file the records are appended to
+    :param type: str
+    :param transport: sends the requests, a `httpx.AsyncHTTPTransport` built
+        from `kwargs` by default (verify, cert, http2)
+    :param type: httpx.AsyncBaseTransport
+    """
+
+    def __init__(self, path: str,
+                 transport: Optional[httpx.AsyncBaseTransport] = None,
+                 **kwargs: Any):
+        self._transport = transport or httpx.AsyncHTTPTransport(**kwargs)
+        self._writer = _Writer(path)
+
+    async def handle_async_request(self,
+                                   request: httpx.Request) -> httpx.Response:
+        start = time.monotonic()
+        response = await self._transport.handle_async_request(request)
+        try:
+            await response.aread()
+        finally:
+            await response.aclose()
+
+        response = _decoded(response)
+        self._writer.write(request, response, time.monotonic() - start)
+        return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+        self._writer.close()
+
+
+class Recording:
+    """The records of a file, by request
+
+    :param path: file written by a recording transport
+    :param type: str
+    """
+
+    def __init__(self, path: str):
+        self._records: Dict[str, List[Record]] = {}
+        self._next: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+        with open(path, encoding="utf-8") as fh:
+            for line in fh:
+                if line.strip():
+                    record = json.loads(line)
+                    self._records.setdefault(record["key"], []).append(record)
+
+        # when the first request was sent
+        self.origin = min((record["at"] for records in self._records.values()
+                           for record in records), default=0.0)
+
+    def __len__(self) -> int:
+        return sum(len(records) for records in self._records.values())
+
+    def answer(self,
+               request: httpx.Request) -> Tuple[httpx.Response, float, float]:
+        """the recorded response to `request`, its response time and when it
+        was answered, counting from the first request"""
+
+        key, ids = _key(request)
+        records = self._records.get(key)
+        if not records:
+            raise httpx.TransportError(
+                f"no recorded response to {request.method} {request.url}",
+                request=request)
+
+        with self._lock:
+            index = self._next.get(key, 0)
+            self._next[key] = (index + 1) % len(records)
+        record = records[index]
+
+        body = zlib.decompress(base64.b64decode(record["body"]))
+        for old, new in zip(record["ids"], ids):
+            body = body.replace(json.dumps(old).encode(),
+                                json.dumps(new).encode())
+
+        response = httpx.Response(record["status"],
+                                  headers=record["headers"], content=body,
+                                  request=request)
+        elapsed = record["elapsed"]
+        return response, elapsed, record["at"] - self.origin + elapsed
+
+
+def _wait(started: float, elapsed: float, due: float, speed: float) -> float:
+    """seconds to hold a reply, its response time and no less than until it
+    is due"""
+    return max(elapsed, due - (time.monotonic() - started) * speed) / speed
+
+
+class ReplayTransport(httpx.BaseTransport):
+    """Answers requests from a recording
+
+    :param path: file written by a recording transport
+    :param type: str
+    :param speed: None answers at once, 1.0 keeps the recorded timing, 2.0
+        takes half of it
+    :param type: float
+    """
+
+    def __init__(self, path: str, speed: Optional[float] = None):
+        self.recording = Recording(path)
+        self.speed = speed
+        self._started: Optional[float] = None
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        if self._started is None:
+            self._started = time.monotonic()
+        response, elapsed, due = self.recording.answer(request)
+        if self.speed:
+            time.sleep(_wait(self._started, elapsed, due, self.speed))
+        return response
+
+
+class AsyncReplayTransport(httpx.AsyncBaseTransport):
+    """Answers requests from a recording
+
+    :param path: file written by a recording transport
+    :param type: str
+    :param speed: None answers at once, 1.0 keeps the recorded timing, 2.0
+        takes half of it
+    :param type: float
+    """
+
+    def __init__(self, path: str, speed: Optional[float] = None):
+        self.recording = Recording(path)
+        self.speed = speed
+        self._started: Optional[float] = None
+
+    async def handle_async_request(self,
+                                   request: httpx.Request) -> httpx.Response:
+        if self._started is None:
+            self._started = time.monotonic()
+        response, elapsed, due = self.recording.answer(request)
+        if self.speed:
+            await asyncio.sleep(_wait(self._started, elapsed, due,
+                                      self.speed))
+        return response
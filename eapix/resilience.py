@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2024 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+"""
+Retries and circuit breaking
+
+`RetryPolicy` retries idempotent (`show`) calls that failed because the target
+was unreachable, timed out or answered 502/503/504, backing off exponentially
+with full jitter between tries.
+
+`CircuitBreaker` counts consecutive failures per target. Once `threshold` is
+reached the circuit opens and calls fail immediately with
+`EapiCircuitOpenError` instead of waiting out a timeout. After `reset`
+seconds one trial call is let through: success closes the circuit, failure
+opens it again.
+"""
+
+import asyncio
+import random
+import re
+import threading
+import time
+
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Iterator, Optional, TypeVar
+
+import eapix.environment
+from eapix.exceptions import (
+    EapiCircuitOpenError,
+    EapiConnectionError,
+    EapiError,
+    EapiHttpError,
+    EapiTimeoutError)
+
+T = TypeVar("T")
+
+# called with the key and the error before each retry
+Retried = Callable[[str, EapiError], None]
+
+# commands that are safe to send twice
+_IDEMPOTENT_RE = re.compile(r"^\s*(?:show|enable)\b", re.IGNORECASE)
+
+_RETRY_STATUS = (502, 503, 504)
+
+
+def is_idempotent(request: dict) -> bool:
+    """all commands in a prepared request are `show` (or `enable`)"""
+    cmds = request["params"]["cmds"]
+    return all(_IDEMPOTENT_RE.match(cmd["cmd"]) for cmd in cmds)
+
+
+def is_failure(exc: BaseException) -> bool:
+    """the error says the target is down or unhealthy"""
+
+    if isinstance(exc, (EapiConnectionError, EapiTimeoutError)):
+        return True
+
+    if isinstance(exc, EapiHttpError):
+        return exc.status_code in _RETRY_STATUS
+
+    return False
+
+
+@dataclass
+class RetryPolicy:
+    """How often and how long to wait before retrying a failed call
+
+    :param retries: tries after the first, 0 disables retries
+    :param type: int
+    :param backoff: base delay in seconds, doubled after every try
+    :param type: float
+    :param max_backoff: upper bound for a single delay
+    :param type: float
+    """
+
+    retries: int = eapix.environment.EAPI_RETRIES
+    backoff: float = eapix.environment.EAPI_RETRY_BACKOFF
+    max_backoff: float = eapix.environment.EAPI_RETRY_MAX_BACKOFF
+
+    def delays(self) -> Iterator[float]:
+        """the delays before each retry, with full jitter"""
+        for attempt in range(self.retries):
+            cap = min(self.max_backoff, self.backoff * 2 ** attempt)
+            yield random.uniform(0, cap)
+
+
+class _Circuit:
+    __slots__ = ("failures", "opened", "probing")
+
+    def __init__(self):
+        self.failures = 0
+        self.opened: Optional[float] = None
+        self.probing = False
+
+
+class CircuitBreaker:
+    """Fails calls to a target fast while it keeps failing
+
+    Shared by all calls made through one client, keyed by target URL.
+
+    :param threshold: consecutive failures that open the circuit, 0 disables
+    :param type: int
+    :param reset: seconds the circuit stays open before a trial call
+    :param type: float
+    """
+
+    def __init__(self,
+                 threshold: int = eapix.environment.EAPI_BREAKER_THRESHOLD,
+                 reset: float = eapix.environment.EAPI_BREAKER_RESET,
+                 clock: Callable[[], float] = time.monotonic):
+
+        self.threshold = threshold
+        self.reset = reset
+        self._clock = clock
+        self._circuits: Dict[str, _Circuit] = {}
+        self._lock = threading.Lock()
+
+    def is_open(self, key: str) -> bool:
+        """calls to `key` are currently failing fast"""
+        circuit = self._circuits.get(key)
+        return circuit is not None and circuit.opened is not None
+
+    def before(self, key: str) -> bool:
+        """call before each try, True if it is the trial call
+
+        :raises EapiCircuitOpenError: if the circuit is open
+        """
+
+        if self.threshold < 1:
+            return False
+
+        with self._lock:
+            circuit = self._circuits.get(key)
+            if circuit is None or circuit.opened is None:
+                return False
+
+            remaining = circuit.opened + self.reset - self._clock()
+            if remaining > 0 or circuit.probing:
+                raise EapiCircuitOpenError(
+                    f"circuit open for {key}, {circuit.failures} consecutive "
+                    f"failures. retry in {max(remaining, 0):.1f}s")
+
+            circuit.probing = True
+            return True
+
+    def success(self, key: str) -> None:
+        with self._lock:
+            self._circuits.pop(key, None)
+
+    def failure(self, key: str) -> None:
+        if self.threshold < 1:
+            return
+
+        with self._lock:
+            circuit = self._circuits.setdefault(key, _Circuit())
+            circuit.failures += 1
+            circuit.probing = False
+            if circuit.opened is not None \
+                    or circuit.failures >= self.threshold:
+                circuit.opened = self._clock()
+
+    def release(self, key: str) -> None:
+        """the trial call ended without an outcome, eg. it was cancelled"""
+        with self._lock:
+            circuit = self._circuits.get(key)
+            if circuit is not None:
+                circuit.probing = False
+
+
+def _outcome(breaker: CircuitBreaker, key: str, exc: EapiError) -> None:
+    if is_failure(exc):
+        breaker.failure(key)
+    else:
+        # the target answered
+        breaker.success(key)
+
+
+def call_with_retry(key: str, func: Callable[[], T], policy: RetryPolicy,
+                    breaker: CircuitBreaker, idempotent: bool,
+                    on_retry: Optional[Retried] = None) -> T:
+    """call `func`, retrying and tracking failures of `key`"""
+
+    delays = policy.delays() if idempotent else iter(())
+
+    while True:
+        probe = breaker.before(key)
+        try:
+            result = func()
+        except EapiError as exc:
+            _outcome(breaker, key, exc)
+            delay = next(delays, None) if is_failure(exc) else None
+            if delay is None:
+                raise
+            if on_retry is not None:
+                on_retry(key, exc)
+        except BaseException:
+            if probe:
+                breaker.release(key)
+            raise
+        else:
+            breaker.success(key)
+            return result
+
+        time.sleep(delay)
+
+
+async def acall_with_retry(key: str, func: Callable[[], Awaitable[T]],
+                           policy: RetryPolicy, breaker: CircuitBreaker,
+                           idempotent: bool,
+                           on_retry: Optional[Retried] = None) -> T:
+    """call `func`, retrying and tracking failures of `key` (async version)"""
+
+    delays = policy.delays() if idempotent else iter(())
+
+    while True:
+        probe = breaker.before(key)
+        try:
+            result = await func()
+        except EapiError as exc:
+            _outcome(breaker, key, exc)
+            delay = next(delays, None) if is_failure(exc) else None
+            if delay is None:
+                raise
+            if on_retry is not None:
+                on_retry(key, exc)
+        except BaseException:
+            # cancelled
+            if probe:
+                breaker.release(key)
+            raise
+        else:
+            breaker.success(key)
+            return result
+
+        await asyncio.sleep(delay)
@@ -0,0 +1,274 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2024 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+"""
+Cached host name resolution
+
+httpx resolves the host of every new connection. Polling thousands of
+targets on a short cycle, that is a resolver query per connection. The
+network backends here resolve through a `DnsCache` that keeps addresses
+for a TTL, with concurrent lookups of a name sharing one query. Addresses
+are tried in order, a name whose addresses all fail is resolved again.
+
+TLS is unaffected, certificates are still checked against the host name.
+"""
+
+import asyncio
+import ipaddress
+import socket
+import threading
+import time
+
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+import httpcore
+import httpx
+
+import eapix.environment
+from eapix.tracing import phase
+
+Entry = Tuple[float, List[str]]
+
+
+def _literal(host: str) -> bool:
+    try:
+        ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return True
+
+
+def _addresses(infos: list) -> List[str]:
+    # unique, in the resolver's order
+    return list(dict.fromkeys(info[4][0] for info in infos))
+
+
+class DnsCache:
+    """Resolved addresses by host, kept for `ttl` seconds
+
+    :param ttl: seconds an address is kept
+    :param type: float
+    """
+
+    def __init__(self,
+                 ttl: float = eapix.environment.EAPI_DNS_TTL,
+                 clock: Callable[[], float] = time.monotonic):
+
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: Dict[Tuple[str, int], Entry] = {}
+        self._lookups: Dict[Tuple[str, int], asyncio.Task] = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _get(self, key: Tuple[str, int]) -> Optional[List[str]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= self._clock():
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry[1]
+
+    def _put(self, key: Tuple[str, int], addresses: List[str]) -> None:
+        if self.ttl > 0 and addresses:
+            with self._lock:
+                self._entries[key] = (self._clock() + self.ttl, addresses)
+
+    def resolve(self, host: str, port: int) -> List[str]:
+        """addresses of `host`"""
+
+        if _literal(host):
+            return [host]
+
+        key = (host, port)
+        addresses = self._get(key)
+        if addresses is None:
+            addresses = _addresses(socket.getaddrinfo(
+                host, port, type=socket.SOCK_STREAM))
+            self._put(key, addresses)
+
+        return addresses
+
+    async def aresolve(self, host: str, port: int) -> List[str]:
+        """addresses of `host`, concurrent lookups share one query"""
+
+        if _literal(host):
+            return [host]
+
+        key = (host, port)
+        addresses = self._get(key)
+        if addresses is not None:
+            return addresses
+
+        lookup = self._lookups.get(key)
+        if lookup is None:
+            lookup = self._lookups[key] = asyncio.ensure_future(
+                self._lookup(key))
+
+        # a cancelled caller does not cancel the others' lookup
+        return await asyncio.shield(lookup)
+
+    async def _lookup(self, key: Tuple[str, int]) -> List[str]:
+        try:
+            infos = await asyncio.get_running_loop().getaddrinfo(
+                *key, type=socket.SOCK_STREAM)
+        finally:
+            del self._lookups[key]
+
+        addresses = _addresses(infos)
+        self._put(key, addresses)
+        return addresses
+
+    def prefer(self, host: str, port: int, address: str) -> None:
+        """try `address` of `host` first from now on"""
+
+        with self._lock:
+            entry = self._entries.get((host, port))
+            if entry is not None and address in entry[1]:
+                addresses = [address] + [a for a in entry[1] if a != address]
+                self._entries[(host, port)] = (entry[0], addresses)
+
+    def invalidate(self, host: Optional[str] = None) -> None:
+        """forget the addresses of `host`, or all of them"""
+
+        with self._lock:
+            if host is None:
+                self._entries.clear()
+                return
+
+            for key in [key for key in self._entries if key[0] == host]:
+                del self._entries[key]
+
+
+class CachingBackend(httpcore.NetworkBackend):
+    """Connects to addresses from a `DnsCache`"""
+
+    def __init__(self, cache: DnsCache, backend: httpcore.NetworkBackend):
+        self._cache = cache
+        self._backend = backend
+
+    def connect_tcp(self, host: str, port: int,
+                    timeout: Optional[float] = None,
+                    local_address: Optional[str] = None,
+                    socket_options: Any = None) -> httpcore.NetworkStream:
+        try:
+            with phase("eapi.dns", in_request=True,
+                       **{"server.address": host}):
+                addresses = self._cache.resolve(host, port)
+        except OSError as exc:
+            raise httpcore.ConnectError(str(exc)) from exc
+
+        error: Optional[Exception] = None
+        for index, address in enumerate(addresses):
+            try:
+                stream = self._backend.connect_tcp(
+                    address, port, timeout=timeout,
+                    local_address=local_address,
+                    socket_options=socket_options)
+            except (httpcore.ConnectError, httpcore.ConnectTimeout) as exc:
+                error = exc
+                continue
+
+            if index:
+                self._cache.prefer(host, port, address)
+            return stream
+
+        # moved, or down. resolve again next time
+        self._cache.invalidate(host)
+        assert error is not None
+        raise error
+
+    def connect_unix_socket(self, path: str,
+                            timeout: Optional[float] = None,
+                            socket_options: Any = None
+                            ) -> httpcore.NetworkStream:
+        return self._backend.connect_unix_socket(
+            path, timeout=timeout, socket_options=socket_options)
+
+    def sleep(self, seconds: float) -> None:
+        self._backend.sleep(seconds)
+
+
+class AsyncCachingBackend(httpcore.AsyncNetworkBackend):
+    """Connects to addresses from a `DnsCache`"""
+
+    def __init__(self, cache: DnsCache,
+                 backend: httpcore.AsyncNetworkBackend):
+        self._cache = cache
+        self._backend = backend
+
+    async def connect_tcp(self, host: str, port: int,
+                          timeout: Optional[float] = None,
+                          local_address: Optional[str] = None,
+                          socket_options: Any = None
+                          ) -> httpcore.AsyncNetworkStream:
+        try:
+            with phase("eapi.dns", in_request=True,
+                       **{"server.address": host}):
+                addresses = await asyncio.wait_for(
+                    self._cache.aresolve(host, port), timeout)
+        except asyncio.TimeoutError as exc:
+            raise httpcore.ConnectTimeout(f"resolving {host}") from exc
+        except OSError as exc:
+            raise httpcore.ConnectError(str(exc)) from exc
+
+        error: Optional[Exception] = None
+        for index, address in enumerate(addresses):
+            try:
+                stream = await self._backend.connect_tcp(
+                    address, port, timeout=timeout,
+                    local_address=local_address,
+                    socket_options=socket_options)
+            except (httpcore.ConnectError, httpcore.ConnectTimeout) as exc:
+                error = exc
+                continue
+
+            if index:
+                self._cache.prefer(host, port, address)
+            return stream
+
+        # moved, or down. resolve again next time
+        self._cache.invalidate(host)
+        assert error is not None
+        raise error
+
+    async def connect_unix_socket(self, path: str,
+                                  timeout: Optional[float] = None,
+                                  socket_options: Any = None
+                                  ) -> httpcore.AsyncNetworkStream:
+        return await self._backend.connect_unix_socket(
+            path, timeout=timeout, socket_options=socket_options)
+
+    async def sleep(self, seconds: float) -> None:
+        await self._backend.sleep(seconds)
+
+
+def use_dns_cache(transport: Union[httpx.BaseTransport,
+                                   httpx.AsyncBaseTransport],
+                  cache: DnsCache) -> None:
+    """resolve the hosts of new connections of `transport` through `cache`
+
+    httpx does not take a network backend, it is set on the httpcore
+    connection pool of an `httpx.HTTPTransport`. Other transports raise a
+    `TypeError`.
+    """
+
+    pool = getattr(transport, "_pool", None)
+    if not isinstance(pool, (httpcore.ConnectionPool,
+                             httpcore.AsyncConnectionPool)) \
+            or not hasattr(pool, "_network_backend"):
+        raise TypeError(f"a DnsCache needs an httpx HTTPTransport over an "
+                        f"httpcore connection pool, not "
+                        f"{type(transport).__name__}")
+
+    if isinstance(pool, httpcore.AsyncConnectionPool):
+        pool._network_backend = AsyncCachingBackend(
+            cache, pool._network_backend)
+    else:
+        pool._network_backend = CachingBackend(cache, pool._network_backend)
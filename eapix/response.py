@@ -2,14 +2,21 @@
 # Copyright (c) 2024 Arista Networks, Inc.  All rights reserved.
 # Arista Networks, Inc. Confidential and Proprietary.
 
-import json
+import inspect
 import re
+import time
 
-from collections.abc import Mapping
+from collections.abc import AsyncIterator as _AsyncIterator, Mapping
 from pprint import pformat
-from typing import List, Union, Optional
+from typing import (
+    Any, AsyncIterator, Callable, Iterator, List, Sequence, Tuple, Type,
+    Union, Optional, cast)
 
+import eapix.codec
+import eapix.schemas
 from eapix.environment import EAPI_DEFAULT_TRANSPORT
+from eapix.schemas import Schema
+from eapix.stream import JsonStreamParser, PathItem, WILDCARD, parse_path
 from eapix.types import Command, Error
 from eapix.util import zpad, indent
 
@@ -29,6 +36,9 @@ class JsonResult(Mapping):
     def __str__(self):
         return str(self._data)
 
+    def to_dict(self) -> dict:
+        return dict(self._data)
+
     @property
     def pretty(self):
         return pformat(self._data)
@@ -48,13 +58,36 @@ class TextResult:
 
 class ResponseElem:
     def __init__(self, command: Command,
-                 result: Union[TextResult, JsonResult]):
+                 result: Union[TextResult, JsonResult, Schema]):
         self.command = command
         self.result = result
 
+    @classmethod
+    def from_rpc_result(cls, command, result: dict, encoding: str,
+                        schemas: Optional[Mapping[str, Type[Schema]]] = None
+                        ) -> "ResponseElem":
+        """Convert one item of a JSON-RPC `result` to a `ResponseElem`
+
+        JSON results of commands found in `schemas` are converted to that
+        schema, or kept as a `JsonResult` if they do not fit it. See
+        ``eapix.schemas``
+        """
+
+        if encoding == "text":
+            return cls(command, TextResult(result.get("output", "")))
+
+        schema = eapix.schemas.lookup(schemas, command["cmd"])
+        if schema is not None and result and "errors" not in result:
+            try:
+                return cls(command, eapix.schemas.convert(result, schema))
+            except ValueError:
+                pass
+
+        return cls(command, JsonResult(result))
+
     def to_dict(self):
-        if isinstance(self.result, JsonResult):
-            result = dict(self.result)
+        if isinstance(self.result, (JsonResult, Schema)):
+            result = self.result.to_dict()
         else:
             result = str(self.result)
 
@@ -101,7 +134,7 @@ class Response:
 
     @property
     def json(self):
-        return json.dumps(self.to_dict())
+        return eapix.codec.dumps(self.to_dict()).decode("utf-8")
 
     @property
     def pretty(self):
@@ -132,9 +165,16 @@ class Response:
         return text
 
     @classmethod
-    def from_rpc_response(cls, target, request, response):
-        """Convert JSON response to a `Response` object"""
-        
+    def from_rpc_response(
+            cls, target, request, response,
+            schemas: Optional[Mapping[str, Type[Schema]]] = None):
+        """Convert JSON response to a `Response` object
+
+        :param schemas: typed schemas for JSON results, by command. see
+            ``eapix.schemas``
+        :param type: dict
+        """
+
         encoding = request["params"]["format"]
         commands = request["params"]["cmds"]
 
@@ -154,14 +194,258 @@ class Response:
 
         elements = []
         for cmd, res in zpad(commands, results, {}):
-            if encoding == "text":
-                res = TextResult(res.get("output", ""))
-            else:
-                res = JsonResult(res)
-            elem = ResponseElem(cmd, res)
-            elements.append(elem)
+            elements.append(ResponseElem.from_rpc_result(
+                cmd, cast(dict, res), encoding, schemas))
 
         return cls(target, elements, error)
 
+
+class StreamResponse:
+    """A response whose elements are decoded while the body is read
+
+    Iterating yields one `ResponseElem` per command as soon as its result has
+    been received. Only the element being decoded is held in memory, so the
+    elements are not kept: iterate once, or use `read` to collect them into a
+    `Response`.
+
+    `error` is only known once iteration has finished. `time_to_first_result`
+    is set when the first result has been decoded and `elapsed` once the body
+    has been read, both in seconds since the request was sent.
+
+    >>> with client.stream(target, ["show ip route"]) as rsp:
+    ...     for elem in rsp:
+    ...         print(elem.command)
+    """
+
+    # result items (or error data) and the error details
+    _PATTERNS = (
+        ("result", WILDCARD),
+        ("error", "data", WILDCARD),
+        ("error", "code"),
+        ("error", "message"),
+    )
+
+    def __init__(self, target, request: dict,
+                 chunks: Union[Iterator[bytes], AsyncIterator[bytes]],
+                 close: Optional[Callable] = None,
+                 started: Optional[float] = None,
+                 schemas: Optional[Mapping[str, Type[Schema]]] = None):
+        self._target = target
+        self._request = request
+        self._schemas = schemas
+        self._chunks = chunks
+        self._asynchronous = isinstance(chunks, _AsyncIterator)
+        self._closers: List[Callable] = [close] if close else []
+        self._started = time.monotonic() if started is None else started
+
+        self.error: Optional[Error] = None
+        self.time_to_first_result: Optional[float] = None
+        self.elapsed: Optional[float] = None
+
+    @property
+    def target(self):
+        return self._target
+
+    @property
+    def code(self):
+        return self.error.code if self.error else None
+
+    @property
+    def message(self):
+        return self.error.message if self.error else None
+
+    def _elements(self, parser: JsonStreamParser, found, state: dict):
+        """turn parsed values into elements, tracking the error details"""
+
+        encoding = self._request["params"]["format"]
+        commands = self._request["params"]["cmds"]
+
+        for path, value in found:
+            if path[0] == "error":
+                state["errored"] = True
+                if path[1] != "data":
+                    state[path[1]] = value
+                    continue
+
+            state["count"] += 1
+            yield ResponseElem.from_rpc_result(commands[path[-1]], value,
+                                               encoding, self._schemas)
+
+    def _set_error(self, state: dict) -> None:
+        if state["errored"]:
+            self.error = Error(state.get("code", 0), state.get("message", ""))
+        else:
+            self.error = Error(code=0, message="")
+
+    def _finish(self, state: dict):
+        encoding = self._request["params"]["format"]
+        commands = self._request["params"]["cmds"]
+
+        self._set_error(state)
+
+        # pad, like `Response.from_rpc_response`
+        for cmd in commands[state["count"]:]:
+            yield ResponseElem.from_rpc_result(cmd, {}, encoding)
+
+    def _timed(self, found: list) -> list:
+        if found and self.time_to_first_result is None:
+            self.time_to_first_result = time.monotonic() - self._started
+        return found
+
+    def _feed(self, parser: JsonStreamParser):
+        """feed the body to `parser`, yielding what it finds"""
+        try:
+            for chunk in self._chunks:  # type: ignore
+                yield self._timed(parser.feed(chunk))
+            yield self._timed(parser.close())
+            self.elapsed = time.monotonic() - self._started
+        finally:
+            self.close()
+
+    async def _afeed(self, parser: JsonStreamParser):
+        """feed the body to `parser`, yielding what it finds (async version)"""
+        try:
+            async for chunk in self._chunks:  # type: ignore
+                yield self._timed(parser.feed(chunk))
+            yield self._timed(parser.close())
+            self.elapsed = time.monotonic() - self._started
+        finally:
+            await self.aclose()
+
+    def __iter__(self) -> Iterator[ResponseElem]:
+        parser = JsonStreamParser(*self._PATTERNS, loads=eapix.codec.loads)
+        state = {"count": 0, "errored": False}
+
+        for found in self._feed(parser):
+            yield from self._elements(parser, found, state)
+
+        yield from self._finish(state)
+
+    async def __aiter__(self) -> AsyncIterator[ResponseElem]:
+        parser = JsonStreamParser(*self._PATTERNS, loads=eapix.codec.loads)
+        state = {"count": 0, "errored": False}
+
+        async for found in self._afeed(parser):
+            for elem in self._elements(parser, found, state):
+                yield elem
+
+        for elem in self._finish(state):
+            yield elem
+
+    def _item_parser(self, path: Union[str, Sequence[PathItem]],
+                     index: int) -> Tuple[JsonStreamParser, List[int]]:
+
+        if index < 0:
+            index += len(self._request["params"]["cmds"])
+
+        path_ = parse_path(path)
+        wildcards = [i for i, item in enumerate(path_) if item == WILDCARD]
+
+        parser = JsonStreamParser(("result", index) + path_,
+                                  ("error", "data", index) + path_,
+                                  ("error", "code"),
+                                  ("error", "message"),
+                                  loads=eapix.codec.loads)
+
+        return parser, wildcards
+
+    def _items(self, found, wildcards: List[int], state: dict):
+        for path, value in found:
+            if path[0] == "error":
+                state["errored"] = True
+                if path[1] != "data":
+                    state[path[1]] = value
+                    continue
+                path = path[3:]
+            else:
+                path = path[2:]
+
+            yield tuple(path[i] for i in wildcards), value
+
+    def iter_items(self, path: Union[str, Sequence[PathItem]],
+                   index: int = -1) -> Iterator[Tuple[tuple, Any]]:
+        """Iterate over a collection nested in one JSON result
+
+        Items are decoded one at a time while the body is read, so the
+        result as a whole is never held in memory. The key is a tuple of the
+        keys (or list indexes) matched by each `*` in `path`.
+
+        >>> for (vrf, prefix), route in rsp.iter_items("vrfs.*.routes.*"):
+        ...     print(vrf, prefix, route["routeType"])
+
+        :param path: dotted path to the items, `*` matches any key
+        :param type: str
+        :param index: the command whose result to walk (default: last)
+        :param type: int
+        """
+
+        parser, wildcards = self._item_parser(path, index)
+        state = {"errored": False}
+
+        for found in self._feed(parser):
+            yield from self._items(found, wildcards, state)
+
+        self._set_error(state)
+
+    async def aiter_items(self, path: Union[str, Sequence[PathItem]],
+                          index: int = -1) -> AsyncIterator[Tuple[tuple, Any]]:
+        """Iterate over a collection nested in one JSON result (async version)
+
+        See ``iter_items``.
+        """
+
+        parser, wildcards = self._item_parser(path, index)
+        state = {"errored": False}
+
+        async for found in self._afeed(parser):
+            for item in self._items(found, wildcards, state):
+                yield item
+
+        self._set_error(state)
+
+    def __enter__(self) -> "StreamResponse":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    async def __aenter__(self) -> "StreamResponse":
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.aclose()
+
+    def on_close(self, callback: Callable) -> None:
+        """call `callback` once the body is released, `aclose` awaits what
+        it returns"""
+        self._closers.append(callback)
+
+    def close(self) -> None:
+        """release the underlying connection"""
+        if self._asynchronous:
+            raise TypeError("an async stream is closed with 'aclose'")
+
+        closers, self._closers = self._closers, []
+        for callback in closers:
+            callback()
+
+    async def aclose(self) -> None:
+        """release the underlying connection (async version)"""
+        closers, self._closers = self._closers, []
+        for callback in closers:
+            result = callback()
+            if inspect.isawaitable(result):
+                await result
+
+    def read(self) -> Response:
+        """read the remaining elements into a `Response`"""
+        elements = list(self)
+        return Response(self._target, elements, self.error)
+
+    async def aread(self) -> Response:
+        """read the remaining elements into a `Response` (async version)"""
+        elements = [elem async for elem in self]
+        return Response(self._target, elements, self.error)
+
 class JsonRpcMessage:
     pass
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2024 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+
+import asyncio
+import heapq
+import itertools
+import math
+import random
+
+from typing import AsyncIterator, Generic, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+def next_tick(start: float, interval: float, now: float) -> float:
+    """returns the first tick of a fixed-rate schedule that is after `now`
+
+    Ticks fall on `start + n * interval`, so late ticks are skipped instead of
+    shifting every following tick.
+    """
+
+    if interval <= 0:
+        return now
+
+    return start + (math.floor((now - start) / interval) + 1) * interval
+
+
+async def ticker(interval: float,
+                 deadline: float = math.inf,
+                 jitter: float = 0.0) -> AsyncIterator[float]:
+    """Yield the loop time at a fixed rate until `deadline` seconds have passed
+
+    Time spent by the consumer between ticks does not push the schedule
+    back. Each tick is delayed by a random amount between 0 and `jitter`
+    seconds so that many tickers started together do not fire together.
+
+    :param interval: seconds between ticks
+    :param type: float
+    :param deadline: stop after this many seconds
+    :param type: float
+    :param jitter: maximum random delay added to each tick
+    :param type: float
+    """
+
+    loop = asyncio.get_running_loop()
+
+    start = loop.time()
+    end = start + deadline
+    tick = start
+
+    while True:
+        delay = tick - loop.time()
+        if jitter > 0:
+            delay += random.uniform(0, jitter)
+
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        now = loop.time()
+        if now >= end and tick > start:
+            return
+
+        yield now
+
+        tick = next_tick(start, interval, loop.time())
+        if tick >= end:
+            return
+
+
+class Scheduler(Generic[T]):
+    """A min-heap of items keyed by the time they are due
+
+    One heap drives any number of periodic jobs: pop the due items, run them
+    and push each one back with its next due time.
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[float, int, T]] = []
+        # tie-breaker, keeps items with the same due time in FIFO order
+        self._seq = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def push(self, due: float, item: T) -> None:
+        """schedule `item` at time `due`"""
+        heapq.heappush(self._heap, (due, next(self._seq), item))
+
+    def next_due(self) -> Optional[float]:
+        """time of the earliest item, or `None` if empty"""
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: float) -> List[T]:
+        """remove and return all items due at or before `now`"""
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            due.append(heapq.heappop(self._heap)[2])
+        return due
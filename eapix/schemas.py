@@ -0,0 +1,261 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2024 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+"""
+Typed results for common `show` commands
+
+A schema is a `__slots__` dataclass whose fields are named after the eAPI JSON
+keys, so a result converts to it directly and keys it does not declare are
+dropped. Results take a fraction of the memory of the decoded dict and
+attributes are read without hashing.
+
+Conversion uses `msgspec.convert` when `msgspec` is installed. A result that
+does not fit its schema (a number where the schema expects a string, say) is
+kept as a plain `JsonResult`. Without `msgspec` the types of values are not
+checked.
+
+>>> rsp = client.call(target, ["show version"], EapiOptions(encoding="json"),
+...                   schemas=SCHEMAS)
+>>> rsp.elements[0].result.version
+"""
+
+import dataclasses
+import typing
+
+from dataclasses import dataclass, field
+from pprint import pformat
+from typing import (Any, Callable, Dict, FrozenSet, List, Mapping, Optional,
+                    Tuple, Type, TypeVar)
+
+T = TypeVar("T", bound="Schema")
+
+
+class Schema:
+    """Base class for typed results"""
+
+    __slots__ = ()
+
+    def to_dict(self) -> dict:
+        return dataclasses.asdict(self)  # type: ignore
+
+    @property
+    def pretty(self) -> str:
+        return pformat(self.to_dict())
+
+    def __str__(self) -> str:
+        return str(self.to_dict())
+
+
+@dataclass(slots=True)
+class ShowVersion(Schema):
+    modelName: str = ""
+    internalVersion: str = ""
+    systemMacAddress: str = ""
+    serialNumber: str = ""
+    memTotal: int = 0
+    memFree: int = 0
+    bootupTimestamp: float = 0.0
+    uptime: float = 0.0
+    version: str = ""
+    architecture: str = ""
+    isIntlVersion: bool = False
+    internalBuildId: str = ""
+    hardwareRevision: str = ""
+    mfgName: str = ""
+
+
+@dataclass(slots=True)
+class InterfaceCounters(Schema):
+    inOctets: int = 0
+    inUcastPkts: int = 0
+    inMulticastPkts: int = 0
+    inBroadcastPkts: int = 0
+    inDiscards: int = 0
+    outOctets: int = 0
+    outUcastPkts: int = 0
+    outMulticastPkts: int = 0
+    outBroadcastPkts: int = 0
+    outDiscards: int = 0
+    lastUpdateTimestamp: float = 0.0
+
+
+@dataclass(slots=True)
+class ShowInterfacesCounters(Schema):
+    interfaces: Dict[str, InterfaceCounters] = field(default_factory=dict)
+
+
+@dataclass(slots=True)
+class LldpNeighbor(Schema):
+    port: str = ""
+    neighborDevice: str = ""
+    neighborPort: str = ""
+    ttl: int = 0
+
+
+@dataclass(slots=True)
+class ShowLldpNeighbors(Schema):
+    lldpNeighbors: List[LldpNeighbor] = field(default_factory=list)
+    tablesLastChangeTime: float = 0.0
+    tablesAgeOuts: int = 0
+    tablesInserts: int = 0
+    tablesDeletes: int = 0
+    tablesDrops: int = 0
+
+
+@dataclass(slots=True)
+class BgpPeer(Schema):
+    peerState: str = ""
+    asn: str = ""
+    version: int = 0
+    msgReceived: int = 0
+    msgSent: int = 0
+    inMsgQueue: int = 0
+    outMsgQueue: int = 0
+    upDownTime: float = 0.0
+    prefixReceived: int = 0
+    prefixAccepted: int = 0
+    underMaintenance: bool = False
+
+
+@dataclass(slots=True)
+class BgpVrf(Schema):
+    vrf: str = ""
+    routerId: str = ""
+    asn: str = ""
+    peers: Dict[str, BgpPeer] = field(default_factory=dict)
+
+
+@dataclass(slots=True)
+class ShowIpBgpSummary(Schema):
+    vrfs: Dict[str, BgpVrf] = field(default_factory=dict)
+
+
+# built-in schemas, by command
+SCHEMAS: Dict[str, Type[Schema]] = {
+    "show version": ShowVersion,
+    "show interfaces counters": ShowInterfacesCounters,
+    "show lldp neighbors": ShowLldpNeighbors,
+    "show ip bgp summary": ShowIpBgpSummary,
+}
+
+
+def normalize(command: str) -> str:
+    """the key a command is looked up by, whitespace collapsed"""
+    return " ".join(command.split())
+
+
+def key(schemas: Optional[Mapping[str, Type[Schema]]]
+        ) -> Optional[FrozenSet[Tuple[str, Type[Schema]]]]:
+    """a hashable key of `schemas`, for caching responses converted by them"""
+
+    if not schemas:
+        return None
+
+    return frozenset(schemas.items())
+
+
+def lookup(schemas: Optional[Mapping[str, Type[Schema]]],
+           command: str) -> Optional[Type[Schema]]:
+    """the schema for `command`, if there is one"""
+
+    if not schemas:
+        return None
+
+    return schemas.get(normalize(command))
+
+
+# builds a converter for a type, the fallback when msgspec is not installed
+_converters: Dict[Any, Callable[[Any], Any]] = {}
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+def _expect(value: Any, kind: type, name: str) -> None:
+    if not isinstance(value, kind):
+        raise ValueError(f"expected {kind.__name__} for {name}, "
+                         f"got {type(value).__name__}")
+
+
+def _schema_converter(cls: type, children: Dict[str, Callable[[Any], Any]]
+                      ) -> Callable[[Any], Any]:
+    def convert(value: Any) -> Any:
+        _expect(value, dict, cls.__name__)
+        # keys the schema does not declare are dropped
+        return cls(**{k: children[k](v) for k, v in value.items()
+                      if k in children})
+    return convert
+
+
+def _dict_converter(child: Callable[[Any], Any]) -> Callable[[Any], Any]:
+    def convert(value: Any) -> Any:
+        _expect(value, dict, "Dict")
+        return {k: child(v) for k, v in value.items()}
+    return convert
+
+
+def _list_converter(child: Callable[[Any], Any]) -> Callable[[Any], Any]:
+    def convert(value: Any) -> Any:
+        _expect(value, list, "List")
+        return [child(v) for v in value]
+    return convert
+
+
+def _optional_converter(child: Callable[[Any], Any]) -> Callable[[Any], Any]:
+    def convert(value: Any) -> Any:
+        return None if value is None else child(value)
+    return convert
+
+
+def _converter(tp: Any) -> Callable[[Any], Any]:
+    if tp in _converters:
+        return _converters[tp]
+
+    origin = typing.get_origin(tp)
+    args = typing.get_args(tp)
+
+    convert: Callable[[Any], Any]
+
+    if dataclasses.is_dataclass(tp):
+        hints = typing.get_type_hints(tp)
+        children = {f.name: _converter(hints[f.name])
+                    for f in dataclasses.fields(tp) if f.init}
+        convert = _schema_converter(typing.cast(type, tp), children)
+    elif origin in (dict, Dict):
+        convert = _dict_converter(_converter(args[1]) if args else _identity)
+    elif origin in (list, List):
+        convert = _list_converter(_converter(args[0]) if args else _identity)
+    elif origin is typing.Union and type(None) in args:
+        convert = _optional_converter(
+            _converter(next(a for a in args if a is not type(None))))
+    else:
+        convert = _identity
+
+    _converters[tp] = convert
+    return convert
+
+
+def _fallback_convert(data: dict, schema: Type[T]) -> T:
+    return _converter(schema)(data)
+
+
+try:
+    import msgspec  # type: ignore
+
+    def _msgspec_convert(data: dict, schema: Type[T]) -> T:
+        # lax, eg. numbers sent as strings are accepted.
+        # msgspec.ValidationError is a ValueError
+        return msgspec.convert(data, schema, strict=False)
+
+    _convert: Callable[[dict, Type], Any] = _msgspec_convert
+except ImportError:
+    _convert = _fallback_convert
+
+
+def convert(data: dict, schema: Type[T]) -> T:
+    """convert a decoded JSON result to `schema`
+
+    :raises ValueError: if the result does not fit the schema
+    """
+    return _convert(data, schema)
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2024 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+"""
+Session cookies kept across processes
+
+A client given a `SessionStore` saves the `Session` cookie of each `/login`
+and reuses it in later processes, so short lived jobs do not log in to every
+target on every run. Sessions are kept by target (`Target.fqdn`, with the
+port when it has one) and user until they expire, or until the target
+rejects them. A client reads and writes the store in a thread when it is
+asynchronous.
+
+>>> client = Client(auth=("admin", ""), session_store=SqliteSessionStore())
+>>> client.login("veos")  # only posts to /login if no session is stored
+"""
+
+import abc
+import contextlib
+import os
+import sqlite3
+import time
+
+from typing import Iterator, Optional
+
+import eapix.environment
+
+
+class SessionStore(abc.ABC):
+    """Where session cookies are kept, subclass to use another backend"""
+
+    @abc.abstractmethod
+    def get(self, fqdn: str, username: str) -> Optional[str]:
+        """the stored cookie, if it has not expired"""
+
+    @abc.abstractmethod
+    def put(self, fqdn: str, username: str, cookie: str,
+            expires: Optional[float] = None) -> None:
+        """keep `cookie` until `expires` (seconds since the epoch), or for
+        the store's default time"""
+
+    @abc.abstractmethod
+    def delete(self, fqdn: str, username: str) -> None:
+        """forget the cookie"""
+
+
+class SqliteSessionStore(SessionStore):
+    """Keeps sessions in a sqlite database, safe to share between processes
+
+    The file holds live session tokens and is created readable by its owner
+    only.
+
+    :param path: database file
+    :param type: str
+    :param ttl: seconds a session is kept when the cookie has no expiry
+    :param type: float
+    """
+
+    def __init__(self,
+                 path: str = eapix.environment.EAPI_SESSION_STORE,
+                 ttl: float = eapix.environment.EAPI_SESSION_TTL):
+
+        self.path = os.path.expanduser(path)
+        self.ttl = ttl
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, mode=0o700, exist_ok=True)
+        os.close(os.open(self.path, os.O_CREAT | os.O_RDWR, 0o600))
+
+        with self._connect() as db:
+            db.execute("CREATE TABLE IF NOT EXISTS sessions ("
+                       "fqdn TEXT, username TEXT, cookie TEXT, "
+                       "expires REAL, PRIMARY KEY (fqdn, username))")
+
+    @contextlib.contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # a connection per use, sqlite locks the file between writers
+        db = sqlite3.connect(self.path, timeout=5.0)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def get(self, fqdn: str, username: str) -> Optional[str]:
+        with self._connect() as db:
+            row = db.execute(
+                "SELECT cookie FROM sessions WHERE fqdn = ? AND username = ? "
+                "AND expires > ?", (fqdn, username, time.time())).fetchone()
+        return row[0] if row else None
+
+    def put(self, fqdn: str, username: str, cookie: str,
+            expires: Optional[float] = None) -> None:
+        if expires is None:
+            expires = time.time() + self.ttl
+
+        with self._connect() as db:
+            db.execute("INSERT OR REPLACE INTO sessions VALUES (?, ?, ?, ?)",
+                       (fqdn, username, cookie, expires))
+            db.execute("DELETE FROM sessions WHERE expires <= ?",
+                       (time.time(),))
+
+    def delete(self, fqdn: str, username: str) -> None:
+        with self._connect() as db:
+            db.execute("DELETE FROM sessions WHERE fqdn = ? AND username = ?",
+                       (fqdn, username))
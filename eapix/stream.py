@@ -0,0 +1,359 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2024 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+"""
+Incremental JSON decoding
+
+`JsonStreamParser` is fed a JSON document in chunks and returns only the
+values found at selected paths, as soon as each one is complete. Everything
+else is scanned over without being kept in memory, so peak memory is bounded
+by the largest selected value rather than by the whole document.
+"""
+
+import codecs
+import json
+import json.scanner
+import re
+
+from typing import Any, List, Optional, Sequence, Tuple, Union
+
+PathItem = Union[str, int]
+Path = Tuple[PathItem, ...]
+
+# matches any key or list index in a pattern
+WILDCARD = "*"
+
+_WHITESPACE = " \t\r\n"
+# a complete string, a lone quote (string continues in the next chunk) or a
+# character that changes nesting
+_TOKEN_RE = re.compile(r'"(?:[^"\\]++|\\.)*+"|"|[\[\]{}]')
+# characters that end or escape inside a string
+_STRING_RE = re.compile(r'["\\]')
+# a number, true, false or null
+_SCALAR_RE = re.compile(r'[^\s,:\]}]+')
+
+_OPEN = "[{"
+_CLOSE = "]}"
+
+# the stdlib C scanner decodes one value at an offset without copying. Its
+# stub wants a scanner for a context
+_scan_once = json.scanner.make_scanner(
+    json.JSONDecoder())  # type: ignore[arg-type]
+
+
+class _Frame:
+    """a container that is being walked because a pattern reaches into it"""
+
+    __slots__ = ("kind", "key", "state")
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        # current key (objects) or index (arrays)
+        self.key: Optional[PathItem] = None if kind == "{" else 0
+        # 'first', 'key', 'colon', 'value' or 'comma'
+        self.state = "first"
+
+
+class _Value:
+    """a value split across chunks, scanned over and captured if selected"""
+
+    __slots__ = ("path", "capture", "parts", "depth", "in_string", "scalar")
+
+    def __init__(self, path: Path, capture: bool):
+        self.path = path
+        self.capture = capture
+        # text consumed so far, when capturing
+        self.parts: List[str] = []
+        self.depth = 0
+        self.in_string = False
+        self.scalar = False
+
+
+def parse_path(path: Union[str, Sequence[PathItem]]) -> Path:
+    """turns 'vrfs.*.routes.*' into ('vrfs', '*', 'routes', '*')"""
+
+    if isinstance(path, str):
+        return tuple(path.split(".")) if path else ()
+
+    return tuple(path)
+
+
+class JsonStreamParser:
+    """Incrementally finds and decodes the values at the given paths
+
+    Each pattern is a sequence of object keys, list indexes or `WILDCARD`.
+
+    >>> parser = JsonStreamParser(("result", WILDCARD))
+    >>> for chunk in chunks:
+    ...     for path, value in parser.feed(chunk):
+    ...         print(path, value)
+    >>> parser.close()
+    """
+
+    def __init__(self, *patterns: Union[str, Sequence[PathItem]],
+                 loads=json.loads):
+        self._patterns = [parse_path(p) for p in patterns]
+        self._loads = loads
+
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        # undecoded text, everything before `_pos` has been consumed
+        self._buf = ""
+        self._pos = 0
+
+        self._stack: List[_Frame] = []
+        self._value: Optional[_Value] = None
+        self._done = False
+
+    @property
+    def done(self) -> bool:
+        """the document is complete"""
+        return self._done
+
+    def _match(self, path: Path) -> Optional[bool]:
+        """True to capture, False to descend or None to skip the value"""
+
+        descend = False
+        for pattern in self._patterns:
+            if len(pattern) < len(path):
+                continue
+
+            if all(p == WILDCARD or p == k for p, k in zip(pattern, path)):
+                if len(pattern) == len(path):
+                    return True
+                descend = True
+
+        return False if descend else None
+
+    def _path(self) -> Path:
+        return tuple(frame.key for frame in self._stack)  # type: ignore
+
+    def feed(self, data: bytes, final: bool = False) -> List[Tuple[Path, Any]]:
+        """add a chunk, returns the selected values completed by it"""
+
+        self._buf = self._buf[self._pos:] + self._decoder.decode(data, final)
+        self._pos = 0
+
+        found: List[Tuple[Path, Any]] = []
+
+        while not self._done:
+            if self._value is not None:
+                if not self._scan_value(found, final):
+                    break
+            elif not self._step(found, final):
+                break
+
+        if self._value is not None and self._value.capture:
+            self._value.parts.append(self._buf[:self._pos])
+
+        return found
+
+    def close(self) -> List[Tuple[Path, Any]]:
+        """signal the end of the document
+
+        :raises ValueError: if the document is incomplete
+        """
+
+        found = self.feed(b"", final=True)
+
+        if not self._done:
+            raise ValueError("incomplete JSON document")
+
+        return found
+
+    def _skip_whitespace(self) -> Optional[str]:
+        buf = self._buf
+        while self._pos < len(buf) and buf[self._pos] in _WHITESPACE:
+            self._pos += 1
+
+        return buf[self._pos] if self._pos < len(buf) else None
+
+    def _pop(self) -> None:
+        self._stack.pop()
+        if self._stack:
+            self._stack[-1].state = "comma"
+        else:
+            self._done = True
+
+    def _end_value(self) -> None:
+        self._value = None
+        if not self._stack:
+            self._done = True
+
+    def _start_value(self, found: List[Tuple[Path, Any]], path: Path,
+                     char: str, final: bool) -> None:
+
+        match = self._match(path)
+
+        if match is False and char in _OPEN:
+            self._stack.append(_Frame(char))
+            self._pos += 1
+            return
+
+        if char in _OPEN or char == '"':
+            # fast path, the whole value is already buffered
+            try:
+                value, end = _scan_once(self._buf, self._pos)
+            except (StopIteration, ValueError):
+                pass
+            else:
+                if match is not None:
+                    found.append((path, value))
+                self._pos = end
+                self._end_value()
+                return
+
+        self._value = _Value(path, capture=match is not None)
+
+        if char in _OPEN:
+            self._value.depth = 1
+            self._value.parts.append(char)
+            self._pos += 1
+        elif char == '"':
+            self._value.in_string = True
+            self._value.parts.append(char)
+            self._pos += 1
+        else:
+            self._value.scalar = True
+
+        # drop the consumed prefix, `parts` holds what is needed
+        self._buf = self._buf[self._pos:]
+        self._pos = 0
+        if not self._value.capture:
+            self._value.parts.clear()
+
+        self._scan_value(found, final)
+
+    def _step(self, found: List[Tuple[Path, Any]], final: bool) -> bool:
+        """advance through the walked containers, False if out of data"""
+
+        char = self._skip_whitespace()
+        if char is None:
+            return False
+
+        if not self._stack:
+            self._start_value(found, (), char, final)
+            return True
+
+        frame = self._stack[-1]
+
+        if frame.state == "first" and char in _CLOSE:
+            self._pos += 1
+            self._pop()
+            return True
+
+        if frame.kind == "{":
+            if frame.state in ("first", "key"):
+                if char != '"':
+                    raise ValueError(f"expected key, got {char!r}")
+
+                try:
+                    frame.key, self._pos = _scan_once(self._buf, self._pos)
+                except (StopIteration, ValueError):
+                    # the key is in the next chunk
+                    return False
+
+                frame.state = "colon"
+            elif frame.state == "colon":
+                if char != ":":
+                    raise ValueError(f"expected ':', got {char!r}")
+                frame.state = "value"
+                self._pos += 1
+            elif frame.state == "value":
+                frame.state = "comma"
+                self._start_value(found, self._path(), char, final)
+            elif char == ",":
+                frame.state = "key"
+                self._pos += 1
+            elif char == "}":
+                self._pos += 1
+                self._pop()
+            else:
+                raise ValueError(f"expected ',' or '}}', got {char!r}")
+        else:
+            if frame.state in ("first", "value"):
+                frame.state = "comma"
+                self._start_value(found, self._path(), char, final)
+            elif char == ",":
+                frame.key += 1  # type: ignore
+                frame.state = "value"
+                self._pos += 1
+            elif char == "]":
+                self._pos += 1
+                self._pop()
+            else:
+                raise ValueError(f"expected ',' or ']', got {char!r}")
+
+        return True
+
+    def _scan_value(self, found: List[Tuple[Path, Any]], final: bool) -> bool:
+        """continue scanning the current value, False if out of data"""
+
+        value = self._value
+        buf = self._buf
+        start = self._pos
+
+        assert value is not None
+
+        if value.scalar:
+            match = _SCALAR_RE.match(buf, self._pos)
+            if match is None:
+                raise ValueError(f"unexpected character {buf[self._pos]!r}")
+            if match.end() == len(buf) and not final:
+                return False
+            self._pos = match.end()
+        else:
+            while True:
+                if value.in_string:
+                    match = _STRING_RE.search(buf, self._pos)
+                    if not match:
+                        self._pos = len(buf)
+                        return False
+
+                    if buf[match.start()] == "\\":
+                        if match.start() + 1 >= len(buf):
+                            # the escaped character is in the next chunk
+                            self._pos = match.start()
+                            return False
+                        self._pos = match.start() + 2
+                        continue
+
+                    self._pos = match.end()
+                    value.in_string = False
+                    if value.depth == 0:
+                        break
+                else:
+                    match = _TOKEN_RE.search(buf, self._pos)
+                    if not match:
+                        self._pos = len(buf)
+                        return False
+
+                    char = buf[match.start()]
+
+                    if char == '"':
+                        self._pos = match.end()
+                        if match.end() - match.start() == 1:
+                            # unterminated string, scan it separately
+                            value.in_string = True
+                        continue
+
+                    if char in _OPEN:
+                        # jump over nested values that are fully buffered
+                        try:
+                            _, self._pos = _scan_once(buf, match.start())
+                        except (StopIteration, ValueError):
+                            value.depth += 1
+                            self._pos = match.end()
+                        continue
+
+                    value.depth -= 1
+                    self._pos = match.end()
+                    if value.depth == 0:
+                        break
+
+        if value.capture:
+            value.parts.append(buf[start:self._pos])
+            found.append((value.path, self._loads("".join(value.parts))))
+
+        self._end_value()
+
+        return True
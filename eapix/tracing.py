@@ -0,0 +1,265 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2024 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+"""
+Request tracing
+
+Pass a callback as a client's `tracer` and each `call` is timed phase by
+phase, as spans handed to the callback as they end, children before their
+parent:
+
+    eapi.call                  the whole call, target and commands
+      eapi.resolve             parsing the target
+      eapi.request             one per attempt, with the HTTP status
+        eapi.pool              waiting for a pooled connection
+        eapi.dns               resolving the host (through a `DnsCache`)
+        eapi.connect           TCP connect
+        eapi.tls               TLS handshake
+        eapi.write             sending the request
+        eapi.first_byte        waiting for the response headers
+        eapi.read              reading the body
+      eapi.decode              decoding the JSON
+      eapi.response            building the `Response`
+
+The connection phases come from the httpcore trace extension. Clients
+without a tracer do none of this. `otel` adapts an OpenTelemetry tracer:
+
+    from opentelemetry import trace
+    client = AsyncClient(tracer=otel(trace.get_tracer("eapix")))
+
+Streamed calls are not traced.
+"""
+
+import contextlib
+import contextvars
+import time
+
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import httpx
+
+Export = Callable[["Span"], None]
+
+# httpcore trace events and the spans they time
+_PHASES = {
+    "connect_tcp": "eapi.connect",
+    "connect_unix_socket": "eapi.connect",
+    "start_tls": "eapi.tls",
+    "send_request_headers": "eapi.write",
+    "send_request_body": "eapi.write",
+    "receive_response_headers": "eapi.first_byte",
+    "receive_response_body": "eapi.read",
+}
+
+
+@dataclass
+class Span:
+    """A timed phase of a call, times in nanoseconds since the epoch"""
+
+    name: str
+    start: int
+    end: Optional[int] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    parent: Optional["Span"] = field(default=None, repr=False)
+    children: List["Span"] = field(default_factory=list, repr=False)
+    error: Optional[BaseException] = None
+
+    @property
+    def duration(self) -> float:
+        """seconds, 0 until the span ends"""
+        return (self.end - self.start) / 1e9 if self.end is not None else 0.0
+
+
+class Trace:
+    """The spans of one call
+
+    :param export: called with each span as it ends
+    :param type: callable
+    """
+
+    def __init__(self, export: Export, name: str, **attributes: Any):
+        self._export = export
+        self.root = Span(name, time.time_ns(), attributes=attributes)
+        # the attempt in flight, parent of the connection phases
+        self.request: Optional[Span] = None
+
+    def start(self, name: str, parent: Optional[Span] = None,
+              **attributes: Any) -> Span:
+        parent = parent or self.root
+        span = Span(name, time.time_ns(), attributes=attributes,
+                    parent=parent)
+        parent.children.append(span)
+        return span
+
+    def end(self, span: Span, error: Optional[BaseException] = None) -> None:
+        if span.end is not None:
+            return
+        span.end = time.time_ns()
+        if error is not None:
+            span.error = error
+            span.attributes["error.type"] = type(error).__name__
+        self._export(span)
+
+    @contextlib.contextmanager
+    def span(self, name: str, parent: Optional[Span] = None,
+             **attributes: Any) -> Iterator[Span]:
+        span = self.start(name, parent, **attributes)
+        try:
+            yield span
+        except BaseException as exc:
+            self.end(span, exc)
+            raise
+        self.end(span)
+
+    def attempt(self, options: dict, asynchronous: bool = False) -> "Attempt":
+        """an `eapi.request` span, traced through the httpx `options`"""
+        return Attempt(self, options, asynchronous)
+
+
+class Attempt:
+    """An `eapi.request` span and its connection phases"""
+
+    def __init__(self, trace: Trace, options: dict, asynchronous: bool):
+        self._trace = trace
+        self.span = trace.request = trace.start("eapi.request")
+        self._pool: Optional[Span] = trace.start("eapi.pool", self.span)
+        self._open: Dict[str, Span] = {}
+        add_trace(options, self.trace, self.atrace, asynchronous)
+
+    def trace(self, event: str, info: dict) -> None:
+        """httpcore trace extension"""
+
+        name, _, stage = event.rpartition(".")
+        phase = _PHASES.get(name.partition(".")[2])
+        if phase is None:
+            return
+
+        if self._pool is not None:
+            self._trace.end(self._pool)
+            self._pool = None
+
+        span = self._open.get(phase)
+        if stage == "started":
+            if span is None:
+                self._open[phase] = self._trace.start(phase, self.span)
+        elif span is not None and not (
+                stage == "complete" and name.endswith("send_request_headers")):
+            # the write ends with the body
+            del self._open[phase]
+            self._trace.end(span, info.get("exception"))
+
+    async def atrace(self, event: str, info: dict) -> None:
+        self.trace(event, info)
+
+    def end(self, error: Optional[BaseException] = None,
+            response: Optional[httpx.Response] = None) -> None:
+        if response is not None:
+            self.span.attributes["http.response.status_code"] = \
+                response.status_code
+        for span in [self._pool, *self._open.values()]:
+            if span is not None:
+                self._trace.end(span, error)
+        self._pool = None
+        self._open.clear()
+        self._trace.end(self.span, error)
+
+
+_current: contextvars.ContextVar[Optional[Trace]] = \
+    contextvars.ContextVar("eapix_trace", default=None)
+
+
+def current() -> Optional[Trace]:
+    """the trace of the call in progress, if it is traced"""
+    return _current.get()
+
+
+@contextlib.contextmanager
+def traced(export: Optional[Export], name: str,
+           **attributes: Any) -> Iterator[Optional[Trace]]:
+    """trace a call, the current trace inside. Nothing without `export`"""
+
+    if export is None:
+        yield None
+        return
+
+    trace = Trace(export, name, **attributes)
+    token = _current.set(trace)
+    try:
+        yield trace
+    except BaseException as exc:
+        trace.end(trace.root, exc)
+        raise
+    finally:
+        _current.reset(token)
+    trace.end(trace.root)
+
+
+@contextlib.contextmanager
+def phase(name: str, in_request: bool = False,
+          **attributes: Any) -> Iterator[Optional[Span]]:
+    """a span of the current trace, of its attempt with `in_request`.
+    Nothing when the call is not traced"""
+
+    trace = _current.get()
+    if trace is None:
+        yield None
+        return
+
+    with trace.span(name, trace.request if in_request else None,
+                    **attributes) as span:
+        yield span
+
+
+def add_trace(options: dict, trace: Callable, atrace: Callable,
+              asynchronous: bool) -> None:
+    """add an httpcore trace callback to the httpx `options`, after any
+    already there"""
+
+    extensions = dict(options.get("extensions") or {})
+    previous = extensions.get("trace")
+
+    if previous is None:
+        extensions["trace"] = atrace if asynchronous else trace
+    elif asynchronous:
+        async def aboth(event: str, info: dict) -> None:
+            await previous(event, info)
+            await atrace(event, info)
+        extensions["trace"] = aboth
+    else:
+        def both(event: str, info: dict) -> None:
+            previous(event, info)
+            trace(event, info)
+        extensions["trace"] = both
+
+    options["extensions"] = extensions
+
+
+def otel(tracer: Any) -> Export:
+    """export calls to an OpenTelemetry `tracer`, once each call ends
+
+    Requires the 'opentelemetry-api' package.
+    """
+
+    from opentelemetry import trace as otel_trace  # type: ignore
+
+    def emit(span: Span, context: Any) -> None:
+        otel_span = tracer.start_span(span.name, context=context,
+                                      attributes=span.attributes,
+                                      start_time=span.start)
+        if span.error is not None:
+            otel_span.record_exception(span.error)
+            otel_span.set_status(otel_trace.Status(
+                otel_trace.StatusCode.ERROR, str(span.error)))
+
+        for child in span.children:
+            if child.end is not None:
+                emit(child, otel_trace.set_span_in_context(otel_span))
+        otel_span.end(end_time=span.end)
+
+    def export(span: Span) -> None:
+        # whole calls, OpenTelemetry starts parents before children
+        if span.parent is None:
+            emit(span, None)
+
+    return export
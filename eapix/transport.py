@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2024 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+"""
+Per-target connection pools
+
+httpx keeps every connection in one pool and scans all of them for each
+request, so with keepalive to many targets every request costs time in
+proportion to the number of open connections. These transports keep a
+small pool per target instead, which also caps the connections to each
+target.
+"""
+
+import ssl
+import threading
+
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+
+from eapix.resolver import DnsCache, use_dns_cache
+
+Origin = Tuple[bytes, bytes, int]
+
+
+def _origin(url: httpx.URL) -> Origin:
+    return (url.raw_scheme, url.raw_host, url.port or 0)
+
+
+def _shared_ssl_context(kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """loading CA certificates is slow, build one context for all pools"""
+
+    kwargs = dict(kwargs)
+    verify = kwargs.pop("verify", True)
+    cert = kwargs.pop("cert", None)
+    if not isinstance(verify, ssl.SSLContext):
+        verify = httpx.create_ssl_context(verify=verify, cert=cert)
+    kwargs["verify"] = verify
+    return kwargs
+
+
+class TargetPoolTransport(httpx.BaseTransport):
+    """Routes each request to the pool of its target
+
+    :param limits: limits of each target's pool
+    :param type: httpx.Limits
+    :param dns_cache: resolves the targets' host names
+    :param type: DnsCache
+    :param kwargs: passed to each `httpx.HTTPTransport` (verify, cert, http2)
+    """
+
+    def __init__(self, limits: httpx.Limits,
+                 dns_cache: Optional[DnsCache] = None, **kwargs: Any):
+        self._limits = limits
+        self._dns_cache = dns_cache
+        self._kwargs = _shared_ssl_context(kwargs)
+        self._pools: Dict[Origin, httpx.HTTPTransport] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._pools)
+
+    def _pool(self, url: httpx.URL) -> httpx.HTTPTransport:
+        origin = _origin(url)
+        pool = self._pools.get(origin)
+        if pool is None:
+            with self._lock:
+                pool = self._pools.get(origin)
+                if pool is None:
+                    pool = self._pools[origin] = httpx.HTTPTransport(
+                        limits=self._limits, **self._kwargs)
+                    if self._dns_cache is not None:
+                        use_dns_cache(pool, self._dns_cache)
+        return pool
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        return self._pool(request.url).handle_request(request)
+
+    def close(self) -> None:
+        with self._lock:
+            pools, self._pools = list(self._pools.values()), {}
+        for pool in pools:
+            pool.close()
+
+
+class AsyncTargetPoolTransport(httpx.AsyncBaseTransport):
+    """Routes each request to the pool of its target
+
+    :param limits: limits of each target's pool
+    :param type: httpx.Limits
+    :param dns_cache: resolves the targets' host names
+    :param type: DnsCache
+    :param kwargs: passed to each `httpx.AsyncHTTPTransport` (verify, cert,
+        http2)
+    """
+
+    def __init__(self, limits: httpx.Limits,
+                 dns_cache: Optional[DnsCache] = None, **kwargs: Any):
+        self._limits = limits
+        self._dns_cache = dns_cache
+        self._kwargs = _shared_ssl_context(kwargs)
+        self._pools: Dict[Origin, httpx.AsyncHTTPTransport] = {}
+
+    def __len__(self) -> int:
+        return len(self._pools)
+
+    def _pool(self, url: httpx.URL) -> httpx.AsyncHTTPTransport:
+        origin = _origin(url)
+        pool = self._pools.get(origin)
+        if pool is None:
+            pool = self._pools[origin] = httpx.AsyncHTTPTransport(
+                limits=self._limits, **self._kwargs)
+            if self._dns_cache is not None:
+                use_dns_cache(pool, self._dns_cache)
+        return pool
+
+    async def handle_async_request(self,
+                                   request: httpx.Request) -> httpx.Response:
+        return await self._pool(request.url).handle_async_request(request)
+
+    async def aclose(self) -> None:
+        pools, self._pools = list(self._pools.values()), {}
+        for pool in pools:
+            await pool.aclose()
@@ -2,11 +2,13 @@
 # Copyright (c) 2024 Arista Networks, Inc.  All rights reserved.
 # Arista Networks, Inc. Confidential and Proprietary.
 
+import functools
 import re
 
 from dataclasses import dataclass
 from typing import List, Optional, Tuple, Union
-from eapix.environment import EAPI_DEFAULT_FORMAT, EAPI_DEFAULT_TRANSPORT
+from eapix.environment import (EAPI_DEFAULT_FORMAT, EAPI_DEFAULT_TRANSPORT,
+                               EAPI_TARGET_CACHE_SIZE, EAPI_UNIX_SOCKET)
 
 Auth = Tuple[str, str]
 
@@ -34,7 +36,13 @@ class Error:
     code: int
     message: str
 
-@dataclass
+
+_TARGET_RE = re.compile(r"^(?:(?P<transport>\w+)\:\/\/)?"
+                        r"(?P<hostname>[\w+\-\.]+)(?:\:"
+                        r"(?P<port>\d{,5}))?/*?$")
+
+
+@dataclass(frozen=True)
 class Target:
     transport: str
     hostname: str
@@ -44,13 +52,22 @@ class Target:
         if self.port is not None and (self.port < 1 or self.port > 65535):
             raise ValueError(f"invalid port '{self.port}'. must be > 1 and < 65535")
         
-        if self.transport not in ("http", "https"):
-            raise ValueError(f"invalid transport '{self.transport}'. must be http or https")
+        if self.transport not in ("http", "https", "unix"):
+            raise ValueError(f"invalid transport '{self.transport}'. "
+                             "must be http, https or unix")
+
+        if self.transport == "unix" and self.port is not None:
+            raise ValueError("unix targets do not have a port")
 
     def __str__(self):
         return self.to_url()
 
     def to_url(self):
+        return self._url
+
+    @functools.cached_property
+    def _url(self) -> str:
+        # built once, targets are immutable
         url = f"{self.transport}://{self.hostname}"
         
         if self.port:
@@ -58,7 +75,7 @@ class Target:
 
         return url
 
-    @property
+    @functools.cached_property
     def fqdn(self):
         fqdn = self.hostname
         if "." not in fqdn:
@@ -67,25 +84,32 @@ class Target:
     
     @classmethod
     def from_url(cls, target: Union[str, "Target"]) -> "Target":
-        _target_re = re.compile(r"^(?:(?P<transport>\w+)\:\/\/)?"
-                        r"(?P<hostname>[\w+\-\.]+)(?:\:"
-                        r"(?P<port>\d{,5}))?/*?$")
-        
         if isinstance(target, Target):
             return target
 
-        match = _target_re.search(target)
-        if not match:
-            raise ValueError("Invalid target: %s" % target)
+        # parsed once, the same `Target` is returned for the same string
+        return _parse_target(target)
 
-        transport = match.group("transport") or EAPI_DEFAULT_TRANSPORT
-        hostname = match.group("hostname")
 
-        
-        port = match.group("port")
-        if port is not None:
-            port = int(port)
+@functools.lru_cache(maxsize=EAPI_TARGET_CACHE_SIZE)
+def _parse_target(target: str) -> Target:
+
+    # unix:///var/run/command-api.sock, the hostname is the socket path
+    if target.startswith("unix://"):
+        path = target[len("unix://"):].rstrip("/")
+        return Target("unix", path or EAPI_UNIX_SOCKET, None)
+
+    match = _TARGET_RE.search(target)
+    if not match:
+        raise ValueError("Invalid target: %s" % target)
+
+    transport = (match.group("transport") or EAPI_DEFAULT_TRANSPORT).lower()
+    # host names are not case sensitive
+    hostname = match.group("hostname").lower()
+
+    port = match.group("port")
+    port = int(port) if port else None
 
-        return cls(transport, hostname, port)
+    return Target(transport, hostname, port)
 
 Timeout = Union[None, float, Tuple[float, float, float, float]]
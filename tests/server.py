@@ -4,15 +4,19 @@
 
 import asyncio
 import base64
+import dataclasses
 import datetime
+import itertools
 import json
+import random
 import uuid
 import re
 import subprocess
 import threading
 import time
 
-from typing import Union
+from dataclasses import dataclass
+from typing import Dict, Optional, Union
 
 from uvicorn.config import Config
 from uvicorn.main import Server
@@ -226,11 +230,106 @@ async def unauthorized_response(scope, receive, send):
     })
 
 
-async def eapi_response(scope, receive, send):
+@dataclass
+class Faults:
+    """Ways the server misbehaves, for resilience tests and benchmarks
+
+    Set for the whole server with `FAULTS`, or for one request with an
+    'x-eapi-faults' header, e.g. 'slow_headers=0.5,reset=1'.
+    """
+
+    # seconds before the response headers are sent
+    slow_headers: float = 0.0
+    # seconds between the `chunks` parts of the response body
+    slow_body: float = 0.0
+    chunks: int = 4
+    # share of responses cut off half way through the body
+    reset: float = 0.0
+    # `burst` responses with `burst_status` out of every `burst_every`
+    burst: int = 0
+    burst_every: int = 0
+    burst_status: int = 503
+    # seconds a /login session is valid, then requests using it get 401
+    session_ttl: float = 0.0
+    # share of requests failing at their last command, a JSON-RPC error with
+    # the results of the commands before it as `data`
+    partial_error: float = 0.0
+
+    @classmethod
+    def parse(cls, spec: str, base: Optional["Faults"] = None) -> "Faults":
+        """'name=value,...', on top of `base`"""
+
+        values = {}
+        types = {f.name: f.type for f in dataclasses.fields(cls)}
+        for item in filter(None, spec.split(",")):
+            name, _, value = item.strip().partition("=")
+            kind = types[name]
+            values[name] = int(value) if kind in (int, "int") \
+                else float(value)
+
+        return dataclasses.replace(base or cls(), **values)
+
+
+FAULTS = Faults()
+
+# requests served, for bursts
+_requests = itertools.count()
+
+# session id: when it was issued
+SESSIONS: Dict[str, float] = {}
+
+
+def get_faults(scope) -> Faults:
+    header = get_header(b"x-eapi-faults", scope["headers"])
+    if header is None:
+        return FAULTS
+    return Faults.parse(header.decode(), FAULTS)
+
+
+def _session(headers) -> Optional[str]:
+    cookie = get_header(b"cookie", headers)
+    if cookie:
+        match = re.search(r"Session=([^;]+)", cookie.decode())
+        if match:
+            return match.group(1)
+    return None
+
+
+async def eapi_response(scope, receive, send, faults: Optional[Faults] = None,
+                        padding: str = ""):
+
+    faults = faults or get_faults(scope)
 
     body = await get_body(receive)
 
+    count = next(_requests)
+    if faults.burst and faults.burst_every and \
+            count % faults.burst_every < faults.burst:
+        await send({"type": "http.response.start",
+                    "status": faults.burst_status,
+                    "headers": [[b"content-type", b"text/plain"]]})
+        await send({"type": "http.response.body", "body": b"Unavailable"})
+        return
+
+    if faults.session_ttl:
+        issued = SESSIONS.get(_session(scope["headers"]) or "")
+        if issued is not None and \
+                time.monotonic() - issued > faults.session_ttl:
+            await unauthorized_response(scope, receive, send)
+            return
+
+    if random.random() < faults.partial_error:
+        # the last command fails
+        body["params"]["cmds"] = list(body["params"]["cmds"])[:-1] + \
+            ["show bogus"]
+
     response = build_response(body)
+    if padding:
+        for result in response.get("result") or []:
+            result["padding"] = padding
+
+    if faults.slow_headers:
+        await asyncio.sleep(faults.slow_headers)
 
     await send(
         {
@@ -239,7 +338,25 @@ async def eapi_response(scope, receive, send):
             "headers": [[b"content-type", b"application/json"]]
         }
     )
-    await send({"type": "http.response.body", "body": bytes(json.dumps(response), "utf-8")})
+
+    content = bytes(json.dumps(response), "utf-8")
+
+    if not (faults.slow_body or faults.reset):
+        await send({"type": "http.response.body", "body": content})
+        return
+
+    size = max(1, -(-len(content) // faults.chunks))
+    parts = [content[i:i + size] for i in range(0, len(content), size)]
+    reset = random.random() < faults.reset
+
+    for index, part in enumerate(parts):
+        if reset and index >= len(parts) // 2:
+            # the server drops the connection
+            raise ConnectionResetError("fault: reset mid-body")
+        await send({"type": "http.response.body", "body": part,
+                    "more_body": index < len(parts) - 1})
+        if faults.slow_body and index < len(parts) - 1:
+            await asyncio.sleep(faults.slow_body)
 
 
 async def logout_response(scope, receive, send):
@@ -280,6 +397,7 @@ async def login_response(scope, receive, send):
         tomorrow = datetime.datetime.utcnow() + datetime.timedelta(days=1)
         expries = tomorrow.strftime("%a, %d-%b-%Y %H:%M:%S GMT")
         session_id = str(uuid.uuid4())
+        SESSIONS[session_id] = time.monotonic()
         return bytes(f"Session={session_id};Expires={expries};Path=/;HttpOnly", "utf-8")
 
     if not_found:
@@ -335,6 +453,7 @@ async def app(scope, receive, send):
     # for testing the correct password is the username
     if auth and auth[0] != auth[1]: 
         await unauthorized_response(scope, receive, send)
+        return
     
     if scope["path"].startswith("/login"):
         await login_response(scope, receive, send)
@@ -410,3 +529,11 @@ def server():
     config = Config(app=app, lifespan="off", loop="asyncio")
     server = TestServer(config=config)
     yield from serve_in_thread(server)
+
+
+@pytest.fixture(scope="session")
+def unix_server(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("eapi") / "command-api.sock")
+    config = Config(app=app, lifespan="off", loop="asyncio", uds=path)
+    server = TestServer(config=config)
+    yield from serve_in_thread(server)
@@ -8,7 +8,8 @@ import pytest
 
 import eapix
 import eapix.api
-from eapix.response import Response
+from eapix.conditions import Match
+from eapix.response import Response, StreamResponse
 
 # from tests.conftest import EAPI_TARGET
 
@@ -101,3 +102,51 @@ async def async_consumer(channel):
 
     
 
+
+@pytest.mark.asyncio
+async def test_awatch_concurrent(server, auth):
+    channel = asyncio.Queue()
+    target = str(server.url)
+    loop = asyncio.get_running_loop()
+
+    watches = [eapix.awatch(channel, target, "show clock", interval=0.2,
+                            deadline=1, auth=auth) for _ in range(5)]
+
+    start = loop.time()
+    await asyncio.gather(*watches)
+
+    # five watches must run side by side, not one after another
+    assert loop.time() - start < 2
+    assert channel.qsize() >= 5 * 5
+
+def test_watch_condition(server, auth):
+    target = str(server.url)
+    matches = []
+
+    def _cb(r, matched: bool):
+        matches.append(matched)
+
+    eapix.watch(target, "show hostname", callback=_cb, auth=auth,
+                encoding="json", interval=0.1, deadline=10,
+                condition=Match("hostname", "localhost"))
+
+    assert matches == [True]
+
+def test_execute_streaming(server, commands, auth):
+    target = str(server.url)
+    rsp = eapix.execute(target, commands, auth=auth, streaming=True)
+
+    assert isinstance(rsp, StreamResponse)
+    assert len(list(rsp)) == len(commands)
+    assert rsp.code == 0
+
+@pytest.mark.asyncio
+async def test_aexecute_streaming(server, commands, auth):
+    target = str(server.url)
+    rsp = await eapix.aexecute(target, commands, auth=auth, streaming=True)
+
+    async with rsp:
+        elems = [elem async for elem in rsp]
+
+    assert len(elems) == len(commands)
+    assert rsp.time_to_first_result is not None
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2024 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+
+import asyncio
+
+import pytest
+
+from eapix.batching import Batcher, _split, batchable
+from eapix.client import AsyncClient
+from eapix.exceptions import EapiConnectionError
+from eapix.types import Command, EapiOptions
+from eapix.util import prepare_request
+
+
+def _requests(*commands):
+    return [prepare_request(cmds) for cmds in commands]
+
+
+def test_batchable():
+    assert batchable(prepare_request(["show version", "show clock"]))
+    assert not batchable(prepare_request(["show version", "enable"]))
+    assert not batchable(prepare_request([Command("show version", "x")]))
+
+
+def test_split():
+    requests = _requests(["show a"], ["show b", "show c"], ["show d"])
+
+    bodies = _split(requests, {"result": [1, 2, 3, 4]})
+    assert [b["result"] for b in bodies] == [[1], [2, 3], [4]]
+
+    # 'show c' failed, 'show d' did not run
+    error = {"code": 1002, "message": "CLI command 3 of 4 'show c' failed",
+             "data": [1, 2, {"errors": ["bad"]}]}
+    bodies = _split(requests, {"error": error})
+
+    assert bodies[0]["result"] == [1]
+    assert bodies[1]["error"]["data"] == [2, {"errors": ["bad"]}]
+    assert bodies[1]["error"]["message"] == "CLI command 2 of 2 'show c' failed"
+    assert bodies[2] is None
+
+    # rejected as a whole
+    rejected = {"error": {"code": -32600, "message": "bad request"}}
+    assert _split(requests, rejected) == [rejected] * 3
+
+
+@pytest.mark.asyncio
+async def test_batcher():
+    batcher = Batcher(window=0.01, size=10)
+    sent = []
+
+    async def send(request):
+        sent.append(request)
+        cmds = request["params"]["cmds"]
+        return {"result": [cmd["cmd"] for cmd in cmds]}
+
+    requests = _requests(["show a"], ["show b", "show c"], ["show d"])
+    bodies = await asyncio.gather(
+        *[batcher.submit(("t",), request, send) for request in requests])
+
+    assert len(sent) == 1
+    assert [b["result"] for b in bodies] == \
+        [["show a"], ["show b", "show c"], ["show d"]]
+
+    # full batches are sent at once
+    batcher = Batcher(window=10.0, size=2)
+    sent.clear()
+    tasks = [asyncio.create_task(batcher.submit(("t",), request, send))
+             for request in requests]
+    await asyncio.sleep(0.01)
+
+    assert [len(r["params"]["cmds"]) for r in sent] == [1, 2]
+
+    # open batches are sent on close
+    await batcher.close()
+    await asyncio.gather(*tasks)
+    assert [len(r["params"]["cmds"]) for r in sent] == [1, 2, 1]
+
+
+@pytest.mark.asyncio
+async def test_batcher_failed():
+    batcher = Batcher(window=0.01)
+    sent = []
+
+    async def send(request):
+        sent.append(request)
+        cmds = [cmd["cmd"] for cmd in request["params"]["cmds"]]
+        if "show bogus" in cmds:
+            index = cmds.index("show bogus")
+            return {"error": {"code": 1002, "message": "failed",
+                              "data": cmds[:index] + [{"errors": ["bad"]}]}}
+        return {"result": cmds}
+
+    requests = _requests(["show a"], ["show bogus"], ["show d"])
+    bodies = await asyncio.gather(
+        *[batcher.submit(("t",), request, send) for request in requests])
+
+    assert bodies[0]["result"] == ["show a"]
+    assert bodies[1]["error"]["data"] == [{"errors": ["bad"]}]
+    # sent again on its own
+    assert bodies[2]["result"] == ["show d"]
+    assert len(sent) == 2
+
+
+@pytest.mark.asyncio
+async def test_batcher_exception():
+    batcher = Batcher(window=0.01)
+
+    async def send(request):
+        raise EapiConnectionError("down")
+
+    requests = _requests(["show a"], ["show b"])
+    results = await asyncio.gather(
+        *[batcher.submit(("t",), request, send) for request in requests],
+        return_exceptions=True)
+
+    assert all(isinstance(r, EapiConnectionError) for r in results)
+
+
+@pytest.mark.asyncio
+async def test_client(server, auth):
+    target = str(server.url)
+    sent = []
+
+    async def on_request(request):
+        sent.append(request)
+
+    async with AsyncClient(auth=auth, batcher=Batcher(window=0.01),
+                           event_hooks={"request": [on_request]}) as sess:
+        hostname, version, bogus, clock = await asyncio.gather(
+            sess.call(target, ["show hostname"], EapiOptions(encoding="json")),
+            sess.call(target, ["show version"], EapiOptions(encoding="json")),
+            sess.call(target, ["show bogus"], EapiOptions(encoding="json")),
+            sess.call(target, ["show clock"], EapiOptions(encoding="json")))
+
+    # show clock did not run in the batch
+    assert len(sent) == 2
+
+    assert hostname.code == 0
+    assert hostname.elements[0].result["hostname"] == "localhost"
+    assert version.elements[0].result["modelName"] == "DCS-7280CR2M-30-F"
+    assert bogus.code == 1002
+    assert clock.code == 0
+    assert "timezone" in clock.elements[0].result
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2024 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+
+import pytest
+
+from eapix.cache import ResponseCache, cacheable
+from eapix.client import AsyncClient, Client
+from eapix.response import Response
+from eapix.schemas import SCHEMAS
+from eapix.types import Command, EapiOptions, Target
+from eapix.util import prepare_request
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _response(target, request):
+    return Response.from_rpc_response(target, request, {"result": [{}]})
+
+
+def test_cacheable():
+    assert cacheable({"cmd": "show version"})
+    assert cacheable({"cmd": "enable"})
+    assert not cacheable({"cmd": "enable", "input": "s3cr3t"})
+    assert not cacheable({"cmd": "configure"})
+    assert not cacheable({"cmd": "show running-config | configure"})
+    assert not cacheable({"cmd": "clear counters"})
+
+
+def test_ttl():
+    cache = ResponseCache(ttl=5.0, ttls={"show  version": 300.0,
+                                         "show clock": 0})
+
+    assert cache.ttl_for(prepare_request(["show version"])) == 300.0
+    assert cache.ttl_for(prepare_request(["show version", "show hostname"])) == 5.0
+    assert cache.ttl_for(prepare_request(["show version", "show clock"])) == 0
+    assert cache.ttl_for(prepare_request(["show version", "reload"])) == 0
+    assert cache.ttl_for(prepare_request(
+        [Command("enable", "s3cr3t"), "show version"])) == 0
+
+
+def test_expiry():
+    clock = Clock()
+    cache = ResponseCache(ttl=5.0, clock=clock)
+    target = Target.from_url("veos")
+
+    request = prepare_request(["show version"])
+    response = _response(target, request)
+    cache.put(target, request, response)
+
+    # a new request id, same params
+    cached = cache.get(target, prepare_request(["show version"]))
+    assert cached.to_dict() == response.to_dict()
+    assert cache.get(Target.from_url("other"), request) is None
+    assert cache.get(target, prepare_request(
+        ["show version"], EapiOptions(encoding="json"))) is None
+
+    clock.now = 5.0
+    assert cache.get(target, request) is None
+    assert len(cache) == 0
+
+
+def test_copies():
+    cache = ResponseCache(ttl=5.0)
+    target = Target.from_url("veos")
+    request = prepare_request(["show version"], EapiOptions(encoding="json"))
+
+    response = Response.from_rpc_response(
+        target, request, {"result": [{"version": "4.30"}]})
+    cache.put(target, request, response)
+    response.elements[0].result._data["version"] = "changed"
+
+    # callers can not change what the others get
+    cached = cache.get(target, request)
+    assert cached.elements[0].result["version"] == "4.30"
+    cached.elements.clear()
+    assert len(cache.get(target, request).elements) == 1
+    assert cached.target is target
+
+
+def test_schemas_key():
+    cache = ResponseCache(ttl=5.0)
+    target = Target.from_url("veos")
+    request = prepare_request(["show version"])
+    cache.put(target, request, _response(target, request),
+              dict(SCHEMAS))
+
+    # equal schemas, not the same object
+    assert cache.get(target, request, dict(SCHEMAS)) is not None
+    assert cache.get(target, request) is None
+
+
+def test_lru():
+    cache = ResponseCache(maxsize=2, ttl=5.0)
+    target = Target.from_url("veos")
+    requests = [prepare_request([f"show {n}"]) for n in range(3)]
+
+    for request in requests[:2]:
+        cache.put(target, request, _response(target, request))
+
+    # most recently used
+    assert cache.get(target, requests[0]) is not None
+
+    cache.put(target, requests[2], _response(target, requests[2]))
+
+    assert len(cache) == 2
+    assert cache.get(target, requests[1]) is None
+    assert cache.get(target, requests[0]) is not None
+
+    cache.invalidate(target)
+    assert len(cache) == 0
+
+
+def test_errors_not_cached(errored_response):
+    cache = ResponseCache()
+    target, request, _ = errored_response
+
+    cache.put(target, request, Response.from_rpc_response(*errored_response))
+    assert len(cache) == 0
+
+
+def test_client(server, auth):
+    target = str(server.url)
+    sent = []
+
+    cache = ResponseCache(ttl=60.0)
+    with Client(auth=auth, cache=cache,
+                event_hooks={"request": [sent.append]}) as sess:
+        first = sess.call(target, ["show hostname"])
+        assert sess.call(target, ["show hostname"]).to_dict() == \
+            first.to_dict()
+        assert len(sent) == 1
+
+        sess.call(target, ["show hostname", "bogus"])
+        sess.call(target, ["show hostname", "bogus"])
+        assert len(sent) == 3
+
+    assert cache.hits == 1
+
+
+@pytest.mark.asyncio
+async def test_async_client(server, auth):
+    target = str(server.url)
+    cache = ResponseCache(ttl=60.0)
+
+    async with AsyncClient(auth=auth, cache=cache) as sess:
+        first = await sess.call(target, ["show hostname"])
+        assert (await sess.call(target, ["show hostname"])).to_dict() == \
+            first.to_dict()
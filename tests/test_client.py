@@ -11,9 +11,12 @@ from eapix.util import prepare_request
 import eapix
 import eapix.exceptions
 import eapix.client
-from eapix.response import Response
+from eapix.response import Response, StreamResponse
 from eapix.client import Client, AsyncClient
-from eapix.types import Target
+from eapix.sessions import SqliteSessionStore
+from eapix.types import EapiOptions, Target
+from tests.server import unix_server  # noqa: F401
+from eapix.transport import AsyncTargetPoolTransport, TargetPoolTransport
 
 def test_login(session, server, auth):
     target = str(server.url)
@@ -36,6 +39,27 @@ def test_call(session, server, auth):
     session.call(target, ["show hostname"])
 
 
+def test_call_session_args(server, auth):
+    target = str(server.url)
+    fqdn = Target.from_url(target).fqdn
+    with Client() as sess:
+        # as stored by a login that fell back to basic auth
+        sess._eapi_sessions[fqdn] = {"auth": auth}
+        # per call arguments are not kept for the next calls
+        sess.call(target, ["show hostname"], timeout=5)
+        assert sess._eapi_sessions[fqdn] == {"auth": auth}
+
+
+@pytest.mark.asyncio
+async def test_async_call_session_args(server, auth):
+    target = str(server.url)
+    fqdn = Target.from_url(target).fqdn
+    async with AsyncClient() as sess:
+        sess._eapi_sessions[fqdn] = {"auth": auth}
+        await sess.call(target, ["show hostname"], timeout=5)
+        assert sess._eapi_sessions[fqdn] == {"auth": auth}
+
+
 def test_http_error(session, server):
     target = str(server.url)
     t = Target.from_url(target)
@@ -109,3 +133,237 @@ async def test_async(server, auth):
         responses = await asyncio.gather(*tasks)
 
         assert len(responses) == 36
+
+
+def test_stream(session, server, auth, commands):
+    target = str(server.url)
+
+    with session.stream(target, commands) as rsp:
+        elems = list(rsp)
+
+    assert rsp.code == 0
+    assert [e.command["cmd"] for e in elems] == commands
+
+    rsp = session.stream(target, ["show hostname", "show bogus"]).read()
+    assert rsp.code > 0
+    assert len(rsp.elements) == 2
+
+
+@pytest.mark.asyncio
+async def test_async_stream(server, auth, commands):
+    target = str(server.url)
+
+    async with AsyncClient(auth=auth) as sess:
+        rsp = await sess.stream(target, commands)
+        async with rsp:
+            elems = [elem async for elem in rsp]
+
+    assert rsp.code == 0
+    assert len(elems) == len(commands)
+
+
+@pytest.mark.asyncio
+async def test_async_stream_items(server, auth):
+    target = str(server.url)
+
+    async with AsyncClient(auth=auth) as sess:
+        rsp = await sess.stream(target, ["show version"],
+                                EapiOptions(encoding="json"))
+        items = {key: value async for (key,), value in rsp.aiter_items("*")}
+
+    assert rsp.code == 0
+    assert items["modelName"] == "DCS-7280CR2M-30-F"
+
+
+def test_call_streaming(session, server, commands):
+    target = str(server.url)
+
+    rsp = session.call(target, commands, EapiOptions(streaming=True))
+    assert isinstance(rsp, StreamResponse)
+
+    elems = list(rsp)
+    assert len(elems) == len(commands)
+    assert rsp.code == 0
+    assert 0 < rsp.time_to_first_result <= rsp.elapsed
+
+
+@pytest.mark.asyncio
+async def test_async_coalesce(server, auth):
+    target = str(server.url)
+    sent = []
+
+    async def on_request(request):
+        sent.append(request)
+
+    async with AsyncClient(auth=auth, coalesce=True,
+                           event_hooks={"request": [on_request]}) as sess:
+        responses = await asyncio.gather(
+            *[sess.call(target, ["show hostname"]) for _ in range(5)])
+
+        assert len(sent) == 1
+        assert all(rsp is responses[0] for rsp in responses)
+
+        # configuration is never shared
+        await asyncio.gather(
+            *[sess.call(target, ["show hostname", "bogus"]) for _ in range(2)])
+        assert len(sent) == 3
+
+        # nothing left in flight
+        await sess.call(target, ["show hostname"])
+        assert len(sent) == 4
+
+
+def test_pool_limits():
+    with Client(max_connections=7, max_keepalive_connections=3,
+                keepalive_expiry=1.0) as sess:
+        pool = sess._client._transport._pool
+        assert pool._max_connections == 7
+        assert pool._max_keepalive_connections == 3
+        assert pool._keepalive_expiry == 1.0
+
+    # an explicit httpx.Limits wins
+    with Client(limits=httpx.Limits(max_connections=2)) as sess:
+        assert sess._client._transport._pool._max_connections == 2
+
+
+def test_http2():
+    pytest.importorskip("h2")
+    with Client(http2=True) as sess:
+        assert sess._client._transport._pool._http2
+
+
+def test_connections_per_target(server, auth):
+    target = str(server.url)
+    with Client(auth=auth, max_connections_per_target=1,
+                keepalive_expiry=30.0) as sess:
+        transport = sess._client._transport
+        assert isinstance(transport, TargetPoolTransport)
+
+        sess.call(target, ["show hostname"])
+        sess.call(target, ["show version"])
+
+        # one pool for the target, its connection was reused
+        assert len(transport) == 1
+        pool, = transport._pools.values()
+        assert pool._pool._max_connections == 1
+        assert pool._pool._keepalive_expiry == 30.0
+        assert len(pool._pool.connections) == 1
+
+
+@pytest.mark.asyncio
+async def test_async_connections_per_target():
+    async with AsyncClient(max_connections_per_target=2) as sess:
+        assert isinstance(sess._client._transport, AsyncTargetPoolTransport)
+        assert sess.limiter.concurrency == 2
+
+
+def test_unix_socket(unix_server, auth):
+    target = f"unix://{unix_server.config.uds}"
+    with Client(auth=auth) as sess:
+        response = sess.call(target, ["show hostname"],
+                             EapiOptions(encoding="json"))
+        assert response.code == 0
+        assert response.target.transport == "unix"
+
+        with sess.stream(target, ["show hostname"]) as rsp:
+            assert len(list(rsp)) == 1
+
+        # one client per socket
+        assert list(sess._socket_clients) == [unix_server.config.uds]
+
+
+def test_unix_socket_login(unix_server, auth, tmp_path):
+    target = f"unix://{unix_server.config.uds}"
+    store = SqliteSessionStore(str(tmp_path / "sessions.db"))
+    with Client(session_store=store) as sess:
+        sess.login(target, auth=auth)
+        assert sess.logged_in(target)
+        assert store.get(unix_server.config.uds, auth[0]) is not None
+
+        # the session cookie is sent over the socket
+        assert sess.call(target, ["show hostname"]).code == 0
+
+        sess.logout(target)
+        assert not sess.logged_in(target)
+        assert store.get(unix_server.config.uds, auth[0]) is None
+
+
+@pytest.mark.asyncio
+async def test_async_unix_socket_login(unix_server, auth):
+    target = f"unix://{unix_server.config.uds}"
+    async with AsyncClient() as sess:
+        await sess.login(target, auth=auth)
+        assert sess.logged_in(target)
+        assert (await sess.call(target, ["show hostname"])).code == 0
+        await sess.logout(target)
+
+
+@pytest.mark.asyncio
+async def test_async_unix_socket(unix_server, auth):
+    target = f"unix://{unix_server.config.uds}"
+    async with AsyncClient(auth=auth) as sess:
+        response = await sess.call(target, ["show hostname"])
+        assert response.code == 0
+
+
+@pytest.mark.asyncio
+async def test_warm(server, auth):
+    target = str(server.url)
+    paths = []
+
+    async def on_request(request):
+        if request.url.port != 1:
+            paths.append(request.url.path)
+
+    async with AsyncClient(auth=auth, keepalive_expiry=0.2,
+                           event_hooks={"request": [on_request]}) as sess:
+        assert not sess.is_warm(target)
+
+        errors = await sess.warm([target, "http://localhost:1"],
+                                 keepalive=True, interval=0.05)
+
+        assert errors[Target.from_url(target).to_url()] is None
+        assert isinstance(errors["http://localhost:1"],
+                          eapix.exceptions.EapiError)
+        assert paths[:2] == ["/login", "/command-api"]
+        assert sess.is_warm(target)
+        assert not sess.is_warm("http://localhost:1")
+
+        # idle targets are pinged
+        await asyncio.sleep(0.3)
+        assert sess.is_warm(target)
+        assert paths.count("/command-api") > 2
+
+    async with AsyncClient(auth=auth, keepalive_expiry=0.05) as sess:
+        await sess.warm([target], login=False)
+        await asyncio.sleep(0.1)
+        assert not sess.is_warm(target)
+
+
+@pytest.mark.asyncio
+async def test_keepalive(server, auth, caplog):
+    target = str(server.url)
+
+    # connections that never expire
+    async with AsyncClient(auth=auth,
+                           limits=httpx.Limits(keepalive_expiry=None)) as sess:
+        with pytest.raises(ValueError):
+            sess.keepalive([target])
+        await sess.warm([target], login=False)
+        assert sess.is_warm(target)
+
+    # failures are logged and tried again, bugs are raised
+    sess = AsyncClient(auth=auth)
+    with caplog.at_level("DEBUG", logger="eapix.client"):
+        sess.keepalive(["http://localhost:1"], interval=0.01)
+        await asyncio.sleep(0.1)
+    assert "keepalive to http://localhost:1 failed" in caplog.text
+
+    async def ping(target):
+        raise RuntimeError("bug")
+
+    sess._ping = ping
+    await asyncio.sleep(0.05)
+    with pytest.raises(RuntimeError):
+        await sess.close()
+    assert sess._client.is_closed
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2024 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+
+import json
+
+import pytest
+
+import eapix.codec
+from eapix.codec import get_codec
+
+
+def _available():
+    names = []
+    for name in ("orjson", "msgspec", "json"):
+        try:
+            get_codec(name)
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+
+@pytest.mark.parametrize("name", _available())
+def test_codec(name):
+    codec = get_codec(name)
+    data = {"a": [1, 2.5, None, True], "b": "é", "c": 2 ** 64 - 1}
+
+    encoded = codec.dumps(data)
+    assert isinstance(encoded, bytes)
+    assert codec.loads(encoded) == data
+    assert codec.loads(encoded.decode("utf-8")) == data
+
+    # wider than 64 bits
+    assert codec.loads(b'{"n": 340282366920938463463374607431768211456}') == \
+        {"n": 2 ** 128}
+    assert codec.loads(codec.dumps({"n": 2 ** 128})) == {"n": 2 ** 128}
+
+
+@pytest.mark.parametrize("name", _available())
+def test_spaced(name):
+    codec = get_codec(name)
+    data = {"a": [1, 2.5, None, True], "b": "é", "c": 2 ** 128}
+
+    # as json.dumps, byte for byte
+    assert codec.dumps(data, spaced=True) == json.dumps(data).encode()
+    assert b" " not in codec.dumps(data)
+
+
+def test_get_codec():
+    assert get_codec("json").name == "json"
+    assert get_codec("auto").name in _available()
+
+    with pytest.raises(ValueError):
+        get_codec("bogus")
+
+
+def test_module_codec():
+    assert eapix.codec.loads(eapix.codec.dumps([1, "x"])) == [1, "x"]
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2024 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+
+import copy
+import re
+
+import pytest
+
+import eapix.response
+from eapix.conditions import (Condition, Match, Never, Search,
+                              compile_condition)
+from eapix.response import Response
+
+
+def test_search(text_response, json_response):
+    text = Response.from_rpc_response(*text_response)
+    json_ = Response.from_rpc_response(*json_response)
+
+    assert Search(r"FQDN:\s+rbf153")(text)
+    assert not Search(r"FQDN")(text.__class__(text.target, []))
+    assert Search("DCS-7280", index=1)(text)
+    assert not Search("DCS-7280", index=0)(text)
+    assert not Search("DCS-7280", index=5)(text)
+    assert Search("modelName")(json_)
+    # results are searched as str(response) renders them
+    assert Search("'hostname': 'rbf153'")(json_)
+
+    with pytest.raises(TypeError):
+        Condition()
+
+
+def test_search_rendered_once(json_response, monkeypatch):
+    rendered = []
+    pformat = eapix.response.pformat
+    monkeypatch.setattr(eapix.response, "pformat",
+                        lambda data: rendered.append(data) or pformat(data))
+
+    search = Search("modelName")
+    for _ in range(3):
+        # a new response each poll, with the same data
+        assert search(Response.from_rpc_response(*json_response))
+    assert len(rendered) == len(json_response[1]["params"]["cmds"])
+
+    target, request, response = copy.deepcopy(json_response)
+    response["result"][0]["hostname"] = "changed"
+    assert search(Response.from_rpc_response(target, request, response))
+    assert rendered[-1]["hostname"] == "changed"
+
+
+def test_match(json_response, text_response):
+    json_ = Response.from_rpc_response(*json_response)
+    text = Response.from_rpc_response(*text_response)
+
+    assert Match("hostname", "rbf153")(json_)
+    assert Match("hostname", "rbf153", index=0)(json_)
+    assert not Match("hostname", "rbf153", index=1)(json_)
+    assert Match("memFree", 25000000, op=">")(json_)
+    assert Match("*", "i686")(json_)
+    assert Match("modelName", r"^DCS-72", op="=~")(json_)
+    assert not Match("bogus.path", None)(json_)
+    assert not Match("hostname", "rbf153")(text)
+
+    with pytest.raises(ValueError):
+        Match("hostname", "x", op="<>")
+
+
+def test_match_parse(json_response):
+    json_ = Response.from_rpc_response(*json_response)
+
+    assert Match.parse('hostname == "rbf153"')(json_)
+    assert Match.parse("isIntlVersion == false")(json_)
+    assert Match.parse("memTotal >= 32890040")(json_)
+    assert Match.parse("architecture != x86_64")(json_)
+
+    with pytest.raises(ValueError):
+        Match.parse("hostname")
+
+
+def test_compile_condition(text_response):
+    text = Response.from_rpc_response(*text_response)
+
+    assert isinstance(compile_condition(None), Never)
+    assert isinstance(compile_condition("FQDN"), Search)
+    assert compile_condition(re.compile("FQDN"))(text)
+    assert compile_condition(lambda r: r.code == 0)(text)
+
+    with pytest.raises(ValueError):
+        compile_condition(42)
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2024 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+
+import asyncio
+
+from typing import Dict
+
+import pytest
+
+import eapix.exceptions
+from eapix.engine import WatchEngine
+from eapix.response import Response
+
+
+@pytest.mark.asyncio
+async def test_engine(server, auth):
+    target = str(server.url)
+
+    commands = ["show clock", "show hostname", "show version"]
+    polls: Dict[str, int] = dict.fromkeys(commands, 0)
+    async with WatchEngine(auth=auth, concurrency=4) as engine:
+        for cmd in commands:
+            engine.subscribe(target, cmd, interval=0.1, deadline=0.35)
+
+        async for response, matched in engine:
+            assert isinstance(response, Response)
+            assert not matched
+            polls[response.elements[0].command["cmd"]] += 1
+
+        assert len(engine) == 0
+
+    # due at 0, 0.1, 0.2 and 0.3 seconds, late ticks are skipped rather
+    # than queued
+    assert all(1 <= count <= 4 for count in polls.values())
+
+
+@pytest.mark.asyncio
+async def test_engine_condition(server, auth):
+    target = str(server.url)
+
+    async with WatchEngine(auth=auth) as engine:
+        engine.subscribe(target, "show hostname", interval=0.1,
+                         condition="localhost")
+        engine.subscribe(target, "show hostname", interval=0.1,
+                         condition="bogus", exclude=True)
+
+        events = [e async for e in engine]
+
+    assert [matched for _, matched in events] == [True, True]
+
+
+@pytest.mark.asyncio
+async def test_engine_unsubscribe(server, auth):
+    target = str(server.url)
+
+    async with WatchEngine(auth=auth) as engine:
+        sub = engine.subscribe(target, "show clock", interval=0.05)
+
+        count = 0
+        async for _ in engine:
+            count += 1
+            if count == 3:
+                engine.unsubscribe(sub)
+
+    assert count == 3
+
+
+@pytest.mark.asyncio
+async def test_engine_exceptions(auth):
+    async with WatchEngine(auth=auth, return_exceptions=True) as engine:
+        engine.subscribe("http://localhost:1", "show clock", deadline=0)
+        events = [e async for e in engine]
+
+    assert len(events) == 1
+    assert isinstance(events[0][0], eapix.exceptions.EapiError)
+
+
+@pytest.mark.asyncio
+async def test_engine_invalid_target(auth):
+    async def run():
+        async with WatchEngine(auth=auth, return_exceptions=True) as engine:
+            engine.subscribe("not a valid target!", "show clock",
+                             interval=0.1)
+            return [e async for e in engine]
+
+    # raised, not waited for forever
+    with pytest.raises(ValueError):
+        await asyncio.wait_for(run(), 5)
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2024 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+
+import time
+
+import pytest
+
+import eapix.exceptions
+from eapix.client import AsyncClient, Client
+from eapix.resilience import RetryPolicy
+from eapix.types import EapiOptions
+from tests.server import Faults
+
+
+def _faults(spec: str) -> dict:
+    return {"headers": {"x-eapi-faults": spec,
+                        "content-type": "application/json"}}
+
+
+def test_parse():
+    faults = Faults.parse("slow_headers=0.5,burst=2", Faults(reset=1.0))
+    assert faults == Faults(slow_headers=0.5, burst=2, reset=1.0)
+
+    with pytest.raises(KeyError):
+        Faults.parse("bogus=1")
+
+
+def test_slow_headers(server, auth):
+    with Client(auth=auth) as sess:
+        with pytest.raises(eapix.exceptions.EapiTimeoutError):
+            sess.call(str(server.url), ["show hostname"], timeout=0.1,
+                      **_faults("slow_headers=0.5"))
+
+
+def test_slow_body(server, auth):
+    with Client(auth=auth) as sess:
+        start = time.monotonic()
+        response = sess.call(str(server.url), ["show version"],
+                             **_faults("slow_body=0.05,chunks=4"))
+        assert response.code == 0
+        assert time.monotonic() - start >= 0.15
+
+
+def test_reset(server, auth):
+    with Client(auth=auth) as sess:
+        with pytest.raises(eapix.exceptions.EapiConnectionError):
+            sess.call(str(server.url), ["show version"], **_faults("reset=1"))
+
+
+def test_burst(server, auth):
+    with Client(auth=auth, retry=RetryPolicy(retries=2, backoff=0)) as sess:
+        with pytest.raises(eapix.exceptions.EapiHttpError) as exc:
+            sess.call(str(server.url), ["show version"],
+                      **_faults("burst=1,burst_every=1"))
+        assert exc.value.status_code == 503
+
+
+def test_partial_error(server, auth):
+    with Client(auth=auth) as sess:
+        response = sess.call(str(server.url),
+                             ["show hostname", "show version"],
+                             EapiOptions(encoding="json"),
+                             **_faults("partial_error=1"))
+
+    assert response.code == 1002
+    # the result of the command before the failure
+    assert response.elements[0].result["hostname"] == "localhost"
+
+
+@pytest.mark.asyncio
+async def test_session_expiry(server, auth):
+    target = str(server.url)
+    async with AsyncClient(auth=auth) as sess:
+        await sess.login(target, auth)
+        assert (await sess.call(target, ["show hostname"],
+                                **_faults("session_ttl=60"))).code == 0
+
+        with pytest.raises(eapix.exceptions.EapiAuthenticationFailure):
+            await sess.call(target, ["show hostname"],
+                            **_faults("session_ttl=0.000001"))
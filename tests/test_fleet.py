@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2024 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+
+import asyncio
+
+import pytest
+
+import eapix
+import eapix.exceptions
+from eapix.fleet import Fleet
+from eapix.response import Response
+
+
+@pytest.mark.asyncio
+async def test_fleet(server, commands, auth):
+    targets = [str(server.url)] * 10
+
+    responses = []
+    async with Fleet(auth=auth, concurrency=3) as fleet:
+        async for rsp in fleet.execute(targets, commands):
+            responses.append(rsp)
+
+    assert len(responses) == 10
+    assert all(isinstance(r, Response) for r in responses)
+
+
+@pytest.mark.asyncio
+async def test_fleet_exceptions(server, commands, auth):
+    targets = [str(server.url), "http://localhost:1"]
+
+    async with Fleet(auth=auth) as fleet:
+        with pytest.raises(eapix.exceptions.EapiError):
+            async for _ in fleet.execute(targets, commands):
+                pass
+
+        results = [r async for r in fleet.execute(targets, commands,
+                                                  return_exceptions=True)]
+
+    errors = [r for r in results if isinstance(r, eapix.exceptions.EapiError)]
+    assert len(results) == 2
+    assert len(errors) == 1
+    assert errors[0].target == "http://localhost:1"
+
+
+@pytest.mark.asyncio
+async def test_fleet_invalid_target(server, commands, auth):
+    targets = [str(server.url), "not a valid target!"]
+
+    async def run():
+        async with Fleet(auth=auth) as fleet:
+            return [r async for r in fleet.execute(targets, commands,
+                                                   return_exceptions=True)]
+
+    async def run_many():
+        return [r async for r in eapix.aexecute_many(
+            targets, commands, auth=auth, return_exceptions=True)]
+
+    # raised, not waited for forever
+    with pytest.raises(ValueError):
+        await asyncio.wait_for(run(), 5)
+
+    with pytest.raises(ValueError):
+        await asyncio.wait_for(run_many(), 5)
+
+
+def test_fleet_concurrency():
+    with pytest.raises(ValueError):
+        Fleet(concurrency=0)
+
+
+@pytest.mark.asyncio
+async def test_aexecute_many(server, commands, auth):
+    targets = [str(server.url)] * 4
+    responses = [r async for r in eapix.aexecute_many(targets, commands,
+                                                      auth=auth,
+                                                      concurrency=2)]
+    assert len(responses) == 4
@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2024 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+
+import asyncio
+import gc
+
+import pytest
+
+import eapix.exceptions
+from eapix.client import AsyncClient
+from eapix.limits import Limiter, TokenBucket
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_token_bucket():
+    clock = Clock()
+    bucket = TokenBucket(rate=2.0, burst=2, clock=clock)
+
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == 0.0
+    # reserved in order
+    assert bucket.reserve() == pytest.approx(0.5)
+    assert bucket.reserve() == pytest.approx(1.0)
+
+    clock.now = 10.0
+    assert bucket.reserve() == 0.0
+
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0)
+
+
+def test_aimd():
+    clock = Clock()
+    limiter = Limiter(concurrency=8, latency=1.0, clock=clock)
+
+    assert limiter.limit("t") == 8
+
+    limiter.observe("t", 0.1, overloaded=True)
+    assert limiter.limit("t") == 4
+    # once per round trip
+    limiter.observe("t", 2.0)
+    assert limiter.limit("t") == 4
+
+    clock.now = 5.0
+    limiter.observe("t", 2.0)
+    assert limiter.limit("t") == 2
+
+    for _ in range(10):
+        limiter.observe("t", 0.1)
+    assert 4 < limiter.limit("t") <= 8
+
+    for _ in range(100):
+        limiter.observe("t", 0.1)
+    assert limiter.limit("t") == 8
+
+    # other targets are not affected
+    assert limiter.limit("other") == 8
+
+
+@pytest.mark.asyncio
+async def test_concurrency():
+    limiter = Limiter(concurrency=2, adaptive=False)
+    peak = 0
+
+    async def request():
+        nonlocal peak
+        await limiter.acquire("t")
+        try:
+            peak = max(peak, limiter.in_flight("t"))
+            await asyncio.sleep(0.01)
+        finally:
+            limiter.release("t")
+
+    await asyncio.gather(*[request() for _ in range(10)])
+
+    assert peak == 2
+    assert limiter.in_flight("t") == 0
+
+
+@pytest.mark.asyncio
+async def test_cancel_waiting():
+    limiter = Limiter(concurrency=1, adaptive=False)
+
+    await limiter.acquire("t")
+    waiter = asyncio.create_task(limiter.acquire("t"))
+    await asyncio.sleep(0)
+
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    limiter.release("t")
+    assert limiter.in_flight("t") == 0
+
+    await asyncio.wait_for(limiter.acquire("t"), 1)
+
+
+@pytest.mark.asyncio
+async def test_rate():
+    limiter = Limiter(concurrency=0, rate=50.0, burst=1)
+    loop = asyncio.get_running_loop()
+
+    start = loop.time()
+    for _ in range(5):
+        await limiter.acquire("t")
+        limiter.release("t")
+
+    assert loop.time() - start >= 0.07
+
+
+@pytest.mark.asyncio
+async def test_client(server, auth):
+    target = str(server.url)
+    limiter = Limiter(concurrency=1, adaptive=False)
+    async with AsyncClient(auth=auth, limiter=limiter) as sess:
+        responses = await asyncio.gather(
+            *[sess.call(target, ["show hostname"]) for _ in range(4)])
+
+        assert len(responses) == 4
+        assert limiter.in_flight(target) == 0
+
+
+@pytest.mark.asyncio
+async def test_client_stream(server, auth):
+    target = str(server.url)
+    limiter = Limiter(concurrency=1, adaptive=False)
+    async with AsyncClient(auth=auth, limiter=limiter) as sess:
+        # read to the end
+        rsp = await sess.stream(target, ["show hostname"])
+        await rsp.aread()
+        assert limiter.in_flight(target) == 0
+
+        rsp = await sess.stream(target, ["show hostname"])
+        with pytest.raises(TypeError):
+            rsp.close()
+        await rsp.aclose()
+        assert limiter.in_flight(target) == 0
+
+        # dropped unread
+        rsp = await sess.stream(target, ["show hostname"])
+        del rsp
+        gc.collect()
+        assert limiter.in_flight(target) == 0
+
+        await asyncio.wait_for(sess.call(target, ["show hostname"]), 5)
+
+
+def test_prune():
+    limiter = Limiter(concurrency=2, latency=1.0)
+
+    async def request(key, latency):
+        await limiter.acquire(key)
+        limiter.observe(key, latency)
+        limiter.release(key)
+
+    for i in range(100):
+        asyncio.run(request(f"t{i}", 0.1))
+
+    # idle targets are not kept
+    assert len(limiter._targets) == 0
+    assert limiter.in_flight("t0") == 0
+    assert len(limiter._targets) == 0
+
+    # throttled ones are, until they recover
+    asyncio.run(request("slow", 2.0))
+    assert limiter.limit("slow") == 1
+    asyncio.run(request("slow", 0.1))
+    assert limiter.limit("slow") == 2
+    assert len(limiter._targets) == 0
+
+
+@pytest.mark.asyncio
+async def test_client_default():
+    async with AsyncClient() as sess:
+        assert sess.limiter is None
+
+
+@pytest.mark.asyncio
+async def test_max_connections_per_target(server, auth):
+    target = "http://localhost:1"
+    async with AsyncClient(auth=auth, max_connections_per_target=3) as sess:
+        # failing and slow requests do not lower the cap
+        for _ in range(5):
+            with pytest.raises(eapix.exceptions.EapiError):
+                await sess.call(target, ["show hostname"])
+        sess.limiter.observe(target, 60.0)
+
+        assert sess.limiter.limit(target) == 3
@@ -2,9 +2,14 @@
 # Copyright (c) 2024 Arista Networks, Inc.  All rights reserved.
 # Arista Networks, Inc. Confidential and Proprietary.
 
+import json
+
 import pytest
 from pprint import pprint
-from eapix.response import Response, ResponseElem, TextResult, JsonResult
+from eapix.response import (
+    Response, ResponseElem, StreamResponse, TextResult, JsonResult)
+from eapix.types import EapiOptions, Target
+from eapix.util import prepare_request
 
 def test_text_result(text_response):
     r = TextResult(text_response[-1]["result"][1]["output"])
@@ -48,7 +53,7 @@ def test_json_response(json_response):
     resp = Response.from_rpc_response(*json_response)
     assert resp.code == 0
     assert "fqdn" in resp.pretty
-    resp.to_dict()
+    assert json.loads(resp.json) == resp.to_dict()
     for elem in resp.elements:
         assert isinstance(elem, ResponseElem)
 
@@ -70,3 +75,64 @@ def test_errored_text_response(errored_text_response):
     for elem in resp.elements:
         assert isinstance(elem, ResponseElem)
 
+
+def _chunks(response, size=16):
+    raw = json.dumps(response).encode()
+    return iter([raw[i:i + size] for i in range(0, len(raw), size)])
+
+@pytest.mark.parametrize("fixture", ["text_response", "json_response",
+                                     "errored_response",
+                                     "errored_text_response"])
+def test_stream_response(fixture, request):
+    target, req, response = request.getfixturevalue(fixture)
+
+    expected = Response.from_rpc_response(target, req, response)
+    streamed = StreamResponse(target, req, _chunks(response)).read()
+
+    assert streamed.code == expected.code
+    assert streamed.message == expected.message
+    assert streamed.to_dict() == expected.to_dict()
+
+@pytest.mark.asyncio
+async def test_stream_response_async(json_response):
+    target, req, response = json_response
+
+    async def _achunks():
+        for chunk in _chunks(response):
+            yield chunk
+
+    rsp = StreamResponse(target, req, _achunks())
+    elems = [elem async for elem in rsp]
+
+    assert rsp.code == 0
+    assert [e.to_dict() for e in elems] == \
+        Response.from_rpc_response(target, req, response).to_dict()["responses"]
+
+def test_stream_iter_items():
+    request = prepare_request(["show hostname", "show ip route vrf all"],
+                              EapiOptions(encoding="json"))
+    routes = {
+        "default": {"routes": {"10.0.0.0/8": {"routeType": "static"},
+                               "10.1.0.0/16": {"routeType": "eBGP"}}},
+        "red": {"routes": {"192.0.2.0/24": {"routeType": "connected"}}},
+    }
+    response = {
+        "jsonrpc": "2.0",
+        "id": request["id"],
+        "result": [{"hostname": "localhost"}, {"vrfs": routes}]
+    }
+
+    rsp = StreamResponse(Target.from_url("localhost"), request,
+                         _chunks(response, 7))
+    items = list(rsp.iter_items("vrfs.*.routes.*"))
+
+    assert rsp.code == 0
+    assert items == [
+        (("default", "10.0.0.0/8"), {"routeType": "static"}),
+        (("default", "10.1.0.0/16"), {"routeType": "eBGP"}),
+        (("red", "192.0.2.0/24"), {"routeType": "connected"}),
+    ]
+
+    rsp = StreamResponse(Target.from_url("localhost"), request,
+                         _chunks(response, 7))
+    assert list(rsp.iter_items("hostname", index=0)) == [((), "localhost")]
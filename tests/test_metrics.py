@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2024 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+
+import httpx
+import pytest
+
+import eapix.exceptions
+from eapix.client import AsyncClient, Client
+from eapix.metrics import Histogram, Metrics, start_http_server
+from eapix.resilience import RetryPolicy
+from eapix.types import Target
+
+
+def _series(snapshot, name, **labels):
+    for sample in snapshot[name]:
+        if all(sample["labels"].get(k) == v for k, v in labels.items()):
+            return sample
+    return None
+
+
+def _origin(server):
+    """the target label of the server's requests"""
+    return Target.from_url(str(server.url)).to_url()
+
+
+def test_histogram():
+    histogram = Histogram((0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 5.0):
+        histogram.observe(value)
+
+    assert histogram.cumulative() == [(0.1, 2), (1.0, 3), (float("inf"), 4)]
+    assert histogram.count == 4
+    assert histogram.sum == pytest.approx(5.65)
+
+
+def test_metrics(server, auth):
+    metrics = Metrics(command_label=lambda cmd: cmd.split()[1])
+    target = _origin(server)
+
+    with Client(auth=auth, metrics=metrics) as sess:
+        sess.call(target, ["show hostname", "show version"])
+        sess.call(target, ["show hostname"])
+        sess.call(target, ["show hostname", "show hostname"])
+
+    snapshot = metrics.snapshot()
+
+    assert _series(snapshot, "eapi_request_seconds",
+                   target=target)["count"] == 3
+    # once per request
+    assert _series(snapshot, "eapi_command_seconds",
+                   command="hostname")["count"] == 3
+    assert _series(snapshot, "eapi_command_seconds",
+                   command="version")["count"] == 1
+    assert _series(snapshot, "eapi_decode_seconds",
+                   target=target)["count"] == 3
+    # one connection, reused
+    assert _series(snapshot, "eapi_connect_seconds",
+                   target=target)["count"] == 1
+    assert _series(snapshot, "eapi_pool_wait_seconds",
+                   target=target)["count"] == 3
+
+    assert _series(snapshot, "eapi_sent_bytes_total",
+                   target=target)["value"] > 0
+    assert _series(snapshot, "eapi_received_bytes_total",
+                   target=target)["value"] > 0
+    assert snapshot["eapi_errors_total"] == []
+
+
+def test_errors(server, auth):
+    metrics = Metrics()
+    target = _origin(server)
+
+    with Client(auth=auth, metrics=metrics,
+                retry=RetryPolicy(retries=1, backoff=0)) as sess:
+        with pytest.raises(eapix.exceptions.EapiHttpError):
+            sess.call(target, ["show hostname"], headers={
+                "x-eapi-faults": "burst=1,burst_every=1",
+                "content-type": "application/json"})
+
+    snapshot = metrics.snapshot()
+    assert _series(snapshot, "eapi_retries_total",
+                   target=target)["value"] == 1
+    assert _series(snapshot, "eapi_errors_total", target=target,
+                   error="EapiHttpError")["value"] == 2
+    assert snapshot["eapi_decode_seconds"] == []
+
+
+def test_stream_metrics(server, auth):
+    target = _origin(server)
+    faults = {"headers": {"x-eapi-faults": "slow_body=0.1,chunks=4",
+                          "content-type": "application/json"}}
+
+    called = Metrics()
+    with Client(auth=auth, metrics=called) as sess:
+        sess.call(target, ["show version"])
+
+    metrics = Metrics()
+    with Client(auth=auth, metrics=metrics) as sess:
+        with sess.stream(target, ["show version"], **faults) as rsp:
+            rsp.read()
+
+    snapshot = metrics.snapshot()
+    latency = _series(snapshot, "eapi_request_seconds", target=target)
+    assert latency["count"] == 1
+    # to the whole body, not to the headers
+    assert latency["sum"] >= 0.3
+    assert _series(snapshot, "eapi_received_bytes_total",
+                   target=target)["value"] == \
+        _series(called.snapshot(), "eapi_received_bytes_total",
+                target=target)["value"]
+
+
+@pytest.mark.asyncio
+async def test_async_stream_metrics(server, auth):
+    target = _origin(server)
+    faults = {"headers": {"x-eapi-faults": "slow_body=0.1,chunks=4",
+                          "content-type": "application/json"}}
+
+    called = Metrics()
+    async with AsyncClient(auth=auth, metrics=called) as sess:
+        await sess.call(target, ["show version"])
+
+    metrics = Metrics()
+    async with AsyncClient(auth=auth, metrics=metrics) as sess:
+        rsp = await sess.stream(target, ["show version"], **faults)
+        await rsp.aread()
+
+    snapshot = metrics.snapshot()
+    latency = _series(snapshot, "eapi_request_seconds", target=target)
+    assert latency["count"] == 1
+    assert latency["sum"] >= 0.3
+    assert _series(snapshot, "eapi_received_bytes_total",
+                   target=target)["value"] == \
+        _series(called.snapshot(), "eapi_received_bytes_total",
+                target=target)["value"]
+
+
+@pytest.mark.asyncio
+async def test_async_metrics(server, auth):
+    metrics = Metrics()
+    target = _origin(server)
+
+    async with AsyncClient(auth=auth, metrics=metrics) as sess:
+        await sess.call(target, ["show hostname"])
+
+    snapshot = metrics.snapshot()
+    assert _series(snapshot, "eapi_request_seconds",
+                   target=target)["count"] == 1
+    assert _series(snapshot, "eapi_pool_wait_seconds",
+                   target=target)["count"] == 1
+    # no latency by command without a `command_label`
+    assert snapshot["eapi_command_seconds"] == []
+
+
+def test_prometheus(server, auth):
+    metrics = Metrics()
+    target = _origin(server)
+
+    with Client(auth=auth, metrics=metrics) as sess:
+        sess.call(target, ["show hostname"])
+
+    text = metrics.prometheus()
+    assert "# TYPE eapi_request_seconds histogram" in text
+    assert f'eapi_request_seconds_bucket{{target="{target}",le="+Inf"}} 1' \
+        in text
+    assert f'eapi_request_seconds_count{{target="{target}"}} 1' in text
+
+    http = start_http_server(metrics, 0, "127.0.0.1")
+    try:
+        response = httpx.get(f"http://127.0.0.1:{http.server_port}/metrics")
+        assert response.text == metrics.prometheus()
+    finally:
+        http.shutdown()
+
+    metrics.reset()
+    assert metrics.snapshot()["eapi_request_seconds"] == []
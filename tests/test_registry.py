@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2024 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+
+import eapix
+
+from eapix.registry import ClientRegistry
+
+
+def test_registry_reuse(server, auth):
+    target = str(server.url)
+
+    with ClientRegistry() as registry:
+        with registry.client(target, auth=auth) as first:
+            pass
+        with registry.client(target, auth=auth) as second:
+            pass
+        with registry.client(target, auth=("other", "other")) as third:
+            pass
+
+        assert first is second
+        assert first is not third
+        assert len(registry) == 2
+
+    assert len(registry) == 0
+
+
+def test_registry_idle(server, auth):
+    target = str(server.url)
+
+    with ClientRegistry(idle_timeout=0) as registry:
+        with registry.client(target, auth=auth) as first:
+            # in-use clients are never evicted
+            registry.evict_idle()
+            assert len(registry) == 1
+
+        registry.evict_idle()
+        assert len(registry) == 0
+
+        with registry.client(target, auth=auth) as second:
+            assert first is not second
+
+
+def test_execute_registry(server, commands, auth):
+    target = str(server.url)
+
+    with ClientRegistry() as registry:
+        for _ in range(3):
+            rsp = eapix.execute(target, list(commands), auth=auth,
+                                registry=registry)
+            assert rsp.code == 0
+
+        assert len(registry) == 1
+
+
+def test_execute_streaming_registry(server, commands, auth):
+    target = str(server.url)
+
+    with ClientRegistry(idle_timeout=0) as registry:
+        rsp = eapix.execute(target, list(commands), auth=auth,
+                            streaming=True, registry=registry)
+
+        # borrowed until the body is read, not evicted mid-stream
+        registry.evict_idle()
+        assert len(registry) == 1
+        assert rsp.read().code == 0
+
+        registry.evict_idle()
+        assert len(registry) == 0
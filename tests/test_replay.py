@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2024 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+
+import gzip
+import json
+import os
+import stat
+import time
+
+import httpx
+import pytest
+
+import eapix.exceptions
+from eapix.client import AsyncClient, Client
+from eapix.replay import (
+    AsyncRecordingTransport,
+    AsyncReplayTransport,
+    RecordingTransport,
+    ReplayTransport)
+from eapix.types import EapiOptions
+
+TARGET = "http://veos"
+JSON = EapiOptions(encoding="json")
+
+
+def _switch(request: httpx.Request) -> httpx.Response:
+    body = json.loads(request.content)
+    result = [{"command": cmd["cmd"]} for cmd in body["params"]["cmds"]]
+    # compressed on the wire, kept decoded
+    return httpx.Response(
+        200, headers={"content-encoding": "gzip"},
+        content=gzip.compress(json.dumps(
+            {"jsonrpc": "2.0", "id": body["id"], "result": result}).encode()))
+
+
+def _record(path, auth):
+    transport = RecordingTransport(path, httpx.MockTransport(_switch))
+    with Client(auth=auth, transport=transport) as sess:
+        sess.call(TARGET, ["show version"], JSON)
+        sess.call(TARGET, ["show hostname"], JSON)
+
+
+def test_record(tmp_path, auth):
+    path = str(tmp_path / "eapi.ndjson")
+    _record(path, auth)
+
+    with open(path) as fh:
+        records = [json.loads(line) for line in fh]
+
+    assert [r["url"] for r in records] == [f"{TARGET}/command-api"] * 2
+    assert all(r["status"] == 200 for r in records)
+    assert all(len(r["ids"]) == 1 for r in records)
+    # the request (and its authorization header) is not kept
+    assert auth[1] not in json.dumps(records)
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+
+
+def test_record_login(tmp_path):
+    path = str(tmp_path / "eapi.ndjson")
+
+    def switch(request):
+        if request.url.path == "/login":
+            return httpx.Response(
+                200, headers={"set-cookie": "Session=abc; Path=/"})
+        return _switch(request)
+
+    for password in ("secret", "other"):
+        transport = RecordingTransport(path, httpx.MockTransport(switch))
+        with Client(transport=transport) as sess:
+            sess.login(TARGET, ("admin", password))
+
+    with open(path) as fh:
+        records = [json.loads(line) for line in fh]
+
+    # matched on the URL, the credentials are left out of the key
+    assert len({r["key"] for r in records}) == 1
+
+    with Client(transport=ReplayTransport(path)) as sess:
+        sess.login(TARGET, ("admin", "anything"))
+        assert sess.logged_in(TARGET)
+
+
+def test_replay(tmp_path, auth):
+    path = str(tmp_path / "eapi.ndjson")
+    _record(path, auth)
+
+    with Client(auth=auth, transport=ReplayTransport(path)) as sess:
+        # new request ids, answered in any order, over and over
+        for _ in range(2):
+            response = sess.call(TARGET, ["show hostname"], JSON)
+            assert response.code == 0
+            assert response.elements[0].result["command"] == "show hostname"
+
+        assert sess.call(TARGET, ["show version"], JSON).code == 0
+
+        with pytest.raises(eapix.exceptions.EapiError):
+            sess.call(TARGET, ["show clock"])
+
+
+@pytest.mark.asyncio
+async def test_areplay(tmp_path, auth):
+    path = str(tmp_path / "eapi.ndjson")
+
+    async def switch(request):
+        return _switch(request)
+
+    transport = AsyncRecordingTransport(path, httpx.MockTransport(switch))
+    async with AsyncClient(auth=auth, transport=transport) as sess:
+        await sess.call(TARGET, ["show version"], JSON)
+
+    async with AsyncClient(auth=auth,
+                           transport=AsyncReplayTransport(path)) as sess:
+        response = await sess.call(TARGET, ["show version"], JSON)
+        assert response.elements[0].result["command"] == "show version"
+
+
+def test_replay_speed(tmp_path, auth):
+    path = str(tmp_path / "eapi.ndjson")
+
+    def slow(request):
+        time.sleep(0.1)
+        return _switch(request)
+
+    transport = RecordingTransport(path, httpx.MockTransport(slow))
+    with Client(auth=auth, transport=transport) as sess:
+        sess.call(TARGET, ["show version"])
+
+    for speed, least, most in ((None, 0.0, 0.05), (1.0, 0.1, 1.0),
+                               (4.0, 0.025, 0.09)):
+        with Client(auth=auth,
+                    transport=ReplayTransport(path, speed=speed)) as sess:
+            start = time.monotonic()
+            sess.call(TARGET, ["show version"])
+            assert least <= time.monotonic() - start < most
+
+
+def test_replay_pace(tmp_path, auth):
+    path = str(tmp_path / "eapi.ndjson")
+
+    def slow(request):
+        time.sleep(0.05)
+        return _switch(request)
+
+    transport = RecordingTransport(path, httpx.MockTransport(slow))
+    with Client(auth=auth, transport=transport) as sess:
+        sess.call(TARGET, ["show version"])
+        time.sleep(0.3)
+        sess.call(TARGET, ["show hostname"])
+
+    # sent back to back, answered at the recorded pace
+    for speed, least, most in ((1.0, 0.35, 0.6), (2.0, 0.175, 0.3)):
+        with Client(auth=auth,
+                    transport=ReplayTransport(path, speed=speed)) as sess:
+            start = time.monotonic()
+            sess.call(TARGET, ["show version"])
+            sess.call(TARGET, ["show hostname"])
+            assert least <= time.monotonic() - start < most
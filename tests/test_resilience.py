@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2024 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+
+import httpx
+import pytest
+
+import eapix.exceptions
+from eapix.client import AsyncClient, Client
+from eapix.exceptions import (
+    EapiCircuitOpenError,
+    EapiConnectionError,
+    EapiHttpError,
+    EapiPathNotFoundError)
+from eapix.resilience import (
+    CircuitBreaker,
+    RetryPolicy,
+    acall_with_retry,
+    call_with_retry,
+    is_idempotent)
+from eapix.util import prepare_request
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _failing(*errors):
+    calls = []
+    errors_ = list(errors)
+
+    def func():
+        calls.append(1)
+        if errors_:
+            raise errors_.pop(0)
+        return "ok"
+
+    return func, calls
+
+
+def test_is_idempotent():
+    assert is_idempotent(prepare_request(["show version", "enable"]))
+    assert not is_idempotent(prepare_request(["show version", "reload"]))
+
+
+def test_delays():
+    delays = list(RetryPolicy(retries=4, backoff=1.0, max_backoff=3.0).delays())
+    assert len(delays) == 4
+    for delay, cap in zip(delays, (1.0, 2.0, 3.0, 3.0)):
+        assert 0 <= delay <= cap
+
+
+def test_retry():
+    policy = RetryPolicy(retries=2, backoff=0.0)
+    breaker = CircuitBreaker(threshold=0)
+
+    func, calls = _failing(EapiConnectionError("down"),
+                           EapiHttpError("503", 503))
+    assert call_with_retry("t", func, policy, breaker, True) == "ok"
+    assert len(calls) == 3
+
+    # out of retries
+    func, calls = _failing(*[EapiConnectionError("down")] * 3)
+    with pytest.raises(EapiConnectionError):
+        call_with_retry("t", func, policy, breaker, True)
+    assert len(calls) == 3
+
+    # not idempotent
+    func, calls = _failing(EapiConnectionError("down"))
+    with pytest.raises(EapiConnectionError):
+        call_with_retry("t", func, policy, breaker, False)
+    assert len(calls) == 1
+
+    # the target answered
+    func, calls = _failing(EapiPathNotFoundError("Not Found"))
+    with pytest.raises(EapiPathNotFoundError):
+        call_with_retry("t", func, policy, breaker, True)
+    assert len(calls) == 1
+
+
+def test_breaker():
+    clock = Clock()
+    breaker = CircuitBreaker(threshold=2, reset=10.0, clock=clock)
+    policy = RetryPolicy(retries=0)
+
+    for _ in range(2):
+        func, _ = _failing(EapiConnectionError("down"))
+        with pytest.raises(EapiConnectionError):
+            call_with_retry("t", func, policy, breaker, True)
+
+    assert breaker.is_open("t")
+    assert not breaker.is_open("other")
+
+    func, calls = _failing()
+    with pytest.raises(EapiCircuitOpenError):
+        call_with_retry("t", func, policy, breaker, True)
+    assert not calls
+
+    # trial call fails, open again
+    clock.now = 10.0
+    func, calls = _failing(EapiConnectionError("down"))
+    with pytest.raises(EapiConnectionError):
+        call_with_retry("t", func, policy, breaker, True)
+    with pytest.raises(EapiCircuitOpenError):
+        call_with_retry("t", func, policy, breaker, True)
+
+    # trial call succeeds, closed
+    clock.now = 20.0
+    func, calls = _failing()
+    assert call_with_retry("t", func, policy, breaker, True) == "ok"
+    assert not breaker.is_open("t")
+
+
+@pytest.mark.asyncio
+async def test_async_breaker():
+    clock = Clock()
+    breaker = CircuitBreaker(threshold=1, reset=10.0, clock=clock)
+    policy = RetryPolicy(retries=3, backoff=0.0)
+    calls = []
+
+    async def func():
+        calls.append(1)
+        raise EapiConnectionError("down")
+
+    with pytest.raises(EapiCircuitOpenError):
+        await acall_with_retry("t", func, policy, breaker, True)
+    # opened on the first failure, the retry failed fast
+    assert len(calls) == 1
+
+
+def test_client_classified():
+    breaker = CircuitBreaker(threshold=1, reset=60.0)
+    with Client(breaker=breaker) as sess:
+        with pytest.raises(EapiConnectionError):
+            sess.call("http://127.0.0.1:9", ["show version"])
+
+        with pytest.raises(EapiCircuitOpenError):
+            sess.call("http://127.0.0.1:9", ["show version"])
+
+
+@pytest.mark.asyncio
+async def test_async_client_classified():
+    async with AsyncClient(retry=RetryPolicy(retries=1, backoff=0.0)) as sess:
+        with pytest.raises(eapix.exceptions.EapiConnectionError):
+            await sess.call("http://127.0.0.1:9", ["show version"])
+
+
+def test_client_defaults(server, auth):
+    with Client(auth=auth) as sess:
+        # off unless asked for
+        assert sess.breaker.threshold == 0
+
+        with pytest.raises(httpx.HTTPStatusError) as info:
+            sess.call(str(server.url), ["show hostname"], headers={
+                "x-eapi-faults": "burst=1,burst_every=1",
+                "content-type": "application/json"})
+
+    assert isinstance(info.value, eapix.exceptions.EapiHttpError)
+    assert info.value.response.status_code == info.value.status_code
+    assert info.value.request.url.path == "/command-api"
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2024 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+
+import asyncio
+import ipaddress
+import socket
+
+import httpx
+import pytest
+
+from eapix.client import AsyncClient, Client
+from eapix.resolver import DnsCache, use_dns_cache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _infos(*addresses):
+    return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", (address, 80))
+            for address in addresses]
+
+
+def test_dns_cache(monkeypatch):
+    lookups = []
+
+    def getaddrinfo(host, port, **kwargs):
+        lookups.append(host)
+        return _infos("10.0.0.1", "10.0.0.1", "10.0.0.2")
+
+    monkeypatch.setattr(socket, "getaddrinfo", getaddrinfo)
+
+    clock = Clock()
+    cache = DnsCache(ttl=10.0, clock=clock)
+
+    assert cache.resolve("veos", 443) == ["10.0.0.1", "10.0.0.2"]
+    assert cache.resolve("veos", 443) == ["10.0.0.1", "10.0.0.2"]
+    assert lookups == ["veos"]
+
+    # literals are not looked up
+    assert cache.resolve("10.1.1.1", 443) == ["10.1.1.1"]
+
+    cache.prefer("veos", 443, "10.0.0.2")
+    assert cache.resolve("veos", 443) == ["10.0.0.2", "10.0.0.1"]
+
+    clock.now = 11.0
+    cache.resolve("veos", 443)
+    assert lookups == ["veos", "veos"]
+
+    cache.invalidate("veos")
+    cache.resolve("veos", 443)
+    assert len(lookups) == 3
+
+
+@pytest.mark.asyncio
+async def test_dns_cache_shared_lookup(monkeypatch):
+    loop = asyncio.get_running_loop()
+    lookups = []
+
+    async def getaddrinfo(host, port, **kwargs):
+        lookups.append(host)
+        await asyncio.sleep(0.01)
+        return _infos("10.0.0.1")
+
+    monkeypatch.setattr(loop, "getaddrinfo", getaddrinfo)
+
+    cache = DnsCache()
+    results = await asyncio.gather(
+        *[cache.aresolve("veos", 443) for _ in range(10)])
+
+    assert results == [["10.0.0.1"]] * 10
+    assert lookups == ["veos"]
+
+
+def _by_name(server) -> str:
+    """the server's URL with a host name, addresses are not looked up"""
+
+    url = httpx.URL(str(server.url))
+    try:
+        ipaddress.ip_address(url.host)
+    except ValueError:
+        return str(url)
+    return str(url.copy_with(host="localhost"))
+
+
+def test_use_dns_cache():
+    with pytest.raises(TypeError):
+        use_dns_cache(httpx.MockTransport(lambda request: None), DnsCache())
+
+
+def test_client(server, auth):
+    cache = DnsCache()
+    # a connection per call
+    with Client(auth=auth, dns_cache=cache,
+                max_keepalive_connections=0) as sess:
+        for _ in range(3):
+            assert sess.call(_by_name(server), ["show hostname"]).code == 0
+
+    assert cache.misses == 1
+    assert cache.hits == 2
+
+
+@pytest.mark.asyncio
+async def test_async_client(server, auth):
+    cache = DnsCache()
+    async with AsyncClient(auth=auth, dns_cache=cache,
+                           max_connections_per_target=1,
+                           keepalive_expiry=0) as sess:
+        for _ in range(3):
+            response = await sess.call(_by_name(server), ["show hostname"])
+            assert response.code == 0
+
+    assert cache.misses == 1
+    assert cache.hits == 2
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2024 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+
+import asyncio
+
+import pytest
+
+from eapix.scheduler import next_tick, ticker
+
+
+def test_next_tick():
+    assert next_tick(0.0, 2.0, 0.0) == 2.0
+    assert next_tick(0.0, 2.0, 3.9) == 4.0
+    # late ticks are skipped, not queued
+    assert next_tick(0.0, 2.0, 7.5) == 8.0
+
+
+@pytest.mark.asyncio
+async def test_ticker_fixed_rate():
+    loop = asyncio.get_running_loop()
+    ticks = []
+
+    async for tick in ticker(0.1, deadline=0.55):
+        ticks.append(tick)
+        # simulate a slow poll, the schedule must not drift
+        await asyncio.sleep(0.05)
+
+    assert len(ticks) == 6
+    start = ticks[0]
+    for n, tick in enumerate(ticks):
+        assert tick - start == pytest.approx(n * 0.1, abs=0.03)
+
+
+@pytest.mark.asyncio
+async def test_ticker_jitter():
+    ticks = [t async for t in ticker(0.05, deadline=0.2, jitter=0.01)]
+    assert 3 <= len(ticks) <= 5
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2024 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+
+import sys
+
+import pytest
+
+import eapix.schemas
+from eapix.conditions import Match
+from eapix.response import JsonResult, Response
+from eapix.schemas import (
+    SCHEMAS,
+    BgpPeer,
+    InterfaceCounters,
+    ShowInterfacesCounters,
+    ShowIpBgpSummary,
+    ShowLldpNeighbors,
+    ShowVersion,
+    _fallback_convert,
+    convert,
+    lookup
+)
+
+
+def test_from_rpc_response(json_response):
+    target, request, response = json_response
+
+    resp = Response.from_rpc_response(target, request, response, SCHEMAS)
+    hostname, version = resp.elements
+
+    assert isinstance(hostname.result, JsonResult)
+    assert isinstance(version.result, ShowVersion)
+    assert version.result.version == "4.23.2.1F-DPE"
+    assert version.result.memTotal == 32890040
+    assert version.to_dict()["result"]["serialNumber"] == "JAS18140236"
+
+    untyped = Response.from_rpc_response(target, request, response)
+    assert resp.to_dict() == untyped.to_dict()
+
+    # slots, no per instance dict
+    assert not hasattr(version.result, "__dict__")
+    assert sys.getsizeof(version.result) < sys.getsizeof(response["result"][1])
+
+
+def test_errored(errored_response):
+    target, request, response = errored_response
+    schemas = {"show bogus": ShowVersion}
+
+    resp = Response.from_rpc_response(target, request, response, schemas)
+
+    assert isinstance(resp.elements[1].result, JsonResult)
+
+
+def test_lookup():
+    assert lookup(SCHEMAS, "show  version ") is ShowVersion
+    assert lookup(SCHEMAS, "show hostname") is None
+    assert lookup(None, "show version") is None
+
+
+def test_nested():
+    data = {
+        "interfaces": {
+            "Ethernet1": {"inOctets": 10, "outOctets": 20, "bogus": 1},
+            "Ethernet2": {"inOctets": 30}
+        }
+    }
+
+    for convert_ in (convert, _fallback_convert):
+        counters = convert_(data, ShowInterfacesCounters)
+        assert counters.interfaces["Ethernet1"] == \
+            InterfaceCounters(inOctets=10, outOctets=20)
+        assert counters.interfaces["Ethernet2"].inOctets == 30
+
+    data = {
+        "lldpNeighbors": [
+            {"port": "Ethernet1", "neighborDevice": "sw2",
+             "neighborPort": "Ethernet49/1", "ttl": 120}
+        ],
+        "tablesAgeOuts": 2
+    }
+    neighbors = convert(data, ShowLldpNeighbors)
+    assert neighbors.lldpNeighbors[0].neighborDevice == "sw2"
+    assert neighbors.tablesAgeOuts == 2
+
+    data = {"vrfs": {"default": {"routerId": "1.1.1.1", "peers": {
+        "10.0.0.1": {"peerState": "Established", "prefixReceived": 5}}}}}
+    summary = convert(data, ShowIpBgpSummary)
+    assert summary.vrfs["default"].peers["10.0.0.1"] == \
+        BgpPeer(peerState="Established", prefixReceived=5)
+
+
+def test_match():
+    data = {"vrfs": {"default": {"peers": {
+        "10.0.0.1": {"peerState": "Established"},
+        "10.0.0.2": {"peerState": "Active"}}}}}
+
+    target, request = None, {"params": {"format": "json",
+                                        "cmds": [{"cmd": "show ip bgp summary"}]}}
+    resp = Response.from_rpc_response(target, request, {"result": [data]},
+                                      SCHEMAS)
+
+    assert Match("vrfs.default.peers.*.peerState", "Active")(resp)
+    assert not Match("vrfs.*.peers.*.peerState", "Idle")(resp)
+    assert not Match("vrfs.default.bogus", "Active")(resp)
+
+
+def _backends():
+    backends = [_fallback_convert]
+    try:
+        backends.append(eapix.schemas._msgspec_convert)
+    except AttributeError:
+        # msgspec is not installed
+        pass
+    return backends
+
+
+@pytest.mark.parametrize("backend", _backends())
+def test_mismatched(backend, monkeypatch):
+    monkeypatch.setattr(eapix.schemas, "_convert", backend)
+    request = {"params": {"format": "json",
+                          "cmds": [{"cmd": "show ip bgp summary"}]}}
+
+    # a number where the schema expects a string is not lost
+    resp = Response.from_rpc_response(
+        None, request, {"result": [{"vrfs": {"default": {"asn": 65000}}}]},
+        SCHEMAS)
+    assert Match("vrfs.default.asn", 65000)(resp)
+
+    resp = Response.from_rpc_response(
+        None, request, {"result": [{"vrfs": ["default"]}]}, SCHEMAS)
+    assert isinstance(resp.elements[0].result, JsonResult)
+    assert resp.elements[0].result.to_dict() == {"vrfs": ["default"]}
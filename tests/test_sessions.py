@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2024 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+
+import os
+import stat
+import time
+
+import httpx
+import pytest
+
+import eapix.codec
+from eapix.client import AsyncClient, Client
+from eapix.sessions import SessionStore, SqliteSessionStore
+from eapix.types import Target
+
+
+def test_sqlite_store(tmp_path):
+    path = str(tmp_path / "sessions.db")
+    store = SqliteSessionStore(path, ttl=60.0)
+
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+
+    store.put("veos.local", "admin", "abc")
+    assert store.get("veos.local", "admin") == "abc"
+    # by user
+    assert store.get("veos.local", "other") is None
+
+    # seen by other processes
+    assert SqliteSessionStore(path).get("veos.local", "admin") == "abc"
+
+    store.put("veos.local", "admin", "old", expires=time.time() - 1)
+    assert store.get("veos.local", "admin") is None
+
+    store.put("veos.local", "admin", "abc")
+    store.delete("veos.local", "admin")
+    assert store.get("veos.local", "admin") is None
+
+
+def test_reuse(server, auth, tmp_path):
+    target = str(server.url)
+    store = SqliteSessionStore(str(tmp_path / "sessions.db"))
+    logins = []
+
+    def on_request(request):
+        if request.url.path == "/login":
+            logins.append(request)
+
+    hooks = {"request": [on_request]}
+
+    with Client(auth=auth, session_store=store, event_hooks=hooks) as sess:
+        sess.login(target, auth)
+        assert sess.logged_in(target)
+
+    # a new client skips /login
+    with Client(auth=auth, session_store=store, event_hooks=hooks) as sess:
+        sess.login(target, auth)
+        assert sess.logged_in(target)
+        assert sess.call(target, ["show hostname"]).code == 0
+
+        sess.logout(target)
+
+    assert len(logins) == 1
+    _target = Target.from_url(target)
+    assert store.get(f"{_target.fqdn}:{_target.port}", auth[0]) is None
+
+
+def test_store_by_port(tmp_path, auth):
+    store = SqliteSessionStore(str(tmp_path / "sessions.db"))
+    store.put("veos.local:8443", auth[0], "fresh")
+
+    logins = []
+    switch = _switch({"fresh"})
+
+    def handler(request):
+        if request.url.path == "/login":
+            logins.append(request.url.port)
+        return switch(request)
+
+    transport = httpx.MockTransport(handler)
+    for port in (8443, 9443):
+        with Client(auth=auth, session_store=store,
+                    transport=transport) as sess:
+            sess.login(f"https://veos:{port}", auth)
+
+    # another port is another session
+    assert logins == [9443]
+    assert store.get("veos.local:9443", auth[0]) == "fresh"
+    assert store.get("veos.local", auth[0]) is None
+
+
+def test_abstract_store():
+    with pytest.raises(TypeError):
+        SessionStore()
+
+
+def _switch(sessions: set):
+    """a switch that forgot all sessions but the ones in `sessions`"""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/login":
+            sessions.add("fresh")
+            return httpx.Response(
+                200, headers={"set-cookie": "Session=fresh; Path=/"})
+
+        cookie = request.headers.get("cookie", "").partition("Session=")[2]
+        if cookie not in sessions:
+            return httpx.Response(401)
+
+        body = eapix.codec.loads(request.content)
+        return httpx.Response(200, json={"jsonrpc": "2.0", "id": body["id"],
+                                         "result": [{}]})
+
+    return handler
+
+
+def test_expired_session(tmp_path, auth):
+    store = SqliteSessionStore(str(tmp_path / "sessions.db"))
+    store.put("veos.local", auth[0], "stale")
+
+    transport = httpx.MockTransport(_switch(set()))
+    with Client(auth=auth, session_store=store, transport=transport) as sess:
+        sess.login("veos", auth)
+        # rejected, logged in again and retried
+        assert sess.call("veos", ["show hostname"]).code == 0
+
+    assert store.get("veos.local", auth[0]) == "fresh"
+
+
+@pytest.mark.asyncio
+async def test_async_expired_session(tmp_path, auth):
+    store = SqliteSessionStore(str(tmp_path / "sessions.db"))
+    store.put("veos.local", auth[0], "stale")
+
+    transport = httpx.MockTransport(_switch(set()))
+    async with AsyncClient(auth=auth, session_store=store,
+                           transport=transport) as sess:
+        await sess.login("veos", auth)
+        response = await sess.call("veos", ["show hostname"])
+        assert response.code == 0
+
+    assert store.get("veos.local", auth[0]) == "fresh"
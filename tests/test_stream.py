@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2024 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+
+import json
+import random
+
+import pytest
+
+from eapix.stream import JsonStreamParser, WILDCARD, parse_path
+
+
+def _chunked(data: bytes, size: int):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def _parse(parser, chunks):
+    found = []
+    for chunk in chunks:
+        found += parser.feed(chunk)
+    return found + parser.close()
+
+
+DOC = {
+    "jsonrpc": "2.0",
+    "id": "1",
+    "result": [
+        {"a": [1, 2, {"b": "q\"\\]}x"}], "c": None},
+        {"output": "line\nline2 é \\ end"},
+        {},
+        [],
+        "str",
+        12.5e3,
+        True,
+        None
+    ]
+}
+
+
+@pytest.mark.parametrize("size", [1, 3, 7, 64, 4096])
+def test_parser_chunks(size):
+    raw = json.dumps(DOC, ensure_ascii=False).encode()
+    parser = JsonStreamParser(("result", WILDCARD), ("jsonrpc",))
+    found = _parse(parser, _chunked(raw, size))
+
+    expected = [(("jsonrpc",), "2.0")]
+    expected += [(("result", i), v) for i, v in enumerate(DOC["result"])]
+    assert found == expected
+    assert parser.done
+
+
+def test_parser_random_chunks():
+    raw = json.dumps(DOC).encode()
+    for _ in range(100):
+        chunks, pos = [], 0
+        while pos < len(raw):
+            size = random.randint(1, 9)
+            chunks.append(raw[pos:pos + size])
+            pos += size
+
+        found = _parse(JsonStreamParser(("result", WILDCARD)), chunks)
+        assert [v for _, v in found] == DOC["result"]
+
+
+def test_parser_nested():
+    doc = {"vrfs": {
+        "default": {"routes": {"10.0.0.0/8": {"x": 1}, "1.1.1.1/32": {"x": [2]}}},
+        "red": {"routes": {}},
+        "blue": {"other": 1}}}
+
+    found = _parse(JsonStreamParser("vrfs.*.routes.*"),
+                   _chunked(json.dumps(doc).encode(), 5))
+
+    assert found == [
+        (("vrfs", "default", "routes", "10.0.0.0/8"), {"x": 1}),
+        (("vrfs", "default", "routes", "1.1.1.1/32"), {"x": [2]}),
+    ]
+
+
+def test_parser_scalar_root():
+    parser = JsonStreamParser(())
+    assert parser.feed(b" 4") == []
+    assert parser.feed(b"2") == []
+    assert parser.close() == [((), 42)]
+
+
+def test_parser_incomplete():
+    parser = JsonStreamParser("a")
+    parser.feed(b'{"a": [1,')
+    with pytest.raises(ValueError):
+        parser.close()
+
+
+def test_parse_path():
+    assert parse_path("vrfs.*.routes") == ("vrfs", WILDCARD, "routes")
+    assert parse_path(("result", 0)) == ("result", 0)
+    assert parse_path("") == ()
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2024 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+
+import pytest
+
+import eapix.exceptions
+from eapix.client import AsyncClient, Client
+from eapix.metrics import Metrics
+from eapix.tracing import otel
+
+
+def _tree(spans):
+    return {(span.name, span.parent.name if span.parent else None)
+            for span in spans}
+
+
+def test_trace(server, auth):
+    spans = []
+    target = str(server.url)
+
+    with Client(auth=auth, tracer=spans.append) as sess:
+        sess.call(target, ["show hostname", "show version"])
+
+    assert _tree(spans) >= {
+        ("eapi.call", None),
+        ("eapi.resolve", "eapi.call"),
+        ("eapi.request", "eapi.call"),
+        ("eapi.pool", "eapi.request"),
+        ("eapi.connect", "eapi.request"),
+        ("eapi.write", "eapi.request"),
+        ("eapi.first_byte", "eapi.request"),
+        ("eapi.read", "eapi.request"),
+        ("eapi.decode", "eapi.call"),
+        ("eapi.response", "eapi.call"),
+    }
+
+    # children end first
+    root = spans[-1]
+    assert root.name == "eapi.call"
+    assert root.attributes == {"server.address": target,
+                               "eapi.commands": 2}
+    assert all(span.end is not None for span in spans)
+    assert all(root.start <= span.start and span.end <= root.end
+               for span in spans)
+
+    request = next(span for span in spans if span.name == "eapi.request")
+    assert request.attributes["http.response.status_code"] == 200
+
+
+def test_trace_error(server, auth):
+    spans = []
+
+    with Client(auth=auth, tracer=spans.append) as sess:
+        with pytest.raises(eapix.exceptions.EapiConnectionError):
+            sess.call(str(server.url), ["show version"], headers={
+                "x-eapi-faults": "reset=1",
+                "content-type": "application/json"})
+
+    errors = {span.name: span.attributes.get("error.type") for span in spans}
+    assert errors["eapi.request"] == "EapiConnectionError"
+    assert errors["eapi.call"] == "EapiConnectionError"
+    assert "eapi.decode" not in errors
+
+
+@pytest.mark.asyncio
+async def test_async_trace(server, auth):
+    spans = []
+    metrics = Metrics()
+
+    # alongside the metrics' trace callback
+    async with AsyncClient(auth=auth, tracer=spans.append,
+                           metrics=metrics) as sess:
+        await sess.call(str(server.url), ["show hostname"])
+        await sess.call(str(server.url), ["show hostname"])
+
+    assert [span.name for span in spans].count("eapi.call") == 2
+    assert ("eapi.first_byte", "eapi.request") in _tree(spans)
+    assert metrics.snapshot()["eapi_pool_wait_seconds"][0]["count"] == 2
+
+
+def test_otel(server, auth):
+    pytest.importorskip("opentelemetry")
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+    from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+        InMemorySpanExporter)
+
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+
+    with Client(auth=auth,
+                tracer=otel(provider.get_tracer("eapix"))) as sess:
+        sess.call(str(server.url), ["show hostname"])
+
+    spans = {span.name: span for span in exporter.get_finished_spans()}
+    assert spans["eapi.request"].parent.span_id == \
+        spans["eapi.call"].context.span_id
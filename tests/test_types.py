@@ -28,4 +28,28 @@ def test_target(target, starget):
         Target("bogus", "host", port=6000)
 
     with pytest.raises(ValueError):
-        Target("http", "host", port=600000)
\ No newline at end of file
+        Target("http", "host", port=600000)
+
+def test_unix_target():
+    t = Target.from_url("unix:///var/run/command-api.sock")
+    assert t.transport == "unix"
+    assert t.hostname == "/var/run/command-api.sock"
+    assert str(t) == "unix:///var/run/command-api.sock"
+
+    # the switch's socket by default
+    assert Target.from_url("unix://") == t
+
+    with pytest.raises(ValueError):
+        Target("unix", "/tmp/eapi.sock", port=80)
+
+
+def test_target_cache():
+    t = Target.from_url("https://VEOS:443/")
+    assert t is Target.from_url("https://VEOS:443/")
+    assert t == Target("https", "veos", 443)
+    assert t.to_url() == "https://veos:443"
+
+    assert Target.from_url("veos:").port is None
+
+    with pytest.raises(Exception):
+        t.hostname = "other"